@@ -0,0 +1,50 @@
+# benchmarks/cache_multikey.py
+"""
+Benchmark: Mehrfach-Schlüssel im Cache
+Eine Profilseite braucht 5-10 Schlüssel; verglichen werden einzelne GETs, get_many (MGET) und batch() (Pipeline).
+
+Aufruf: python -m benchmarks.cache_multikey
+"""
+
+import asyncio
+
+from .common import measure, memory_cache, report, rtt_ms
+
+ITERATIONS = 500
+
+def profile_keys(count: int):
+    keys = ["player:1:data", "player:1:version", "inventory:1:0", "cooldown:daily:1", "cooldown:mana:1",
+            "streak:1", "buffs:1", "appearance:1", "soul_animal:1", "grimoire:1"]
+    return keys[:count]
+
+async def main():
+    cache = memory_cache()
+    for key in profile_keys(10):
+        await cache.set(key, {'key': key}, expire=300)
+
+    rows = {}
+    for count in (5, 10):
+        keys = profile_keys(count)
+
+        async def single():
+            for key in keys:
+                await cache.get(key)
+
+        async def many():
+            await cache.get_many(keys)
+
+        async def batch():
+            async with cache.batch() as pipe:
+                for key in keys:
+                    pipe.get(key)
+
+        for name, fn in (("einzeln", single), ("get_many", many), ("batch", batch)):
+            before = cache.redis.round_trips
+            result = await measure(fn, ITERATIONS)
+            result['round_trips'] = (cache.redis.round_trips - before) // ITERATIONS
+            rows[f"{count} Schlüssel, {name}"] = result
+
+    report(f"Profilseite, simulierte Latenz {rtt_ms()}ms pro Round-Trip (Zeiten in ms)", rows)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+# benchmarks/client_tracking.py
+"""
+Benchmark: Client-Side-Caching (CACHE_CLIENT_TRACKING)
+Wiederholte GETs auf wenige heiße Schlüssel, einmal direkt gegen Redis und einmal mit lokalem Spiegel.
+CLIENT TRACKING gibt es nur in echtem Redis (≥ 6), daher braucht dieser Benchmark REDIS_URL.
+
+Aufruf: REDIS_URL=redis://localhost:6379/0 python -m benchmarks.client_tracking
+"""
+
+import asyncio
+import os
+import sys
+
+from src.core.cache import Cache
+
+from .common import measure, report
+
+ITERATIONS = 5000
+HOT_KEYS = [f"bench:tracking:{i}" for i in range(20)]
+
+async def connect(tracking: bool) -> Cache:
+    os.environ['CACHE_BACKEND'] = 'redis'
+    os.environ['CACHE_CLIENT_TRACKING'] = 'true' if tracking else 'false'
+    cache = Cache()
+    await cache.connect()
+    if tracking:
+        for _ in range(50):
+            if cache.tracking.active:
+                break
+            await asyncio.sleep(0.1)
+        else:
+            raise RuntimeError("Client-Tracking wurde nicht aktiv")
+    return cache
+
+async def main():
+    if not (os.getenv('REDIS_URL') or os.getenv('REDIS_PRIVATE_URL')):
+        print("REDIS_URL nicht gesetzt - Benchmark übersprungen (CLIENT TRACKING braucht echtes Redis)")
+        return
+
+    plain = await connect(tracking=False)
+    tracked = await connect(tracking=True)
+    try:
+        for key in HOT_KEYS:
+            await plain.set(key, {'key': key, 'payload': 'x' * 200}, expire=300)
+
+        counter = iter(range(10 ** 9))
+        rows = {
+            "GET direkt": await measure(lambda: plain.get(HOT_KEYS[next(counter) % len(HOT_KEYS)]), ITERATIONS),
+            "GET mit Tracking": await measure(lambda: tracked.get(HOT_KEYS[next(counter) % len(HOT_KEYS)]), ITERATIONS),
+        }
+        report(f"{ITERATIONS} GETs auf {len(HOT_KEYS)} Schlüssel (Zeiten in ms)", rows)
+
+        # Schreiben über die andere Verbindung muss den lokalen Spiegel invalidieren
+        await plain.set(HOT_KEYS[0], {'key': HOT_KEYS[0], 'payload': 'neu'}, expire=300)
+        await asyncio.sleep(0.1)
+        fresh = await tracked.get(HOT_KEYS[0])
+        print(f"\nNach fremdem SET: {'aktuell' if fresh['payload'] == 'neu' else 'VERALTET'}; {tracked.tracking.stats()}")
+    finally:
+        await plain.delete(*HOT_KEYS)
+        await tracked.disconnect()
+        await plain.disconnect()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        print(f"Benchmark fehlgeschlagen: {e}")
+        sys.exit(1)
@@ -0,0 +1,89 @@
+# benchmarks/common.py
+"""
+Gemeinsame Hilfen für die Benchmarks
+Der Cache läuft auf dem In-Memory-Backend; eine Unterklasse simuliert pro Round-Trip die Netzwerklatenz
+(BENCH_RTT_MS) und zählt die Round-Trips, damit die Benchmarks ohne externe Dienste laufen.
+"""
+
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from src.core.cache import Cache
+from src.core.memory_backend import MemoryPipeline, MemoryRedis, MemoryScript
+
+class _NetworkPipeline(MemoryPipeline):
+    """Pipeline, die beim execute() genau einen Round-Trip kostet."""
+
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        await self._backend.round_trip()
+        return await super().execute(raise_on_error)
+
+class SimulatedNetworkRedis(MemoryRedis):
+    """MemoryRedis mit künstlicher Latenz pro Round-Trip."""
+
+    def __init__(self, rtt_ms: float, **kwargs):
+        super().__init__(**kwargs)
+        self.rtt: float = rtt_ms / 1000
+        self.round_trips: int = 0
+
+    async def round_trip(self):
+        self.round_trips += 1
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+
+    def __getattr__(self, name: str):
+        command = super().__getattr__(name)
+
+        async def networked(*args, **kwargs):
+            await self.round_trip()
+            return await command(*args, **kwargs)
+        return networked
+
+    def pipeline(self, transaction: bool = True) -> MemoryPipeline:
+        return _NetworkPipeline(self)
+
+    def register_script(self, script: str) -> MemoryScript:
+        inner = super().register_script(script)
+
+        async def call(keys: List[str] = (), args: List[Any] = (), client=None):
+            await self.round_trip()
+            return await inner(keys, args, client)
+        return call
+
+def rtt_ms() -> float:
+    """Simulierte Latenz pro Round-Trip in Millisekunden (BENCH_RTT_MS, Standard 0.5)."""
+    return float(os.getenv('BENCH_RTT_MS', '0.5'))
+
+def memory_cache(rtt: float = None) -> Cache:
+    """Ein eigener Cache auf dem simulierten Netzwerk-Backend."""
+    cache = Cache()
+    cache.use_memory_backend(backend=SimulatedNetworkRedis(rtt if rtt is not None else rtt_ms()))
+    return cache
+
+async def measure(fn: Callable[[], Awaitable[Any]], iterations: int) -> Dict[str, float]:
+    """Führt fn wiederholt aus und gibt Latenzen in Millisekunden zurück."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'mean': statistics.fmean(samples),
+        'p50': samples[len(samples) // 2],
+        'p95': samples[int(len(samples) * 0.95)],
+    }
+
+def report(title: str, rows: Dict[str, Dict[str, float]]):
+    """Gibt eine Ergebnistabelle aus."""
+    print(f"\n{title}")
+    columns = list(next(iter(rows.values())))
+    width = max(len(name) for name in rows) + 2
+    print(f"{'':{width}}" + "".join(f"{column:>14}" for column in columns))
+    for name, values in rows.items():
+        print(f"{name:{width}}" + "".join(
+            f"{value:>14.3f}" if isinstance(value, float) else f"{value:>14}" for value in values.values()
+        ))
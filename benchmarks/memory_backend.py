@@ -0,0 +1,43 @@
+# benchmarks/memory_backend.py
+"""
+Benchmark: In-Memory-Backend (CACHE_BACKEND=memory)
+Cooldown-Prüfungen und GET/SET im Prozess, ohne Netzwerk; dazu das Verhalten unter knappem Speicherbudget.
+
+Aufruf: python -m benchmarks.memory_backend
+"""
+
+import asyncio
+
+from .common import measure, memory_cache, report
+
+ITERATIONS = 20000
+
+async def main():
+    rows = {}
+    for rtt in (0.0, 0.5):
+        cache = memory_cache(rtt)
+        iterations = ITERATIONS if not rtt else 2000
+        counter = iter(range(10 ** 9))
+
+        rows[f"try_acquire_cooldown (rtt {rtt}ms)"] = await measure(
+            lambda: cache.try_acquire_cooldown(f"cooldown:daily:{next(counter) % 1000}", 60), iterations
+        )
+        rows[f"set (rtt {rtt}ms)"] = await measure(
+            lambda: cache.set(f"player:{next(counter) % 1000}:data", {'mana': 50, 'pixels': 120}, expire=300), iterations
+        )
+        rows[f"get (rtt {rtt}ms)"] = await measure(
+            lambda: cache.get(f"player:{next(counter) % 1000}:data"), iterations
+        )
+    report("Latenz pro Aufruf in ms", rows)
+
+    # Knappes Budget: LRU verdrängt, der Speicher bleibt begrenzt
+    cache = memory_cache(0.0)
+    cache.redis.max_memory = 256 * 1024
+    for i in range(20000):
+        await cache.set(f"bench:{i}", {'payload': 'x' * 100}, expire=300)
+    stats = cache.redis.stats()
+    print(f"\nBudget {stats['max_memory']} Bytes: {stats['keys']} Schlüssel, "
+          f"{stats['memory_used']} Bytes belegt, {stats['evictions']} verdrängt")
+
+if __name__ == "__main__":
+    asyncio.run(main())
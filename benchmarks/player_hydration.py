@@ -0,0 +1,80 @@
+# benchmarks/player_hydration.py
+"""
+Benchmark: Laden von Spielern
+Vergleicht die früheren drei fetchrow-Aufrufe pro Spieler mit dem LEFT JOIN aus PLAYER_SELECT_SQL
+und das Laden vieler Spieler in einer Abfrage (wie Player.get_players).
+Braucht ein lokales Postgres mit Schema und einigen Spielern in DATABASE_URL.
+
+Aufruf: DATABASE_URL=postgresql://localhost/pixel python -m benchmarks.player_hydration
+"""
+
+import asyncio
+import os
+import sys
+
+import asyncpg
+
+from src.game.player_manager import PLAYER_SELECT_SQL
+
+from .common import measure, report
+
+ITERATIONS = 500
+BULK_SIZE = 200
+
+# Die Abfragen vor dem LEFT JOIN, je ein Round-Trip
+LEGACY_QUERIES = (
+    "SELECT * FROM players WHERE user_id = $1",
+    "SELECT description, image_url FROM character_appearance WHERE player_id = $1",
+    "SELECT determined_form, override_form FROM soul_animals WHERE player_id = $1",
+)
+
+async def main():
+    url = os.getenv('DATABASE_URL')
+    if not url:
+        print("DATABASE_URL nicht gesetzt - Benchmark übersprungen")
+        return
+
+    conn = await asyncpg.connect(url)
+    try:
+        user_ids = [record['user_id'] for record in await conn.fetch("SELECT user_id FROM players LIMIT $1", BULK_SIZE)]
+        if not user_ids:
+            print("Keine Spieler in der Datenbank - Benchmark übersprungen")
+            return
+
+        single = await conn.prepare(PLAYER_SELECT_SQL + " WHERE p.user_id = $1")
+        many = await conn.prepare(PLAYER_SELECT_SQL + " WHERE p.user_id = ANY($1::bigint[])")
+        counter = iter(range(10 ** 9))
+
+        async def legacy():
+            user_id = user_ids[next(counter) % len(user_ids)]
+            for query in LEGACY_QUERIES:
+                await conn.fetchrow(query, user_id)
+
+        async def joined():
+            await single.fetchrow(user_ids[next(counter) % len(user_ids)])
+
+        report("Ein Spieler (Zeiten in ms)", {
+            "3x fetchrow": await measure(legacy, ITERATIONS),
+            "LEFT JOIN": await measure(joined, ITERATIONS),
+        })
+
+        async def joined_loop():
+            for user_id in user_ids:
+                await single.fetchrow(user_id)
+
+        async def bulk():
+            await many.fetch(user_ids)
+
+        report(f"{len(user_ids)} Spieler (Zeiten in ms)", {
+            "LEFT JOIN je Spieler": await measure(joined_loop, 20),
+            "get_players (ANY)": await measure(bulk, 20),
+        })
+    finally:
+        await conn.close()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        print(f"Benchmark fehlgeschlagen: {e}")
+        sys.exit(1)
@@ -13,10 +13,14 @@ CREATE TABLE IF NOT EXISTS players (
     mana_current INT DEFAULT 100 NOT NULL,
     mana_max INT DEFAULT 100 NOT NULL,
     mana_regen_rate REAL DEFAULT 2.0 NOT NULL, -- Mana pro Stunde
+    mana_updated_at TIMESTAMPTZ DEFAULT NOW() NOT NULL, -- Zeitpunkt, zu dem mana_current gültig war (Lazy-Regeneration)
     pixel_balance BIGINT DEFAULT 0 NOT NULL,
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- Nachträglich für bestehende Datenbanken
+ALTER TABLE players ADD COLUMN IF NOT EXISTS mana_updated_at TIMESTAMPTZ DEFAULT NOW() NOT NULL;
+
 -- -----------------------------------------------------------------------------
 -- Tabelle 2: character_appearance
 -- Aufgabe: Speichert die visuellen und textuellen Charakter-Details.
@@ -93,6 +97,9 @@ CREATE TABLE IF NOT EXISTS active_buffs (
     expires_at TIMESTAMPTZ NOT NULL
 );
 
+-- Für die Buff-Abfrage bei der Mana-Regeneration
+CREATE INDEX IF NOT EXISTS idx_active_buffs_player_type ON active_buffs (player_id, buff_type, expires_at);
+
 -- -----------------------------------------------------------------------------
 -- Tabellen 8 & 9: Frage des Tages (FdT)
 -- Aufgabe: Speichern die Fragen und die Antworten der Spieler.
@@ -68,6 +68,15 @@ class PixelBot(commands.Bot):
         logging.info(f"Signal {signum} empfangen. Starte graceful shutdown...")
         asyncio.create_task(self.close())
     
+    async def close(self):
+        """Schreibt gepufferte Spieler-Änderungen und Zähler, bevor die Verbindung geschlossen wird."""
+        await flush_buffers()
+        from .game.buff_manager import buff_manager
+        buff_manager.stop()
+        from .core.local_cache import tiered_cache
+        await tiered_cache.stop()
+        await super().close()
+    
     async def setup_hook(self):
         """Wird ausgeführt, bevor der Bot sich zu Discord verbindet."""
         startup_logger = logging.getLogger("startup")
@@ -75,24 +84,40 @@ class PixelBot(commands.Bot):
         startup_logger.info("⚙️ PHASE 2: BOT-INFRASTRUKTUR")
         startup_logger.info("=" * 60)
         
-        # 1. Datenbank und Cache initialisieren
+        # 1. Cache und Datenbank initialisieren (Cache zuerst: er koordiniert die Singleton-Jobs)
         try:
-            log_startup_step("[1/4] Initialisiere Datenbank-Verbindung")
-            from .core.database import db
-            await db.connect()
-            await db.execute_schema()
-            log_startup_step("✅ Datenbank verbunden und Schema geladen")
-        except Exception as e:
-            logging.error(f"❌ FEHLER: Datenbankverbindung fehlgeschlagen: {e}")
-            
-        try:
-            log_startup_step("[2/4] Initialisiere Redis-Cache")
+            log_startup_step("[1/4] Initialisiere Redis-Cache")
             from .core.cache import cache
             await cache.connect()
             log_startup_step("✅ Redis-Cache verbunden")
         except Exception as e:
             logging.error(f"❌ FEHLER: Redis-Verbindung fehlgeschlagen: {e}")
         
+        # Auch ohne Redis beim Start: der Flush überspringt Runden ohne Cache, der Listener verbindet sich selbst neu
+        from .game.activity_tracker import activity_tracker
+        activity_tracker.start()
+        from .core.local_cache import tiered_cache
+        tiered_cache.start()
+        
+        try:
+            log_startup_step("[2/4] Initialisiere Datenbank-Verbindung")
+            from .core.database import db
+            from .core.leader import run_singleton
+            # Spiel-Module registrieren ihre Hot-Path-Statements beim Import,
+            # damit sie schon auf den ersten Pool-Verbindungen vorbereitet werden
+            from .game import player_manager, inventory_manager, event_eligibility  # noqa: F401
+            await db.connect()
+            # Bei mehreren Instanzen führt nur eine das Schema aus, die anderen warten darauf
+            await run_singleton("execute_schema", db.execute_schema)
+            from .game.write_behind import player_write_behind
+            player_write_behind.start()
+            from .game.buff_manager import buff_manager
+            await buff_manager.load()
+            buff_manager.start()
+            log_startup_step("✅ Datenbank verbunden und Schema geladen")
+        except Exception as e:
+            logging.error(f"❌ FEHLER: Datenbankverbindung fehlgeschlagen: {e}")
+        
         # 2. Emoji Manager vorbereiten (noch nicht synchronisieren)
         log_startup_step("[3/4] Bereite Emoji-Manager vor")
         from .utils.emoji_manager import EmojiManager
@@ -137,7 +162,11 @@ class PixelBot(commands.Bot):
             global emoji_manager
             emoji_manager = self.emoji_manager
             try:
-                await self.emoji_manager.initialize(self.main_guild_id)
+                from .core.leader import run_singleton
+                # Nur eine Instanz lädt neue Emojis hoch, die anderen übernehmen danach den Bestand
+                await run_singleton("emoji_sync", lambda: self.emoji_manager.initialize(self.main_guild_id))
+                if not self.emoji_manager.guild_id:
+                    await self.emoji_manager.initialize(self.main_guild_id, sync=False)
                 log_startup_step("✅ Emoji-System synchronisiert")
             except Exception as e:
                 logging.error(f"❌ Emoji-Synchronisation fehlgeschlagen: {e}")
@@ -149,17 +178,23 @@ class PixelBot(commands.Bot):
         # 3. Slash Commands synchronisieren
         log_startup_step("[3/4] Synchronisiere Discord-Commands")
         try:
+            from .core.leader import run_singleton
             if hasattr(self, 'command_registration'):
-                # Intelligentes Command Registration System nutzen
-                sync_result = await self.command_registration.intelligent_sync()
-                if sync_result["success"]:
+                # Intelligentes Command Registration System nutzen, nur auf einer Instanz
+                sync_result = await run_singleton("command_sync", self.command_registration.intelligent_sync, wait=False)
+                if sync_result is None:
+                    log_startup_step("⏭️ Command-Sync läuft auf einer anderen Instanz")
+                elif sync_result["success"]:
                     log_startup_step(f"✅ {sync_result['commands_synced']} Commands synchronisiert (intelligent)")
                 else:
                     log_startup_step(f"⚠️ Command-Sync: {sync_result['message']}")
             else:
                 # Fallback auf normalen Sync
-                synced = await self.tree.sync()
-                log_startup_step(f"✅ {len(synced)} Commands synchronisiert (standard)")
+                synced = await run_singleton("command_sync", self._sync_tree, wait=False)
+                if synced is None:
+                    log_startup_step("⏭️ Command-Sync läuft auf einer anderen Instanz")
+                else:
+                    log_startup_step(f"✅ {synced} Commands synchronisiert (standard)")
         except Exception as e:
             logging.error(f"❌ Fehler bei Command-Synchronisation: {e}")
             log_startup_step("❌ Command-Synchronisation fehlgeschlagen")
@@ -191,6 +226,10 @@ class PixelBot(commands.Bot):
         startup_logger.info("=" * 60)
         startup_logger.info("")
     
+    async def _sync_tree(self) -> int:
+        """Synchronisiert den Command-Tree und gibt die Anzahl der Commands zurück."""
+        return len(await self.tree.sync())
+    
     async def _load_cogs(self):
         """Lädt alle Cog-Module."""
         cog_files = [
@@ -219,6 +258,17 @@ class PixelBot(commands.Bot):
         # User-freundliche Fehlermeldung
         await ctx.send("❌ Ein Fehler ist aufgetreten. Bitte versuche es später erneut.")
 
+async def flush_buffers():
+    """Stoppt alle Hintergrund-Flushes und schreibt gepufferte Daten in die Datenbank."""
+    from .game.write_behind import player_write_behind
+    from .game.activity_tracker import activity_tracker
+    
+    for name, buffer in (("Write-Behind", player_write_behind), ("Aktivitätszähler", activity_tracker)):
+        try:
+            await buffer.stop()
+        except Exception as e:
+            logging.error(f"❌ Fehler beim Flush ({name}): {e}")
+
 async def main():
     """Haupt-Funktion zum Starten des Bots."""
     # Enhanced Logging Setup
@@ -287,6 +337,7 @@ async def main():
                 from .core.database import db
                 from .core.cache import cache
                 log_startup_step("[1/2] Schließe Datenbank und Cache")
+                await flush_buffers()
                 await db.disconnect()
                 await cache.disconnect()
                 log_startup_step("✅ Verbindungen geschlossen")
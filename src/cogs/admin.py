@@ -5,6 +5,10 @@ from discord import app_commands
 from typing import Optional
 
 from ..utils.emoji_manager import get_emoji
+from ..core.cache import cache
+from ..core.database import db
+from ..core.local_cache import tiered_cache
+from ..game.player_cache import player_cache
 
 class AdminCog(commands.Cog):
     """Admin-Commands für Bot-Verwaltung."""
@@ -140,6 +144,61 @@ class AdminCog(commands.Cog):
         embed.add_field(name="🔧 Cogs", value=len(self.bot.cogs), inline=True)
         embed.add_field(name="💬 Commands", value=len(self.bot.tree.get_commands()), inline=True)
         
+        # Spieler-Cache Stats
+        cache_stats = player_cache.stats()
+        embed.add_field(
+            name="🗃️ Spieler-Cache",
+            value=f"{cache_stats['hits']} Hits / {cache_stats['misses']} Misses ({cache_stats['hit_rate']:.0%}), TTL {cache_stats['ttl']}s",
+            inline=False
+        )
+        
+        # Zweistufiger Cache Stats
+        tier_stats = tiered_cache.stats()
+        embed.add_field(
+            name="⚡ Cache-Stufen",
+            value=(
+                f"L1: {tier_stats['l1_hit_rate']:.0%} ({tier_stats['l1_hits']}, {tier_stats['l1_size']} Einträge)\n"
+                f"L2: {tier_stats['l2_hit_rate']:.0%} ({tier_stats['l2_hits']}), Misses: {tier_stats['misses']}"
+            ),
+            inline=False
+        )
+        
+        # Client-Side-Caching Stats
+        if cache.tracking:
+            tracking_stats = cache.tracking.stats()
+            embed.add_field(
+                name="📡 Client-Tracking",
+                value=(
+                    f"{'Aktiv' if tracking_stats['active'] else 'Inaktiv'}: {tracking_stats['hit_rate']:.0%} "
+                    f"({tracking_stats['hits']} Hits, {tracking_stats['size']} Einträge, "
+                    f"{tracking_stats['invalidations']} Invalidierungen)"
+                ),
+                inline=False
+            )
+        
+        # Datenbank-Pool Stats
+        pool_stats = db.stats()
+        if pool_stats:
+            histogram = ", ".join(f"{label}: {count}" for label, count in pool_stats['hold_histogram'].items() if count)
+            queries = ", ".join(f"{label}: {count}" for label, count in pool_stats['query_histogram'].items() if count)
+            embed.add_field(
+                name="🗄️ Datenbank-Pool",
+                value=(
+                    f"Verbindungen: {pool_stats['in_use']} aktiv / {pool_stats['size']} offen "
+                    f"(Limit {pool_stats['limit']}{', adaptiv' if pool_stats['adaptive'] else ''})\n"
+                    f"Wartezeit: Ø {pool_stats['acquire_wait_avg_ms']:.1f}ms, max {pool_stats['acquire_wait_max_ms']:.0f}ms\n"
+                    f"Acquires: {pool_stats['acquire_count']}, Timeouts: {pool_stats['timeouts']}\n"
+                    f"Haltedauer der Verbindungen: {histogram or '-'}\n"
+                    f"Dauer der Abfragen ({pool_stats['query_count']}): {queries or '-'}"
+                    + (
+                        f"\nReplica: {pool_stats['replica']['in_use']} aktiv / {pool_stats['replica']['size']} offen, "
+                        f"{pool_stats['replica']['acquire_count']} Acquires, {pool_stats['replica']['query_count']} Abfragen"
+                        if 'replica' in pool_stats else ""
+                    )
+                ),
+                inline=False
+            )
+        
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
 async def setup(bot: commands.Bot):
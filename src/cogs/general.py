@@ -5,6 +5,8 @@ from discord import app_commands
 from datetime import datetime
 
 from ..utils.emoji_manager import get_emoji
+from ..core.cache import cache
+from ..core.database import db
 
 class GeneralCog(commands.Cog):
     """Allgemeine Bot-Commands."""
@@ -92,6 +94,27 @@ class GeneralCog(commands.Cog):
             inline=True
         )
         
+        # Verbindungen (Circuit Breaker)
+        breakers = [cache.breaker]
+        for pool in (db.pool, db.replica_pool):
+            if pool is not None:
+                breakers.append(pool.breaker)
+        connection_lines = []
+        for breaker in breakers:
+            if breaker.is_open:
+                connection_lines.append(f"**{breaker.name}:** {get_emoji('error')} Gestört seit {breaker.stats()['open_for']:.0f}s")
+            else:
+                connection_lines.append(f"**{breaker.name}:** {get_emoji('success')} Online")
+        
+        embed.add_field(
+            name="🔌 Verbindungen",
+            value="\n".join(connection_lines),
+            inline=False
+        )
+        
+        if any(breaker.is_open for breaker in breakers):
+            embed.color = discord.Color.orange()
+        
         embed.set_thumbnail(url=self.bot.user.display_avatar.url)
         
         await interaction.response.send_message(embed=embed)
@@ -1,21 +1,281 @@
 import redis.asyncio as redis
+from redis import exceptions as redis_exceptions
+import asyncio
+import inspect
+import math
 import os
-import json
+import random
+import time
+import uuid
 import logging
-from typing import Optional, Any
+from contextlib import asynccontextmanager
+from typing import Optional, Any, Awaitable, Callable, Dict, Iterable, List, Tuple, Union
+
+from .circuit_breaker import CircuitBreaker
+from .memory_backend import MemoryRedis
+from .serializer import Serializer
 
 logger = logging.getLogger(__name__)
 
+# Token-Bucket, vollständig serverseitig: liest, füllt auf und zieht ab in einem Aufruf.
+# KEYS[1] = Bucket, ARGV = Kapazität, Auffüllrate (Tokens/s), Kosten
+# Rückgabe: {erlaubt (0/1), verbleibende Tokens, Wartezeit in ms bis genug Tokens da sind}
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate / 1000)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = math.ceil((cost - tokens) * 1000 / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate))
+return {allowed, math.floor(tokens), retry_after}
+"""
+
+# Gibt einen Lock nur frei, wenn er noch dem Aufrufer gehört
+RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Verlängert einen Lock nur, wenn er noch dem Aufrufer gehört
+EXTEND_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Löscht alle Schlüssel der übergebenen Tag-Sets und die Sets selbst, atomar in einem Aufruf.
+# KEYS = Tag-Sets, Rückgabe: gelöschte Schlüssel (für L1-Invalidierung)
+INVALIDATE_TAGS_LUA = """
+local deleted = {}
+for _, tag in ipairs(KEYS) do
+    local members = redis.call('SMEMBERS', tag)
+    for i = 1, #members, 500 do
+        redis.call('DEL', unpack(members, i, math.min(i + 499, #members)))
+    end
+    for _, member in ipairs(members) do
+        deleted[#deleted + 1] = member
+    end
+    redis.call('DEL', tag)
+end
+return deleted
+"""
+
+def make_key(namespace: str, *parts: Any) -> str:
+    """Baut einen Schlüssel im Namensraum, z.B. make_key("player", 123, "data") -> "player:123:data"."""
+    return ":".join(str(part) for part in (namespace, *parts))
+
+# Python-Gegenstücke der Lua-Skripte für das In-Memory-Backend (laufen ohne await, also atomar)
+def _token_bucket_memory(backend: MemoryRedis, keys: List[str], args: List[Any]) -> List[int]:
+    capacity, rate, cost = float(args[0]), float(args[1]), float(args[2])
+    now = int(time.time() * 1000)
+    tokens, ts = backend._hmget(keys[0], 'tokens', 'ts')
+    tokens = float(tokens) if tokens is not None else capacity
+    ts = int(ts) if ts is not None else now
+    tokens = min(capacity, tokens + (now - ts) * rate / 1000)
+    
+    allowed, retry_after = 0, 0
+    if tokens >= cost:
+        tokens -= cost
+        allowed = 1
+    else:
+        retry_after = math.ceil((cost - tokens) * 1000 / rate)
+    
+    backend._hset(keys[0], {'tokens': tokens, 'ts': now})
+    backend._pexpire(keys[0], math.ceil(capacity * 1000 / rate))
+    return [allowed, math.floor(tokens), retry_after]
+
+def _release_lock_memory(backend: MemoryRedis, keys: List[str], args: List[Any]) -> int:
+    if backend._get(keys[0]) == str(args[0]):
+        return backend._delete(keys[0])
+    return 0
+
+def _extend_lock_memory(backend: MemoryRedis, keys: List[str], args: List[Any]) -> int:
+    if backend._get(keys[0]) == str(args[0]):
+        return int(backend._pexpire(keys[0], int(args[1])))
+    return 0
+
+def _invalidate_tags_memory(backend: MemoryRedis, keys: List[str], args: List[Any]) -> List[str]:
+    deleted: List[str] = []
+    for tag in keys:
+        members = list(backend._smembers(tag))
+        backend._delete(*members, tag)
+        deleted.extend(members)
+    return deleted
+
+class _GuardedPipeline:
+    """Pipeline, deren execute() über den Circuit Breaker läuft."""
+    
+    def __init__(self, pipeline, client: "GuardedRedis"):
+        self._pipeline = pipeline
+        self._client = client
+    
+    async def __aenter__(self) -> "_GuardedPipeline":
+        await self._pipeline.__aenter__()
+        return self
+    
+    async def __aexit__(self, *exc):
+        return await self._pipeline.__aexit__(*exc)
+    
+    def __getattr__(self, name: str):
+        return getattr(self._pipeline, name)
+    
+    async def execute(self, *args, **kwargs):
+        return await self._client.breaker.call(self._pipeline.execute(*args, **kwargs), self._client.timeout)
+
+class _GuardedScript:
+    """Lua-Skript, dessen Aufrufe über den Circuit Breaker laufen."""
+    
+    def __init__(self, script, client: "GuardedRedis"):
+        self._script = script
+        self._client = client
+    
+    async def __call__(self, *args, **kwargs):
+        return await self._client.breaker.call(self._script(*args, **kwargs), self._client.timeout)
+
+class GuardedRedis:
+    """Hülle um den Redis-Client: jeder Befehl hat eine kurze Deadline und läuft über den Circuit Breaker.
+    
+    Pub/Sub und das Schließen laufen unverändert durch.
+    """
+    
+    PASSTHROUGH = frozenset({'pubsub', 'aclose', 'close', 'connection_pool'})
+    
+    def __init__(self, client: redis.Redis, breaker: CircuitBreaker, timeout: float):
+        self.client = client
+        self.breaker = breaker
+        self.timeout = timeout
+    
+    def pipeline(self, *args, **kwargs) -> _GuardedPipeline:
+        return _GuardedPipeline(self.client.pipeline(*args, **kwargs), self)
+    
+    def register_script(self, script: str) -> _GuardedScript:
+        return _GuardedScript(self.client.register_script(script), self)
+    
+    def __getattr__(self, name: str):
+        attr = getattr(self.client, name)
+        if name in self.PASSTHROUGH or not callable(attr):
+            return attr
+        
+        def command(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if inspect.isawaitable(result):
+                return self.breaker.call(result, self.timeout)
+            return result
+        return command
+
+class CacheBatch:
+    """Sammelt beliebige Cache-Operationen und schickt sie in einer Pipeline.
+    
+    Jede Operation gibt ein Future zurück, das nach dem Ende des Blocks das Ergebnis enthält.
+    """
+    
+    def __init__(self, cache: "Cache"):
+        self._cache = cache
+        self._ops: List[tuple] = []
+    
+    def _queue(self, method: str, *args, decode: bool = False, **kwargs) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._ops.append((method, args, kwargs, decode, future))
+        return future
+    
+    def get(self, key: str) -> asyncio.Future:
+        return self._queue('get', key, decode=True)
+    
+    def set(self, key: str, value: Any, expire: Optional[int] = None, tags: Iterable[str] = ()) -> asyncio.Future:
+        future = self._queue('set', key, self._cache._encode(value), ex=expire)
+        for tag in tags:
+            tag_key = self._cache.tag_key(tag)
+            self._queue('sadd', tag_key, key)
+            self._queue('expire', tag_key, self._cache._tag_expire(expire))
+        return future
+    
+    def delete(self, *keys: str) -> asyncio.Future:
+        return self._queue('delete', *keys)
+    
+    def incr(self, key: str, amount: int = 1) -> asyncio.Future:
+        return self._queue('incrby', key, amount)
+    
+    def expire(self, key: str, seconds: int) -> asyncio.Future:
+        return self._queue('expire', key, seconds)
+    
+    def ttl(self, key: str) -> asyncio.Future:
+        return self._queue('ttl', key)
+    
+    def publish(self, channel: str, message: str) -> asyncio.Future:
+        return self._queue('publish', channel, message)
+    
+    async def execute(self):
+        """Schickt alle gesammelten Operationen in einem Round-Trip."""
+        if not self._ops:
+            return
+        ops, self._ops = self._ops, []
+        try:
+            async with self._cache.redis.pipeline(transaction=False) as pipe:
+                for method, args, kwargs, _, _ in ops:
+                    getattr(pipe, method)(*args, **kwargs)
+                results = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Ausführen eines Cache-Batches: {e}")
+            results = [None] * len(ops)
+        
+        for (method, _, _, decode, future), result in zip(ops, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Fehler bei Batch-Operation {method}: {result}")
+                result = None
+            future.set_result(self._cache._decode(result) if decode else result)
+
 class Cache:
     """Redis-Cache-Manager."""
     
-    def __init__(self):
-        self.redis: Optional[redis.Redis] = None
+    def __init__(self, serializer: Optional[Serializer] = None):
+        self.redis: Optional[Union[GuardedRedis, MemoryRedis]] = None
+        # Kurze Deadline pro Befehl: bei einem Ausfall lieber sofort den Fallback liefern
+        self.operation_timeout: float = float(os.getenv('CACHE_OPERATION_TIMEOUT', '1.0'))
+        # Optionales Client-Side-Caching (CACHE_CLIENT_TRACKING=true)
+        self.tracking = None
+        self.breaker = CircuitBreaker(
+            "Redis",
+            probe=self._probe,
+            failure_types=(redis_exceptions.ConnectionError, redis_exceptions.TimeoutError, asyncio.TimeoutError, OSError)
+        )
+        self.serializer: Serializer = serializer or Serializer()
         self._internal_url: Optional[str] = None
         self._external_url: Optional[str] = None
+        self._token_bucket = None
+        self._release_lock = None
+        self._extend_lock = None
+        self._invalidate_tags = None
+        # Tag-Sets leben mindestens so lange; länger gültige Schlüssel verlängern sie beim Setzen
+        self.tag_ttl: int = int(os.getenv('CACHE_TAG_TTL', '86400'))
+        # Laufende Berechnungen pro Schlüssel (Single-Flight innerhalb des Prozesses)
+        self._inflight: Dict[str, asyncio.Task] = {}
     
     async def connect(self):
-        """Stellt Verbindung zu Redis her."""
+        """Stellt Verbindung zu Redis her oder startet das In-Memory-Backend (CACHE_BACKEND=memory)."""
+        if os.getenv('CACHE_BACKEND', 'redis').lower() == 'memory':
+            self.use_memory_backend(int(os.getenv('CACHE_MEMORY_LIMIT_MB', '64')) * 1024 * 1024)
+            logger.info("✅ ERFOLGREICH: In-Memory-Cache aktiv (ohne Redis)")
+            return
+        
         try:
             # Railway hat interne und externe URLs
             self._internal_url = os.getenv('REDIS_PRIVATE_URL')
@@ -27,13 +287,24 @@ class Cache:
             if not redis_url:
                 raise ValueError("Keine Redis-URL gefunden")
             
-            self.redis = redis.from_url(
+            connect_func = None
+            if os.getenv('CACHE_CLIENT_TRACKING', 'false').lower() == 'true':
+                from .client_tracking import ClientTracking
+                self.tracking = ClientTracking(redis_url)
+                connect_func = self.tracking.on_connect
+            
+            client = redis.from_url(
                 redis_url,
                 decode_responses=True,
-                socket_timeout=30,
-                socket_connect_timeout=30,
-                health_check_interval=30
+                socket_timeout=max(self.operation_timeout, 1.0),
+                socket_connect_timeout=max(self.operation_timeout, 1.0),
+                health_check_interval=30,
+                redis_connect_func=connect_func
             )
+            self.redis = GuardedRedis(client, self.breaker, self.operation_timeout)
+            # Vor dem Ping starten: der Listener verbindet sich selbst neu, falls Redis beim Start fehlt
+            if self.tracking:
+                self.tracking.start(client.connection_pool)
             
             # Teste die Verbindung
             await self.redis.ping()
@@ -42,48 +313,288 @@ class Cache:
             
         except Exception as e:
             logger.error(f"❌ FEHLER: Redis-Verbindung fehlgeschlagen: {e}")
+            if self.redis is not None:
+                # Sofort auf Fallbacks umschalten; die Probe meldet, wenn Redis wieder da ist
+                self.breaker.trip(e)
             raise
     
+    def subscriber_client(self) -> Union[redis.Redis, MemoryRedis]:
+        """Eigener Client für blockierende Abonnements; ohne socket_timeout läuft ein ruhiger Kanal nicht ab."""
+        if self.is_memory:
+            return self.redis
+        return redis.from_url(
+            self._internal_url or self._external_url,
+            decode_responses=True,
+            socket_timeout=None,
+            socket_connect_timeout=max(self.operation_timeout, 1.0),
+            socket_keepalive=True
+        )
+    
+    async def _probe(self):
+        await self.redis.client.ping()
+    
+    def use_memory_backend(self, max_memory: int = 64 * 1024 * 1024, backend: Optional[MemoryRedis] = None) -> MemoryRedis:
+        """Ersetzt Redis durch das In-Process-Backend (Einzelinstanz, Entwicklung, Benchmarks).
+
+        backend erlaubt eine vorbereitete Instanz, z.B. mit simulierter Netzwerklatenz in den Benchmarks.
+        """
+        backend = backend or MemoryRedis(max_memory=max_memory)
+        backend.define_script(TOKEN_BUCKET_LUA, lambda keys, args: _token_bucket_memory(backend, keys, args))
+        backend.define_script(RELEASE_LOCK_LUA, lambda keys, args: _release_lock_memory(backend, keys, args))
+        backend.define_script(EXTEND_LOCK_LUA, lambda keys, args: _extend_lock_memory(backend, keys, args))
+        backend.define_script(INVALIDATE_TAGS_LUA, lambda keys, args: _invalidate_tags_memory(backend, keys, args))
+        try:
+            backend.start()
+        except RuntimeError:
+            # Ohne laufenden Event-Loop verfallen Schlüssel nur beim Zugriff
+            pass
+        self.redis = backend
+        self._token_bucket = None
+        self._release_lock = None
+        self._extend_lock = None
+        self._invalidate_tags = None
+        return backend
+    
+    @property
+    def is_memory(self) -> bool:
+        """True, wenn der Cache im Prozess statt in Redis liegt."""
+        return isinstance(self.redis, MemoryRedis)
+    
     async def disconnect(self):
         """Schließt die Redis-Verbindung."""
+        self.breaker.stop()
+        if self.tracking:
+            await self.tracking.stop()
         if self.redis:
             await self.redis.aclose()
             logger.info("🔌 Redis-Verbindung geschlossen")
     
-    async def set(self, key: str, value: Any, expire: Optional[int] = None):
-        """Setzt einen Wert im Cache."""
+    def _encode(self, value: Any) -> str:
+        """Bereitet einen Wert zum Speichern vor."""
+        return self.serializer.dumps(value)
+    
+    def _decode(self, value: Any) -> Optional[Any]:
+        """Wandelt einen gespeicherten Wert zurück. Unlesbare Werte gelten als fehlend."""
         try:
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
+            return self.serializer.loads(value)
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Deserialisieren eines Cache-Werts: {e}")
+            return None
+    
+    @staticmethod
+    def tag_key(tag: str) -> str:
+        """Schlüssel des Sets, das alle Schlüssel eines Tags sammelt."""
+        return f"tag:{tag}"
+    
+    def _tag_expire(self, expire: Optional[int]) -> int:
+        return max(expire or 0, self.tag_ttl)
+    
+    async def set(self, key: str, value: Any, expire: Optional[int] = None, tags: Iterable[str] = ()):
+        """Setzt einen Wert im Cache. Mit tags wird der Schlüssel für invalidate_tag registriert."""
+        if self.tracking:
+            self.tracking.invalidate(key)
+        try:
+            tags = list(tags)
+            if not tags:
+                await self.redis.set(key, self._encode(value), ex=expire)
+                return
             
-            await self.redis.set(key, value, ex=expire)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(key, self._encode(value), ex=expire)
+                for tag in tags:
+                    pipe.sadd(self.tag_key(tag), key)
+                    pipe.expire(self.tag_key(tag), self._tag_expire(expire))
+                await pipe.execute()
             
         except Exception as e:
             logger.error(f"❌ Fehler beim Setzen von Cache-Wert {key}: {e}")
     
+    async def invalidate_tag(self, *tags: str) -> List[str]:
+        """Löscht alle Schlüssel, die unter einem der Tags gesetzt wurden, in einem Aufruf.
+        
+        Gibt die gelöschten Schlüssel zurück.
+        """
+        if not tags:
+            return []
+        try:
+            if self._invalidate_tags is None:
+                self._invalidate_tags = self.redis.register_script(INVALIDATE_TAGS_LUA)
+            return list(await self._invalidate_tags(keys=[self.tag_key(tag) for tag in tags]))
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Invalidieren von Tag {', '.join(tags)}: {e}")
+            return []
+    
     async def get(self, key: str) -> Optional[Any]:
         """Holt einen Wert aus dem Cache."""
         try:
-            value = await self.redis.get(key)
-            if value is None:
-                return None
-            
-            # Versuche JSON zu parsen
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return value
+            if self.tracking and self.tracking.active:
+                return await self.tracking.get(key, self.redis.get, self._decode)
+            return self._decode(await self.redis.get(key))
                 
         except Exception as e:
             logger.error(f"❌ Fehler beim Abrufen von Cache-Wert {key}: {e}")
             return None
     
-    async def delete(self, key: str):
-        """Löscht einen Wert aus dem Cache."""
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Holt mehrere Werte mit einem MGET. Fehlende Schlüssel fehlen im Ergebnis."""
+        keys = list(keys)
+        if not keys:
+            return {}
         try:
-            await self.redis.delete(key)
+            values = await self.redis.mget(keys)
         except Exception as e:
-            logger.error(f"❌ Fehler beim Löschen von Cache-Wert {key}: {e}")
+            logger.error(f"❌ Fehler beim Abrufen von {len(keys)} Cache-Werten: {e}")
+            return {}
+        return {key: self._decode(value) for key, value in zip(keys, values) if value is not None}
+    
+    async def set_many(self, mapping: Dict[str, Any], expire: Union[int, Dict[str, int], None] = None):
+        """Setzt mehrere Werte in einer Pipeline. expire gilt für alle oder ist pro Schlüssel angegeben."""
+        if not mapping:
+            return
+        if self.tracking:
+            self.tracking.invalidate(*mapping)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    ttl = expire.get(key) if isinstance(expire, dict) else expire
+                    pipe.set(key, self._encode(value), ex=ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Setzen von {len(mapping)} Cache-Werten: {e}")
+    
+    async def delete_many(self, keys: Iterable[str]):
+        """Löscht mehrere Werte mit einem DEL."""
+        await self.delete(*keys)
+    
+    @asynccontextmanager
+    async def batch(self):
+        """Sammelt Operationen im Block und schickt sie beim Verlassen in einer Pipeline.
+        
+        Beispiel:
+            async with cache.batch() as batch:
+                profile = batch.get("profile:123")
+                batch.set("last_seen:123", now, expire=3600)
+            print(profile.result())
+        """
+        batch = CacheBatch(self)
+        yield batch
+        await batch.execute()
+    
+    async def delete(self, *keys: str):
+        """Löscht einen oder mehrere Werte aus dem Cache."""
+        if not keys:
+            return
+        if self.tracking:
+            self.tracking.invalidate(*keys)
+        try:
+            await self.redis.delete(*keys)
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Löschen von Cache-Wert {', '.join(keys)}: {e}")
+    
+    async def get_or_compute(
+        self,
+        key: str,
+        ttl: int,
+        coro_fn: Callable[[], Awaitable[Any]],
+        beta: float = 1.0,
+        lock_timeout: float = 10.0
+    ) -> Any:
+        """Holt einen Wert oder berechnet ihn, ohne dass viele Coroutinen gleichzeitig rechnen.
+        
+        Im Prozess teilen sich gleichzeitige Aufrufe eine Berechnung, über Prozesse hinweg
+        entscheidet ein Redis-Lock. Kurz vor Ablauf wird mit steigender Wahrscheinlichkeit
+        vorzeitig neu berechnet (XFetch), damit nicht alle Aufrufer gleichzeitig ins Leere laufen.
+        Der Wert wird mit Metadaten gespeichert und sollte nur über diese Methode gelesen werden.
+        """
+        entry = await self.get(key)
+        if isinstance(entry, dict) and 'v' in entry:
+            # -delta * beta * ln(U) ist exponentialverteilt; teure Werte werden früher erneuert
+            early = entry['d'] * beta * -math.log(1.0 - random.random())
+            if time.time() + early < entry['e']:
+                return entry['v']
+            stale = entry
+        else:
+            stale = None
+        
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            # Eigener Task: bricht der erste Aufrufer ab, rechnet er für die übrigen weiter
+            inflight = asyncio.ensure_future(self._compute_locked(key, ttl, coro_fn, stale, lock_timeout))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda task: self._inflight.pop(key, None) if self._inflight.get(key) is task else None)
+        return await asyncio.shield(inflight)
+    
+    async def _compute_locked(
+        self,
+        key: str,
+        ttl: int,
+        coro_fn: Callable[[], Awaitable[Any]],
+        stale: Optional[Dict[str, Any]],
+        lock_timeout: float
+    ) -> Any:
+        """Berechnet einen Wert unter einem prozessübergreifenden Lock."""
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        acquired = await self.acquire_lock(lock_key, token, int(lock_timeout * 1000))
+        if acquired is None:
+            # Redis-Fehler: lieber selbst rechnen als gar nicht
+            acquired = True
+            token = None
+        
+        if not acquired:
+            # Ein anderer Prozess rechnet schon: alten Wert weiter ausliefern oder auf den neuen warten
+            if stale is not None:
+                return stale['v']
+            deadline = time.monotonic() + lock_timeout
+            delay = 0.05
+            while time.monotonic() < deadline:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 0.5)
+                entry = await self.get(key)
+                if isinstance(entry, dict) and 'v' in entry:
+                    return entry['v']
+            logger.warning(f"⚠️ Lock für {key} nicht freigegeben, berechne selbst")
+        
+        try:
+            started = time.monotonic()
+            value = await coro_fn()
+            delta = time.monotonic() - started
+            await self.set(key, {'v': value, 'd': delta, 'e': time.time() + ttl}, expire=ttl)
+            return value
+        finally:
+            if acquired and token:
+                await self.release_lock(lock_key, token)
+    
+    async def acquire_lock(self, key: str, token: str, ttl_ms: int) -> Optional[bool]:
+        """Setzt einen Lock mit Besitzer-Token und Ablaufzeit (SET NX PX).
+        
+        Gibt True/False zurück, bei einem Redis-Fehler None.
+        """
+        try:
+            return bool(await self.redis.set(key, token, nx=True, px=ttl_ms))
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Sperren von {key}: {e}")
+            return None
+    
+    async def extend_lock(self, key: str, token: str, ttl_ms: int) -> bool:
+        """Verlängert einen Lock, aber nur, solange er noch dem Token gehört."""
+        try:
+            if self._extend_lock is None:
+                self._extend_lock = self.redis.register_script(EXTEND_LOCK_LUA)
+            return bool(await self._extend_lock(keys=[key], args=[token, ttl_ms]))
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Verlängern des Locks {key}: {e}")
+            return False
+    
+    async def release_lock(self, key: str, token: str) -> bool:
+        """Gibt einen Lock frei, aber nur, solange er noch dem Token gehört."""
+        try:
+            if self._release_lock is None:
+                self._release_lock = self.redis.register_script(RELEASE_LOCK_LUA)
+            return bool(await self._release_lock(keys=[key], args=[token]))
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Freigeben des Locks {key}: {e}")
+            return False
     
     async def set_cooldown(self, key: str, seconds: int):
         """Setzt einen Cooldown."""
@@ -94,6 +605,37 @@ class Cache:
         value = await self.get(key)
         return value is not None
     
+    async def try_acquire_cooldown(self, key: str, seconds: int) -> Tuple[bool, int]:
+        """Prüft und setzt einen Cooldown atomar in einem Round-Trip (SET NX EX).
+        
+        Gibt (True, 0) zurück, wenn der Cooldown gesetzt wurde, sonst (False, verbleibende Sekunden).
+        """
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(key, "on_cooldown", ex=seconds, nx=True)
+                pipe.ttl(key)
+                acquired, ttl = await pipe.execute()
+            if acquired:
+                return True, 0
+            return False, max(1, ttl)
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Setzen von Cooldown {key}: {e}")
+            return True, 0
+    
+    async def consume_rate_limit(self, key: str, capacity: int, refill_per_second: float, cost: int = 1) -> Tuple[bool, float]:
+        """Zieht Tokens aus einem Token-Bucket, serverseitig per Lua-Skript in einem Aufruf.
+        
+        Gibt (erlaubt, Wartezeit in Sekunden bis zum nächsten erlaubten Aufruf) zurück.
+        """
+        try:
+            if self._token_bucket is None:
+                self._token_bucket = self.redis.register_script(TOKEN_BUCKET_LUA)
+            allowed, _, retry_after_ms = await self._token_bucket(keys=[key], args=[capacity, refill_per_second, cost])
+            return bool(allowed), retry_after_ms / 1000
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Rate-Limit {key}: {e}")
+            return True, 0.0
+    
     async def get_cooldown_remaining(self, key: str) -> int:
         """Gibt die verbleibende Cooldown-Zeit in Sekunden zurück."""
         try:
@@ -0,0 +1,138 @@
+# src/core/circuit_breaker.py
+"""
+Circuit Breaker für Redis und Postgres
+Nach mehreren Verbindungsfehlern in Folge wird der Client gesperrt: Aufrufe schlagen sofort fehl,
+statt bis zum Socket-Timeout zu hängen. Ein Hintergrund-Task prüft, wann der Dienst wieder da ist.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Der Dienst gilt als nicht erreichbar; der Aufruf wurde gar nicht erst versucht."""
+
+class CircuitBreaker:
+    """Zustandsautomat closed -> open -> closed mit Hintergrund-Probe."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(
+        self,
+        name: str,
+        probe: Optional[Callable[[], Awaitable[Any]]] = None,
+        failure_types: Tuple[Type[BaseException], ...] = (OSError, asyncio.TimeoutError),
+        failure_threshold: Optional[int] = None,
+        probe_interval: Optional[float] = None,
+        probe_timeout: float = 2.0
+    ):
+        self.name = name
+        self.probe = probe
+        self.failure_types = failure_types
+        self.failure_threshold: int = failure_threshold or int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))
+        self.probe_interval: float = probe_interval or float(os.getenv('CIRCUIT_PROBE_INTERVAL', '5'))
+        self.probe_timeout = probe_timeout
+        self.state: str = self.CLOSED
+        self.failures: int = 0
+        self.trips: int = 0
+        self.rejected: int = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._probe_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN
+
+    def check(self):
+        """Wirft CircuitOpenError, solange der Breaker offen ist."""
+        if self.state == self.OPEN:
+            self.rejected += 1
+            raise CircuitOpenError(f"{self.name} nicht erreichbar")
+
+    def is_failure(self, error: BaseException) -> bool:
+        """Nur Verbindungs- und Zeitfehler zählen, keine fachlichen Fehler wie Constraint-Verletzungen."""
+        return isinstance(error, self.failure_types)
+
+    def record_success(self):
+        self.failures = 0
+
+    def record_failure(self, error: BaseException):
+        self.failures += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+        if self.state == self.CLOSED and self.failures >= self.failure_threshold:
+            self.trip(error)
+
+    def trip(self, error: Optional[BaseException] = None):
+        """Öffnet den Breaker sofort und startet die Probe."""
+        if error is not None:
+            self.last_error = f"{type(error).__name__}: {error}"
+        if self.state != self.OPEN:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.trips += 1
+            logger.error(f"❌ {self.name} nicht erreichbar, Circuit Breaker geöffnet ({self.last_error})")
+        if self.probe and (self._probe_task is None or self._probe_task.done()):
+            try:
+                self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+            except RuntimeError:
+                pass
+
+    def reset(self):
+        """Schließt den Breaker wieder."""
+        if self.state == self.OPEN:
+            logger.info(f"✅ {self.name} wieder erreichbar, Circuit Breaker geschlossen")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+
+    async def _probe_loop(self):
+        """Prüft im Hintergrund, ob der Dienst wieder antwortet."""
+        while self.state == self.OPEN:
+            await asyncio.sleep(self.probe_interval)
+            try:
+                await asyncio.wait_for(self.probe(), self.probe_timeout)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                continue
+            self.reset()
+
+    async def call(self, awaitable: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Führt einen Aufruf mit Deadline aus und verbucht das Ergebnis."""
+        try:
+            self.check()
+        except CircuitOpenError:
+            # Nicht gestartete Coroutine schließen, sonst warnt Python "never awaited"
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise
+
+        try:
+            result = await asyncio.wait_for(awaitable, timeout)
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    def stop(self):
+        if self._probe_task:
+            self._probe_task.cancel()
+            self._probe_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Zustand für /status."""
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'trips': self.trips,
+            'rejected': self.rejected,
+            'open_for': time.monotonic() - self.opened_at if self.opened_at is not None else 0.0,
+            'last_error': self.last_error,
+        }
@@ -0,0 +1,155 @@
+# src/core/client_tracking.py
+"""
+Serverunterstütztes Client-Side-Caching für Redis (CLIENT TRACKING)
+Gelesene Schlüssel bleiben im Prozess, bis Redis eine Invalidierung schickt.
+Die Invalidierungen laufen über eine eigene Verbindung (REDIRECT auf __redis__:invalidate).
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import redis.asyncio as redis
+from redis import exceptions as redis_exceptions
+
+from .local_cache import _MISSING, LocalCache, _copy
+
+logger = logging.getLogger(__name__)
+
+class ClientTracking:
+    """Lokaler Spiegel gelesener Redis-Schlüssel, den der Server per Push invalidiert.
+
+    Solange die Invalidierungs-Verbindung nicht steht, wird nichts lokal ausgeliefert.
+    Abgelaufene Schlüssel werden invalidiert, sobald Redis sie tatsächlich löscht;
+    die lokale TTL begrenzt, wie lange das höchstens dauern kann.
+    """
+
+    CHANNEL = "__redis__:invalidate"
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self.local = LocalCache(
+            max_entries=int(os.getenv('CACHE_TRACKING_MAX_ENTRIES', '10000')),
+            ttl=float(os.getenv('CACHE_TRACKING_TTL', '300'))
+        )
+        # Größere Werte werden nicht lokal gehalten, damit der Speicher begrenzt bleibt
+        self.max_value_bytes: int = int(os.getenv('CACHE_TRACKING_MAX_VALUE_BYTES', '65536'))
+        self.redirect_id: Optional[int] = None
+        self.active: bool = False
+        self.hits: int = 0
+        self.misses: int = 0
+        self.invalidations: int = 0
+        # Zählt Invalidierungen; ändert er sich während eines GET, wird das Ergebnis nicht gespeichert
+        self._epoch: int = 0
+        self._data_pool: Optional[redis.ConnectionPool] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def on_connect(self, conn):
+        """Connect-Hook der Daten-Verbindungen: schaltet Tracking mit Umleitung auf den Listener ein."""
+        await conn.on_connect()
+        if self.redirect_id is None:
+            return
+        try:
+            await conn.send_command('CLIENT', 'TRACKING', 'ON', 'REDIRECT', self.redirect_id)
+            await conn.read_response()
+        except redis_exceptions.ResponseError as e:
+            # Z.B. Listener-Verbindung inzwischen weg: ohne Invalidierungen nichts lokal ausliefern
+            logger.warning(f"⚠️ CLIENT TRACKING konnte nicht aktiviert werden: {e}")
+            self._deactivate()
+
+    def start(self, data_pool: redis.ConnectionPool):
+        """Startet die Invalidierungs-Verbindung."""
+        self._data_pool = data_pool
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        self._deactivate()
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def _deactivate(self):
+        self.active = False
+        self.redirect_id = None
+        self._epoch += 1
+        self.local.clear()
+
+    async def _listen(self):
+        """Hält die Invalidierungs-Verbindung offen und verbindet bei Fehlern neu."""
+        while True:
+            pool = redis.ConnectionPool.from_url(self.redis_url, decode_responses=True, socket_timeout=None)
+            conn = pool.make_connection()
+            try:
+                await conn.connect()
+                await conn.send_command('CLIENT', 'ID')
+                client_id = await conn.read_response()
+                await conn.send_command('SUBSCRIBE', self.CHANNEL)
+                await conn.read_response()
+
+                self.redirect_id = client_id
+                # Bestehende Verbindungen ohne (oder mit veraltetem) Tracking neu aufbauen lassen
+                await self._data_pool.disconnect()
+                self._epoch += 1
+                self.local.clear()
+                self.active = True
+                logger.info(f"✅ Client-Side-Caching aktiv (Invalidierungen an Client {client_id})")
+
+                while True:
+                    message = await conn.read_response()
+                    if isinstance(message, list) and len(message) == 3 and message[0] == 'message':
+                        self._invalidate_keys(message[2])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._deactivate()
+                logger.warning(f"⚠️ Client-Side-Caching unterbrochen, verbinde neu: {e}")
+                await asyncio.sleep(5)
+            finally:
+                await conn.disconnect()
+                await pool.disconnect()
+
+    def _invalidate_keys(self, keys: Optional[list]):
+        self._epoch += 1
+        self.invalidations += 1
+        if keys is None:
+            # FLUSHDB/FLUSHALL
+            self.local.clear()
+        else:
+            self.local.delete(*keys)
+
+    def invalidate(self, *keys: str):
+        """Verwirft eigene Schreibzugriffe sofort, ohne auf den Push des Servers zu warten."""
+        self._epoch += 1
+        self.local.delete(*keys)
+
+    async def get(self, key: str, fetch: Callable[[str], Awaitable[Optional[str]]], decode: Callable[[Any], Any]) -> Any:
+        """Liefert einen Wert lokal oder holt ihn über fetch und merkt ihn sich."""
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return _copy(value)
+
+        self.misses += 1
+        epoch = self._epoch
+        raw = await fetch(key)
+        value = decode(raw)
+        if self.active and epoch == self._epoch and (raw is None or len(raw) <= self.max_value_bytes):
+            self.local.set(key, _copy(value))
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'active': self.active,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'invalidations': self.invalidations,
+            'size': len(self.local),
+        }
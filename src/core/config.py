@@ -15,10 +15,12 @@ class Config:
         # Database Settings
         self.database_url: str = os.getenv('DATABASE_URL', '')
         self.database_private_url: str = os.getenv('DATABASE_PRIVATE_URL', '')
+        self.database_replica_url: str = os.getenv('DATABASE_REPLICA_URL', '')
         
         # Redis Settings
         self.redis_url: str = os.getenv('REDIS_URL', '')
         self.redis_private_url: str = os.getenv('REDIS_PRIVATE_URL', '')
+        self.cache_backend: str = os.getenv('CACHE_BACKEND', 'redis').lower()
         
         # Environment
         self.environment: str = os.getenv('ENVIRONMENT', 'production')
@@ -42,7 +44,7 @@ class Config:
         if not (self.database_url or self.database_private_url):
             errors.append("DATABASE_URL fehlt")
         
-        if not (self.redis_url or self.redis_private_url):
+        if self.cache_backend != 'memory' and not (self.redis_url or self.redis_private_url):
             errors.append("REDIS_URL fehlt")
         
         if errors:
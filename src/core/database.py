@@ -1,17 +1,137 @@
+import asyncio
 import asyncpg
 import os
-from typing import Optional
+import json
+import time
+from functools import partial
+from typing import Any, Awaitable, Dict, Iterable, Optional, TypeVar
 import logging
 
+from .circuit_breaker import CircuitBreaker
+from .pool_metrics import InstrumentedPool, PoolMetrics
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+class TimedStatement:
+    """Vorbereitetes Statement, dessen Ausführungen in das Abfrage-Histogramm des Pools eingehen."""
+    
+    __slots__ = ('_statement', '_metrics')
+    
+    def __init__(self, statement: asyncpg.prepared_stmt.PreparedStatement, metrics: Optional[PoolMetrics]):
+        self._statement = statement
+        self._metrics = metrics
+    
+    def __getattr__(self, name: str):
+        return getattr(self._statement, name)
+    
+    async def _timed(self, awaitable: Awaitable[T]) -> T:
+        if self._metrics is None:
+            return await awaitable
+        return await self._metrics.timed(awaitable)
+    
+    async def fetch(self, *args, **kwargs):
+        return await self._timed(self._statement.fetch(*args, **kwargs))
+    
+    async def fetchrow(self, *args, **kwargs):
+        return await self._timed(self._statement.fetchrow(*args, **kwargs))
+    
+    async def fetchval(self, *args, **kwargs):
+        return await self._timed(self._statement.fetchval(*args, **kwargs))
+    
+    async def executemany(self, *args, **kwargs):
+        return await self._timed(self._statement.executemany(*args, **kwargs))
+
+class PixelConnection(asyncpg.Connection):
+    """asyncpg-Verbindung mit eigenen vorbereiteten Hot-Path-Statements und Messung jedes Statements."""
+    
+    __slots__ = ('prepared_statements', 'query_metrics')
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements: Dict[str, TimedStatement] = {}
+        # Wird im Init-Hook auf die Kennzahlen des eigenen Pools gesetzt
+        self.query_metrics: Optional[PoolMetrics] = None
+    
+    async def _timed(self, awaitable: Awaitable[T]) -> T:
+        if self.query_metrics is None:
+            return await awaitable
+        return await self.query_metrics.timed(awaitable)
+    
+    async def execute(self, *args, **kwargs):
+        return await self._timed(super().execute(*args, **kwargs))
+    
+    async def executemany(self, *args, **kwargs):
+        return await self._timed(super().executemany(*args, **kwargs))
+    
+    async def fetch(self, *args, **kwargs):
+        return await self._timed(super().fetch(*args, **kwargs))
+    
+    async def fetchrow(self, *args, **kwargs):
+        return await self._timed(super().fetchrow(*args, **kwargs))
+    
+    async def fetchval(self, *args, **kwargs):
+        return await self._timed(super().fetchval(*args, **kwargs))
+    
+    async def reset(self, *, timeout=None):
+        # Das Zurücksetzen bei der Rückgabe an den Pool ist keine Abfrage der Anwendung
+        metrics, self.query_metrics = self.query_metrics, None
+        try:
+            await super().reset(timeout=timeout)
+        finally:
+            self.query_metrics = metrics
+
 class Database:
     """Datenbank-Manager für PostgreSQL."""
     
     def __init__(self):
-        self.pool: Optional[asyncpg.Pool] = None
+        self.pool: Optional[InstrumentedPool] = None
         self._internal_url: Optional[str] = None
         self._external_url: Optional[str] = None
+        # Optionale Read-Replica für reine Lesezugriffe
+        self.replica_pool: Optional[InstrumentedPool] = None
+        self._replica_url: Optional[str] = None
+        # Spieler, die kürzlich geschrieben haben, lesen bis zu diesem Zeitpunkt vom Primary
+        self.replica_staleness: float = float(os.getenv('DATABASE_REPLICA_STALENESS', '5'))
+        self._recent_writes: Dict[int, float] = {}
+        # Zentrale Registry der Hot-Path-Statements (Name -> SQL)
+        self.statements: Dict[str, str] = {}
+        # Kurze Deadlines, damit ein Ausfall den Circuit Breaker auslöst statt Commands hängen zu lassen
+        self.acquire_timeout: float = float(os.getenv('DATABASE_ACQUIRE_TIMEOUT', '5'))
+        self.command_timeout: float = float(os.getenv('DATABASE_COMMAND_TIMEOUT', '10'))
+        # Für Schema, Migrationen und Importe, die bewusst länger laufen dürfen
+        self.bulk_timeout: float = 300.0
+    
+    def register_statement(self, name: str, sql: str):
+        """Registriert ein Statement, das auf jeder neuen Verbindung vorbereitet wird."""
+        if self.statements.get(name, sql) != sql:
+            raise ValueError(f"Statement '{name}' ist bereits mit anderem SQL registriert")
+        self.statements[name] = sql
+    
+    async def _init_connection(self, conn: PixelConnection, metrics: Optional[PoolMetrics] = None):
+        """Init-Hook des Pools: Codecs setzen und alle registrierten Statements vorbereiten."""
+        for type_name in ('json', 'jsonb'):
+            await conn.set_type_codec(type_name, encoder=json.dumps, decoder=json.loads, schema='pg_catalog')
+        
+        for name, sql in self.statements.items():
+            try:
+                conn.prepared_statements[name] = TimedStatement(await conn.prepare(sql), metrics)
+            except asyncpg.PostgresError as e:
+                # Z.B. vor dem ersten execute_schema(); wird dann bei Bedarf nachgeholt
+                logger.warning(f"⚠️ Statement '{name}' konnte nicht vorbereitet werden: {e}")
+        
+        # Erst ab hier messen, Codecs und Vorbereitung gehören nicht zu den Abfragen der Anwendung
+        conn.query_metrics = metrics
+    
+    async def prepared(self, conn, name: str) -> TimedStatement:
+        """Gibt das vorbereitete Statement `name` für diese Verbindung zurück."""
+        statements = conn.prepared_statements
+        statement = statements.get(name)
+        if statement is None:
+            # Verbindung wurde vor der Registrierung geöffnet
+            statement = statements[name] = TimedStatement(await conn.prepare(self.statements[name]), conn.query_metrics)
+        return statement
     
     async def connect(self):
         """Stellt Verbindung zur Datenbank her."""
@@ -26,25 +146,105 @@ class Database:
             if not database_url:
                 raise ValueError("Keine Datenbank-URL gefunden")
             
-            self.pool = await asyncpg.create_pool(
-                database_url,
-                min_size=1,
-                max_size=10,
-                command_timeout=60
-            )
+            self.pool = await self._create_pool(database_url, "Postgres")
             
-            logger.info("✅ ERFOLGREICH: Datenbankverbindung hergestellt")
+            logger.info(f"✅ ERFOLGREICH: Datenbankverbindung hergestellt ({len(self.statements)} Statements vorbereitet)")
             
         except Exception as e:
             logger.error(f"❌ FEHLER: Datenbankverbindung fehlgeschlagen: {e}")
             raise
+        
+        # Die Replica ist optional: ohne sie laufen alle Lesezugriffe über den Primary
+        self._replica_url = os.getenv('DATABASE_REPLICA_URL')
+        if self._replica_url:
+            try:
+                self.replica_pool = await self._create_pool(self._replica_url, "Postgres-Replica")
+                logger.info("✅ ERFOLGREICH: Read-Replica verbunden")
+            except Exception as e:
+                logger.warning(f"⚠️ WARNUNG: Read-Replica nicht erreichbar, Lesezugriffe nutzen den Primary: {e}")
+    
+    async def _create_pool(self, database_url: str, name: str) -> InstrumentedPool:
+        """Erstellt einen instrumentierten Pool mit Init-Hook und Circuit Breaker."""
+        min_size = int(os.getenv('DATABASE_POOL_MIN_SIZE', '2'))
+        max_size = int(os.getenv('DATABASE_POOL_MAX_SIZE', '10'))
+        
+        metrics = PoolMetrics()
+        # Alle min_size Verbindungen werden beim Erstellen parallel geöffnet und initialisiert
+        pool = await asyncpg.create_pool(
+            database_url,
+            min_size=min_size,
+            max_size=max_size,
+            command_timeout=self.command_timeout,
+            connection_class=PixelConnection,
+            init=partial(self._init_connection, metrics=metrics)
+        )
+        instrumented = InstrumentedPool(
+            pool,
+            min_size=min_size,
+            max_size=max_size,
+            adaptive=os.getenv('DATABASE_POOL_ADAPTIVE', 'false').lower() == 'true',
+            acquire_timeout=self.acquire_timeout,
+            metrics=metrics
+        )
+        instrumented.breaker = CircuitBreaker(
+            name,
+            probe=instrumented.probe,
+            failure_types=(
+                OSError, asyncio.TimeoutError, asyncpg.QueryCanceledError,
+                asyncpg.PostgresConnectionError, asyncpg.InterfaceError, asyncpg.CannotConnectNowError
+            )
+        )
+        return instrumented
+    
+    def mark_written(self, user_ids: Iterable[int]):
+        """Merkt Spieler vor, die gerade geschrieben haben, damit sie vorerst vom Primary lesen."""
+        until = time.monotonic() + self.replica_staleness
+        for user_id in user_ids:
+            self._recent_writes[user_id] = until
+        
+        if len(self._recent_writes) > 10000:
+            now = time.monotonic()
+            self._recent_writes = {uid: t for uid, t in self._recent_writes.items() if t > now}
+    
+    def reader(self, user_ids: Iterable[int] = ()) -> InstrumentedPool:
+        """Gibt den Pool für reine Lesezugriffe zurück.
+        
+        Das ist die Replica, außer einer der Spieler hat innerhalb von replica_staleness Sekunden geschrieben
+        oder der Circuit Breaker der Replica ist offen.
+        """
+        if not self.replica_pool or self.replica_pool.breaker.is_open:
+            return self.pool
+        now = time.monotonic()
+        for user_id in user_ids:
+            if self._recent_writes.get(user_id, 0) > now:
+                return self.pool
+        return self.replica_pool
     
     async def disconnect(self):
         """Schließt die Datenbankverbindung."""
+        if self.replica_pool:
+            await self.replica_pool.close()
         if self.pool:
             await self.pool.close()
             logger.info("🔌 Datenbankverbindung geschlossen")
     
+    def stats(self) -> Dict[str, Any]:
+        """Gibt Pool-Kennzahlen für Monitoring zurück."""
+        if not self.pool:
+            return {}
+        stats = self.pool.metrics.snapshot()
+        stats['size'] = self.pool.get_size()
+        stats['idle'] = self.pool.get_idle_size()
+        stats['limit'] = self.pool.limit
+        stats['adaptive'] = self.pool.adaptive
+        stats['breaker'] = self.pool.breaker.stats()
+        if self.replica_pool:
+            replica = self.replica_pool.metrics.snapshot()
+            replica['size'] = self.replica_pool.get_size()
+            replica['breaker'] = self.replica_pool.breaker.stats()
+            stats['replica'] = replica
+        return stats
+    
     async def execute_schema(self):
         """Führt das Schema aus data/schema.sql aus."""
         try:
@@ -55,7 +255,7 @@ class Database:
                     schema_sql = f.read()
                 
                 async with self.pool.acquire() as conn:
-                    await conn.execute(schema_sql)
+                    await conn.execute(schema_sql, timeout=self.bulk_timeout)
                 
                 logger.info("✅ ERFOLGREICH: Datenbankschema ausgeführt")
             else:
@@ -0,0 +1,143 @@
+# src/core/leader.py
+"""
+Lease-Locks mit Fencing-Tokens für Singleton-Jobs beim Start
+Bei mehreren Instanzen führt genau eine Migrationen, Schema, Emoji- und Command-Sync aus;
+die anderen warten auf das Ergebnis oder überspringen den Job.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+from .cache import Cache, cache, make_key
+
+logger = logging.getLogger(__name__)
+
+class LeaseLock:
+    """Zeitlich begrenzter Lock in Redis, der sich im Hintergrund selbst verlängert.
+
+    Jede erfolgreiche Übernahme bekommt einen streng steigenden Fencing-Token. Wer Seiteneffekte
+    außerhalb von Redis absichert, kann damit Schreibzugriffe eines abgelösten Besitzers erkennen.
+    """
+
+    def __init__(self, name: str, ttl: float = 30.0, backend: Cache = cache):
+        self.name = name
+        self.ttl = ttl
+        self.backend = backend
+        self.key = make_key("lease", name)
+        self.fence_key = make_key("lease", name, "fence")
+        self.owner: str = uuid.uuid4().hex
+        self.fence: Optional[int] = None
+        # Wird gesetzt, wenn die Verlängerung fehlschlägt und ein anderer übernehmen könnte
+        self.lost: asyncio.Event = asyncio.Event()
+        self._renewal: Optional[asyncio.Task] = None
+
+    @property
+    def held(self) -> bool:
+        return self.fence is not None and not self.lost.is_set()
+
+    async def acquire(self) -> bool:
+        """Versucht den Lock einmal zu übernehmen. Gibt True zurück, wenn er jetzt uns gehört."""
+        acquired = await self.backend.acquire_lock(self.key, self.owner, int(self.ttl * 1000))
+        if not acquired:
+            return False
+
+        try:
+            self.fence = await self.backend.redis.incr(self.fence_key)
+        except Exception as e:
+            logger.error(f"❌ Fencing-Token für {self.name} konnte nicht vergeben werden: {e}")
+            await self.backend.release_lock(self.key, self.owner)
+            return False
+
+        self.lost.clear()
+        self._renewal = asyncio.create_task(self._renew_loop())
+        return True
+
+    async def _renew_loop(self):
+        """Verlängert den Lock alle ttl/3 Sekunden, solange er gehalten wird."""
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            if not await self.backend.extend_lock(self.key, self.owner, int(self.ttl * 1000)):
+                logger.warning(f"⚠️ Lease {self.name} verloren (Token {self.fence})")
+                self.lost.set()
+                return
+
+    async def release(self):
+        """Stoppt die Verlängerung und gibt den Lock frei."""
+        if self._renewal:
+            self._renewal.cancel()
+            try:
+                await self._renewal
+            except asyncio.CancelledError:
+                pass
+            self._renewal = None
+        if self.fence is not None:
+            await self.backend.release_lock(self.key, self.owner)
+            self.fence = None
+
+    async def check_fence(self) -> bool:
+        """Prüft vor Seiteneffekten, ob wir den Lock noch halten und kein neuerer Besitzer einen Token bekam."""
+        if not self.held:
+            return False
+        try:
+            current = await self.backend.redis.get(self.fence_key)
+        except Exception as e:
+            logger.warning(f"⚠️ Fencing-Token für {self.name} nicht prüfbar: {e}")
+            return False
+        return current is not None and int(current) == self.fence
+
+async def run_singleton(
+    name: str,
+    job: Callable[[], Awaitable[Any]],
+    wait: bool = True,
+    ttl: float = 30.0,
+    backend: Cache = cache
+) -> Optional[Any]:
+    """Führt einen Start-Job clusterweit nur einmal pro Deployment aus.
+
+    Die Instanz mit dem Lock führt den Job aus und hinterlegt das Ergebnis. Die anderen warten darauf
+    (wait=True) oder überspringen ihn sofort; stirbt der Besitzer, übernimmt eine wartende Instanz.
+    Ohne Deployment-Kennung wird kein Ergebnis hinterlegt: der Lock verhindert nur parallele Läufe,
+    wartende Instanzen führen den Job danach selbst aus, und ein Neustart überspringt nichts.
+    Ohne erreichbaren Cache läuft der Job lokal, wie vor der Koordination.
+    """
+    if backend.redis is None or backend.breaker.is_open:
+        return await job()
+
+    deployment = os.getenv('DEPLOYMENT_ID') or os.getenv('RAILWAY_DEPLOYMENT_ID')
+    done_key = make_key("lease", name, "done", deployment) if deployment else None
+    done_ttl = int(os.getenv('SINGLETON_DONE_TTL', '600'))
+    lease = LeaseLock(name, ttl=ttl, backend=backend)
+    delay = 0.2
+
+    while True:
+        done = await backend.get(done_key) if done_key else None
+        if isinstance(done, dict):
+            logger.info(f"⏭️ {name} bereits von einer anderen Instanz erledigt (Token {done.get('fence')})")
+            return done.get('result')
+
+        if await lease.acquire():
+            started = time.monotonic()
+            try:
+                result = await job()
+                if not await lease.check_fence():
+                    # Ein anderer könnte den Job inzwischen ebenfalls ausführen: Ergebnis nicht als gültig hinterlegen
+                    logger.warning(f"⚠️ Lease {name} während des Jobs verloren (Token {lease.fence}), Ergebnis nicht hinterlegt")
+                    return result
+                if done_key:
+                    await backend.set(done_key, {'fence': lease.fence, 'result': result}, expire=done_ttl)
+                logger.info(f"✅ {name} als Leader ausgeführt (Token {lease.fence}, {time.monotonic() - started:.1f}s)")
+                return result
+            finally:
+                await lease.release()
+
+        if not wait:
+            logger.info(f"⏭️ {name} läuft bereits auf einer anderen Instanz, übersprungen")
+            return None
+
+        # Auf das Ergebnis des Leaders warten; läuft sein Lock aus, versuchen wir es selbst
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 2.0)
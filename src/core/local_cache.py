@@ -0,0 +1,194 @@
+# src/core/local_cache.py
+"""
+Zweistufiger Cache: In-Process-L1 (LRU mit TTL) vor dem Redis-Cache
+Invalidierungen werden per Redis Pub/Sub an alle Bot-Prozesse verteilt
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .cache import Cache, cache
+
+logger = logging.getLogger(__name__)
+
+# Markiert "nicht im L1" und unterscheidet das von einem gecachten None
+_MISSING = object()
+
+def _copy(value: Any) -> Any:
+    """Veränderliche Werte kopieren, damit Aufrufer den gemeinsamen L1-Eintrag nicht verändern."""
+    if isinstance(value, (dict, list, set)):
+        return copy.deepcopy(value)
+    return value
+
+class LocalCache:
+    """Begrenzter LRU-Cache mit TTL für bereits deserialisierte Objekte."""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """Gibt den Wert zurück oder _MISSING, wenn er fehlt oder abgelaufen ist."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Speichert einen Wert und verdrängt bei Bedarf den am längsten ungenutzten."""
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+class TieredCache:
+    """L1 im Prozess, L2 in Redis. Schreibende Zugriffe benachrichtigen alle anderen Prozesse."""
+
+    CHANNEL = "cache:invalidate"
+
+    def __init__(self, backend: Cache):
+        self.backend = backend
+        self.local = LocalCache(
+            max_entries=int(os.getenv('LOCAL_CACHE_MAX_ENTRIES', '10000')),
+            ttl=float(os.getenv('LOCAL_CACHE_TTL', '30'))
+        )
+        # Eigene Nachrichten erkennen, damit frisch gesetzte Werte nicht sofort verworfen werden
+        self.instance_id: str = uuid.uuid4().hex
+        self.l1_hits: int = 0
+        self.l2_hits: int = 0
+        self.misses: int = 0
+        # Zählt Invalidierungen; ändert er sich während eines GET, wird das Ergebnis nicht ins L1 übernommen
+        self._epoch: int = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Holt einen Wert zuerst aus dem L1, dann aus Redis."""
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self.l1_hits += 1
+            return _copy(value)
+
+        epoch = self._epoch
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.l2_hits += 1
+        if epoch == self._epoch:
+            self.local.set(key, _copy(value))
+        return value
+
+    async def set(self, key: str, value: Any, expire: Optional[int] = None, tags: Iterable[str] = ()):
+        """Setzt einen Wert in beiden Stufen und invalidiert ihn in den anderen Prozessen."""
+        self._epoch += 1
+        self.local.set(key, _copy(value), ttl=min(expire, self.local.ttl) if expire else None)
+        async with self.backend.batch() as batch:
+            batch.set(key, value, expire=expire, tags=tags)
+            self._publish(batch, [key])
+
+    async def delete(self, *keys: str):
+        """Löscht Werte in beiden Stufen und in allen anderen Prozessen."""
+        if not keys:
+            return
+        self._epoch += 1
+        self.local.delete(*keys)
+        async with self.backend.batch() as batch:
+            batch.delete(*keys)
+            self._publish(batch, keys)
+
+    async def invalidate_tag(self, *tags: str) -> List[str]:
+        """Löscht alle Schlüssel der Tags in Redis und in den L1-Caches aller Prozesse."""
+        keys = await self.backend.invalidate_tag(*tags)
+        if keys:
+            self._epoch += 1
+            self.local.delete(*keys)
+            async with self.backend.batch() as batch:
+                self._publish(batch, keys)
+        return keys
+
+    def _publish(self, batch, keys: Iterable[str]):
+        message = json.dumps({'origin': self.instance_id, 'keys': list(keys)})
+        batch.publish(self.CHANNEL, message)
+
+    def start(self):
+        """Startet den Pub/Sub-Listener für Invalidierungen."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self):
+        """Verwirft L1-Einträge, die ein anderer Prozess geändert hat."""
+        while True:
+            client = pubsub = None
+            try:
+                # Eigene Verbindung ohne Lese-Timeout: ein ruhiger Kanal ist kein Fehler
+                client = self.backend.subscriber_client()
+                pubsub = client.pubsub()
+                await pubsub.subscribe(self.CHANNEL)
+                # Während der Verbindungslücke könnten Invalidierungen verloren gegangen sein
+                self._epoch += 1
+                self.local.clear()
+                async for message in pubsub.listen():
+                    if message.get('type') != 'message':
+                        continue
+                    payload = json.loads(message['data'])
+                    if payload.get('origin') != self.instance_id:
+                        self._epoch += 1
+                        self.local.delete(*payload.get('keys', []))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Cache-Invalidierung unterbrochen, verbinde neu: {e}")
+                await asyncio.sleep(5)
+            finally:
+                if pubsub is not None:
+                    await pubsub.aclose()
+                if client is not None and client is not self.backend.redis:
+                    await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Gibt Trefferquoten pro Stufe zurück."""
+        total = self.l1_hits + self.l2_hits + self.misses
+        return {
+            'l1_hits': self.l1_hits,
+            'l2_hits': self.l2_hits,
+            'misses': self.misses,
+            'l1_hit_rate': self.l1_hits / total if total else 0.0,
+            'l2_hit_rate': self.l2_hits / total if total else 0.0,
+            'l1_size': len(self.local),
+        }
+
+# Globale zweistufige Cache-Instanz
+tiered_cache = TieredCache(cache)
@@ -0,0 +1,415 @@
+# src/core/memory_backend.py
+"""
+In-Process-Backend für den Cache (Einzelinstanz-Betrieb und lokale Entwicklung)
+Bildet den Teil der redis.asyncio-API nach, den der Bot nutzt: Strings, Zähler, Sets, TTLs,
+Pipelines, Skripte und Pub/Sub. LRU-Verdrängung innerhalb eines Speicherbudgets,
+Ablauf über ein Timing-Wheel statt eines Timers pro Schlüssel.
+"""
+
+import asyncio
+import logging
+import math
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Grobe Verwaltungskosten pro Eintrag (Dict-Slot, Tupel, Wheel-Eintrag)
+ENTRY_OVERHEAD = 96
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'size')
+
+    def __init__(self, value: Any, expires_at: Optional[float], size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+class TimingWheel:
+    """Hashed Timing-Wheel: Ablaufzeiten landen in Sekunden-Slots, ein Tick prüft nur den fälligen Slot."""
+
+    def __init__(self, slots: int = 3600):
+        self.slots = slots
+        self._wheel: List[Set[str]] = [set() for _ in range(slots)]
+        self._cursor: int = int(time.time())
+
+    def add(self, key: str, expires_at: float):
+        # Aufrunden, damit ein Schlüssel nie vor seiner Ablaufzeit geprüft wird
+        self._wheel[math.ceil(expires_at) % self.slots].add(key)
+
+    def discard(self, key: str, expires_at: float):
+        self._wheel[math.ceil(expires_at) % self.slots].discard(key)
+
+    def advance(self, now: float) -> List[str]:
+        """Gibt die Kandidaten aller Slots bis einschließlich jetzt zurück.
+
+        Schlüssel mit mehr als einer Umdrehung Restzeit bleiben liegen; der Aufrufer prüft die echte Ablaufzeit.
+        """
+        due: List[str] = []
+        target = int(now)
+        # Nach langer Pause höchstens eine volle Umdrehung abarbeiten
+        start = max(self._cursor, target - self.slots + 1)
+        for second in range(start, target + 1):
+            bucket = self._wheel[second % self.slots]
+            if bucket:
+                due.extend(bucket)
+                bucket.clear()
+        self._cursor = target + 1
+        return due
+
+class MemoryScript:
+    """Gegenstück zu redis.commands.core.AsyncScript für Skripte mit Python-Implementierung."""
+
+    def __init__(self, handler: Callable[..., Any]):
+        self._handler = handler
+
+    async def __call__(self, keys: List[str] = (), args: List[Any] = (), client=None):
+        return self._handler(list(keys), list(args))
+
+class MemoryPipeline:
+    """Sammelt Befehle und führt sie ohne Unterbrechung aus (damit auch als Transaktion gültig)."""
+
+    def __init__(self, backend: "MemoryRedis"):
+        self._backend = backend
+        self._commands: List[tuple] = []
+
+    async def __aenter__(self) -> "MemoryPipeline":
+        return self
+
+    async def __aexit__(self, *exc):
+        self._commands.clear()
+
+    def __getattr__(self, name: str):
+        method = getattr(self._backend, f"_{name}", None)
+        if method is None:
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        commands, self._commands = self._commands, []
+        results = []
+        for method, args, kwargs in commands:
+            try:
+                results.append(method(*args, **kwargs))
+            except Exception as e:
+                if raise_on_error:
+                    raise
+                results.append(e)
+        return results
+
+class MemoryPubSub:
+    """Pub/Sub innerhalb des Prozesses."""
+
+    def __init__(self, backend: "MemoryRedis"):
+        self._backend = backend
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._channels: Set[str] = set()
+
+    async def subscribe(self, *channels: str):
+        for channel in channels:
+            self._channels.add(channel)
+            self._backend._subscribers.setdefault(channel, set()).add(self)
+            self._queue.put_nowait({'type': 'subscribe', 'channel': channel, 'data': len(self._channels)})
+
+    async def listen(self):
+        while True:
+            yield await self._queue.get()
+
+    async def aclose(self):
+        for channel in self._channels:
+            self._backend._subscribers.get(channel, set()).discard(self)
+        self._channels.clear()
+
+class MemoryRedis:
+    """Redis-Ersatz im Speicher mit LRU-Verdrängung, Speicherbudget und Timing-Wheel-TTL.
+
+    Werte werden wie bei decode_responses=True als Strings gespeichert.
+    """
+
+    def __init__(self, max_memory: int = 64 * 1024 * 1024, tick_interval: float = 1.0):
+        self.max_memory = max_memory
+        self.tick_interval = tick_interval
+        self._data: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._wheel = TimingWheel()
+        self._scripts: Dict[str, Callable[..., Any]] = {}
+        self._subscribers: Dict[str, Set[MemoryPubSub]] = {}
+        self.memory_used: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+        self._ticker: Optional[asyncio.Task] = None
+
+    # --- Verwaltung ---
+
+    def start(self):
+        """Startet den Ablauf-Tick (braucht einen laufenden Event-Loop)."""
+        if self._ticker is None or self._ticker.done():
+            self._ticker = asyncio.create_task(self._tick_loop())
+
+    async def _tick_loop(self):
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            self._expire_due(time.time())
+
+    def _expire_due(self, now: float):
+        for key in self._wheel.advance(now):
+            entry = self._data.get(key)
+            if entry is None or entry.expires_at is None:
+                continue
+            if entry.expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+            else:
+                # Noch nicht fällig (mehr als eine Umdrehung entfernt): wieder einsortieren
+                self._wheel.add(key, entry.expires_at)
+
+    @staticmethod
+    def _sizeof(key: str, value: Any) -> int:
+        if isinstance(value, str):
+            size = len(value)
+        elif isinstance(value, (set, dict)):
+            size = sum(len(str(item)) for item in value) + 32 * len(value)
+            if isinstance(value, dict):
+                size += sum(len(str(item)) for item in value.values())
+        else:
+            size = sys.getsizeof(value)
+        return len(key) + size + ENTRY_OVERHEAD
+
+    def _lookup(self, key: str) -> Optional[_Entry]:
+        """Holt einen Eintrag, lässt abgelaufene sofort verfallen und markiert ihn als zuletzt genutzt."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= time.time():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, value: Any, expires_at: Optional[float]):
+        old = self._data.get(key)
+        if old is not None:
+            self._remove(key)
+        entry = _Entry(value, expires_at, self._sizeof(key, value))
+        self._data[key] = entry
+        self.memory_used += entry.size
+        if expires_at is not None:
+            self._wheel.add(key, expires_at)
+        self._evict()
+
+    def _resize(self, key: str, entry: _Entry):
+        size = self._sizeof(key, entry.value)
+        self.memory_used += size - entry.size
+        entry.size = size
+        self._evict()
+
+    def _set_expiry(self, entry: _Entry, key: str, expires_at: Optional[float]):
+        if entry.expires_at is not None:
+            self._wheel.discard(key, entry.expires_at)
+        entry.expires_at = expires_at
+        if expires_at is not None:
+            self._wheel.add(key, expires_at)
+
+    def _remove(self, key: str) -> bool:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self.memory_used -= entry.size
+        if entry.expires_at is not None:
+            self._wheel.discard(key, entry.expires_at)
+        return True
+
+    def _evict(self):
+        while self.memory_used > self.max_memory and len(self._data) > 1:
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
+
+    def define_script(self, script: str, handler: Callable[[List[str], List[Any]], Any]):
+        """Hinterlegt die Python-Implementierung eines Lua-Skripts."""
+        self._scripts[script] = handler
+
+    # --- Befehle (synchron, von Pipeline und async-API gemeinsam genutzt) ---
+
+    def _ping(self) -> bool:
+        return True
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self._lookup(key)
+        if entry is None:
+            return None
+        if not isinstance(entry.value, str):
+            raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return entry.value
+
+    def _mget(self, keys: List[str]) -> List[Optional[str]]:
+        results = []
+        for key in keys:
+            entry = self._lookup(key)
+            results.append(entry.value if entry is not None and isinstance(entry.value, str) else None)
+        return results
+
+    def _set(self, key: str, value: Any, ex: Optional[int] = None, px: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        if nx and self._lookup(key) is not None:
+            return None
+        if ex is not None:
+            expires_at = time.time() + ex
+        elif px is not None:
+            expires_at = time.time() + px / 1000
+        else:
+            expires_at = None
+        self._store(key, str(value) if not isinstance(value, str) else value, expires_at)
+        return True
+
+    def _delete(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._lookup(key) is not None and self._remove(key))
+
+    def _exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._lookup(key) is not None)
+
+    def _incrby(self, key: str, amount: int = 1) -> int:
+        entry = self._lookup(key)
+        if entry is None:
+            self._store(key, str(amount), None)
+            return amount
+        try:
+            value = int(entry.value) + amount
+        except (TypeError, ValueError):
+            raise ValueError("ERR value is not an integer or out of range")
+        entry.value = str(value)
+        self._resize(key, entry)
+        return value
+
+    def _incr(self, key: str, amount: int = 1) -> int:
+        return self._incrby(key, amount)
+
+    def _expire(self, key: str, seconds: int) -> bool:
+        return self._expireat(key, time.time() + seconds)
+
+    def _pexpire(self, key: str, milliseconds: int) -> bool:
+        return self._expireat(key, time.time() + milliseconds / 1000)
+
+    def _expireat(self, key: str, when: float) -> bool:
+        entry = self._lookup(key)
+        if entry is None:
+            return False
+        if when <= time.time():
+            self._remove(key)
+            return True
+        self._set_expiry(entry, key, when)
+        return True
+
+    def _ttl(self, key: str) -> int:
+        entry = self._lookup(key)
+        if entry is None:
+            return -2
+        if entry.expires_at is None:
+            return -1
+        return max(0, round(entry.expires_at - time.time()))
+
+    def _sadd(self, key: str, *members: str) -> int:
+        entry = self._lookup(key)
+        if entry is None:
+            self._store(key, set(), None)
+            entry = self._data[key]
+        before = len(entry.value)
+        entry.value.update(str(member) for member in members)
+        self._resize(key, entry)
+        return len(entry.value) - before
+
+    def _srem(self, key: str, *members: str) -> int:
+        entry = self._lookup(key)
+        if entry is None:
+            return 0
+        before = len(entry.value)
+        entry.value.difference_update(str(member) for member in members)
+        if not entry.value:
+            self._remove(key)
+        else:
+            self._resize(key, entry)
+        return before - len(entry.value)
+
+    def _smembers(self, key: str) -> Set[str]:
+        entry = self._lookup(key)
+        return set(entry.value) if entry is not None else set()
+
+    def _spop(self, key: str, count: Optional[int] = None):
+        entry = self._lookup(key)
+        if entry is None:
+            return [] if count is not None else None
+        popped = [entry.value.pop() for _ in range(min(count or 1, len(entry.value)))]
+        if not entry.value:
+            self._remove(key)
+        else:
+            self._resize(key, entry)
+        return popped if count is not None else popped[0]
+
+    def _hmget(self, key: str, *fields: str) -> List[Optional[str]]:
+        entry = self._lookup(key)
+        values = entry.value if entry is not None else {}
+        return [values.get(field) for field in fields]
+
+    def _hset(self, key: str, mapping: Dict[str, Any]) -> int:
+        entry = self._lookup(key)
+        if entry is None:
+            self._store(key, {}, None)
+            entry = self._data[key]
+        added = sum(1 for field in mapping if field not in entry.value)
+        entry.value.update({field: str(value) for field, value in mapping.items()})
+        self._resize(key, entry)
+        return added
+
+    def _publish(self, channel: str, message: str) -> int:
+        subscribers = self._subscribers.get(channel, set())
+        for subscriber in subscribers:
+            subscriber._queue.put_nowait({'type': 'message', 'channel': channel, 'data': message})
+        return len(subscribers)
+
+    # --- async-API wie redis.asyncio.Redis ---
+
+    def __getattr__(self, name: str):
+        sync = getattr(type(self), f"_{name}", None)
+        if sync is None or name.startswith('_'):
+            raise AttributeError(name)
+        bound = sync.__get__(self)
+
+        async def command(*args, **kwargs):
+            return bound(*args, **kwargs)
+        return command
+
+    def pipeline(self, transaction: bool = True) -> MemoryPipeline:
+        return MemoryPipeline(self)
+
+    def pubsub(self) -> MemoryPubSub:
+        return MemoryPubSub(self)
+
+    def register_script(self, script: str) -> MemoryScript:
+        handler = self._scripts.get(script)
+        if handler is None:
+            raise NotImplementedError("Für dieses Lua-Skript gibt es keine In-Memory-Implementierung")
+        return MemoryScript(handler)
+
+    async def aclose(self):
+        if self._ticker:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+            self._ticker = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Kennzahlen für /info."""
+        return {
+            'keys': len(self._data),
+            'memory_used': self.memory_used,
+            'max_memory': self.max_memory,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
@@ -0,0 +1,203 @@
+# src/core/pool_metrics.py
+"""
+Instrumentierung und adaptive Größe für den asyncpg-Pool
+Misst Wartezeit, Auslastung, Haltedauer der Verbindungen und Timeouts für jedes db.pool.acquire()
+sowie die Dauer jedes einzelnen Statements
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Dict, List, Optional, Sequence, TypeVar
+
+import asyncpg
+
+from .circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Obergrenzen der Haltedauer-Buckets in Millisekunden (letzter Bucket: darüber)
+# Gemessen wird von acquire() bis zur Rückgabe, also alle Abfragen eines Blocks samt Python-Code dazwischen
+HOLD_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+# Obergrenzen der Abfragedauer-Buckets in Millisekunden, gemessen um jedes einzelne Statement
+QUERY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 1000, 5000)
+
+T = TypeVar('T')
+
+def _record(histogram: List[int], bounds: Sequence[float], duration: float):
+    """Zählt eine Dauer in Sekunden in den passenden Bucket."""
+    duration_ms = duration * 1000
+    for i, bound in enumerate(bounds):
+        if duration_ms <= bound:
+            histogram[i] += 1
+            return
+    histogram[-1] += 1
+
+def _labels(bounds: Sequence[float]) -> List[str]:
+    return [f"≤{bound}ms" for bound in bounds] + [f">{bounds[-1]}ms"]
+
+class PoolMetrics:
+    """Sammelt Kennzahlen über die Nutzung des Datenbank-Pools."""
+
+    def __init__(self):
+        self.acquire_count: int = 0
+        self.acquire_wait_total: float = 0.0
+        self.acquire_wait_max: float = 0.0
+        self.in_use: int = 0
+        self.in_use_peak: int = 0
+        # Spitze seit der letzten Größenanpassung
+        self.window_peak: int = 0
+        self.timeouts: int = 0
+        self.hold_histogram = [0] * (len(HOLD_BUCKETS_MS) + 1)
+        self.query_count: int = 0
+        self.query_histogram = [0] * (len(QUERY_BUCKETS_MS) + 1)
+
+    def record_acquire(self, wait: float):
+        """Verbucht ein erfolgreiches acquire() mit seiner Wartezeit in Sekunden."""
+        self.acquire_count += 1
+        self.acquire_wait_total += wait
+        self.acquire_wait_max = max(self.acquire_wait_max, wait)
+        self.in_use += 1
+        self.in_use_peak = max(self.in_use_peak, self.in_use)
+        self.window_peak = max(self.window_peak, self.in_use)
+
+    def record_release(self, duration: float):
+        """Verbucht die Rückgabe einer Verbindung mit ihrer Haltedauer in Sekunden."""
+        self.in_use -= 1
+        _record(self.hold_histogram, HOLD_BUCKETS_MS, duration)
+
+    def record_query(self, duration: float):
+        """Verbucht die Ausführungsdauer eines Statements in Sekunden."""
+        self.query_count += 1
+        _record(self.query_histogram, QUERY_BUCKETS_MS, duration)
+
+    async def timed(self, awaitable: Awaitable[T]) -> T:
+        """Wartet auf ein Statement und verbucht seine Dauer, auch wenn es fehlschlägt."""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.record_query(time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Gibt die aktuellen Kennzahlen als Dictionary zurück."""
+        return {
+            'acquire_count': self.acquire_count,
+            'acquire_wait_avg_ms': self.acquire_wait_total / self.acquire_count * 1000 if self.acquire_count else 0.0,
+            'acquire_wait_max_ms': self.acquire_wait_max * 1000,
+            'in_use': self.in_use,
+            'in_use_peak': self.in_use_peak,
+            'timeouts': self.timeouts,
+            'hold_histogram': dict(zip(_labels(HOLD_BUCKETS_MS), self.hold_histogram)),
+            'query_count': self.query_count,
+            'query_histogram': dict(zip(_labels(QUERY_BUCKETS_MS), self.query_histogram)),
+        }
+
+class InstrumentedPool:
+    """Hülle um asyncpg.Pool, die jedes acquire() misst und optional die nutzbare Größe anpasst.
+
+    Im adaptiven Modus wird die Anzahl gleichzeitig nutzbarer Verbindungen zwischen min_size und
+    max_size verschoben: steigt die mittlere Wartezeit, wächst das Limit; bleibt der Pool ungenutzt,
+    schrumpft es wieder und asyncpg schließt die überzähligen Verbindungen nach ihrer Leerlaufzeit.
+    """
+
+    def __init__(self, pool: asyncpg.Pool, min_size: int, max_size: int, adaptive: bool = False,
+                 adjust_interval: float = 10.0, grow_wait_ms: float = 50.0, shrink_wait_ms: float = 5.0,
+                 breaker: Optional[CircuitBreaker] = None, acquire_timeout: Optional[float] = None,
+                 metrics: Optional[PoolMetrics] = None):
+        self._pool = pool
+        self.breaker = breaker
+        self.acquire_timeout = acquire_timeout
+        # Wird vor dem Pool erstellt, damit die Verbindungen ihre Statements hier verbuchen können
+        self.metrics = metrics or PoolMetrics()
+        self.min_size = min_size
+        self.max_size = max_size
+        self.adaptive = adaptive
+        self.limit: int = min_size if adaptive else max_size
+        self.adjust_interval = adjust_interval
+        self.grow_wait_ms = grow_wait_ms
+        self.shrink_wait_ms = shrink_wait_ms
+        self._reserved: int = 0
+        self._slots = asyncio.Condition()
+        self._adjust_task: Optional[asyncio.Task] = None
+        if adaptive:
+            self._adjust_task = asyncio.create_task(self._adjust_loop())
+
+    def __getattr__(self, name: str):
+        # Alles andere (close, get_size, execute, ...) direkt an den Pool weiterreichen
+        return getattr(self._pool, name)
+
+    @asynccontextmanager
+    async def acquire(self, timeout: Optional[float] = None):
+        """Wie asyncpg.Pool.acquire(), aber mit Messung, adaptivem Limit und Circuit Breaker."""
+        if self.breaker:
+            self.breaker.check()
+        if timeout is None:
+            timeout = self.acquire_timeout
+        start = time.perf_counter()
+        try:
+            if self.adaptive:
+                async with self._slots:
+                    await asyncio.wait_for(self._slots.wait_for(lambda: self._reserved < self.limit), timeout)
+                    self._reserved += 1
+            try:
+                remaining = None if timeout is None else max(0.0, timeout - (time.perf_counter() - start))
+                async with self._pool.acquire(timeout=remaining) as conn:
+                    acquired = time.perf_counter()
+                    self.metrics.record_acquire(acquired - start)
+                    try:
+                        yield conn
+                    finally:
+                        self.metrics.record_release(time.perf_counter() - acquired)
+            finally:
+                if self.adaptive:
+                    async with self._slots:
+                        self._reserved -= 1
+                        self._slots.notify()
+        except (asyncio.TimeoutError, asyncpg.QueryCanceledError) as e:
+            self.metrics.timeouts += 1
+            if self.breaker:
+                self.breaker.record_failure(e)
+            raise
+        except Exception as e:
+            if self.breaker and self.breaker.is_failure(e):
+                self.breaker.record_failure(e)
+            raise
+        else:
+            if self.breaker:
+                self.breaker.record_success()
+
+    async def probe(self):
+        """Prüft am Breaker vorbei, ob die Datenbank wieder antwortet."""
+        await self._pool.fetchval("SELECT 1")
+
+    async def close(self):
+        """Stoppt die Größenanpassung und die Probe und schließt den Pool."""
+        if self.breaker:
+            self.breaker.stop()
+        if self._adjust_task:
+            self._adjust_task.cancel()
+            self._adjust_task = None
+        await self._pool.close()
+
+    async def _adjust_loop(self):
+        """Passt das Limit periodisch an die beobachtete Wartezeit an."""
+        last_count, last_wait = 0, 0.0
+        while True:
+            await asyncio.sleep(self.adjust_interval)
+            count = self.metrics.acquire_count - last_count
+            wait = self.metrics.acquire_wait_total - last_wait
+            last_count, last_wait = self.metrics.acquire_count, self.metrics.acquire_wait_total
+            avg_wait_ms = wait / count * 1000 if count else 0.0
+            peak = self.metrics.window_peak
+            self.metrics.window_peak = self.metrics.in_use
+
+            if avg_wait_ms > self.grow_wait_ms and self.limit < self.max_size:
+                self.limit += 1
+                logger.info(f"📈 DB-Pool vergrößert auf {self.limit} (Wartezeit {avg_wait_ms:.1f}ms)")
+                async with self._slots:
+                    self._slots.notify()
+            elif avg_wait_ms < self.shrink_wait_ms and peak < self.limit - 1 and self.limit > self.min_size:
+                self.limit -= 1
+                logger.info(f"📉 DB-Pool verkleinert auf {self.limit} (Spitze {peak} Verbindungen)")
@@ -0,0 +1,90 @@
+# src/core/serializer.py
+"""
+Serialisierung von Cache-Werten
+Werte werden mit einem Typ-Tag gespeichert, damit "123" als String und 123 als Zahl zurückkommt.
+Große Werte werden komprimiert; Werte ohne Präfix stammen aus dem alten Format und bleiben lesbar.
+"""
+
+import base64
+import json
+import logging
+import os
+import zlib
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+class Serializer:
+    """Wandelt Cache-Werte in Strings um und zurück.
+
+    Format: "<prefix><tag><payload>" mit den Tags
+        s = String unverändert
+        j = JSON
+        z = JSON, zlib-komprimiert und Base64-kodiert
+    Redis läuft mit decode_responses=True, deshalb bleibt alles Text.
+    """
+
+    PREFIX = "\x1fv1:"
+
+    def __init__(self, compress_threshold: Optional[int] = None, compress_level: int = 6):
+        self.compress_threshold: int = compress_threshold if compress_threshold is not None else int(
+            os.getenv('CACHE_COMPRESS_THRESHOLD', '1024')
+        )
+        self.compress_level = compress_level
+
+    @property
+    def backend(self) -> str:
+        return "orjson" if orjson else "json"
+
+    @staticmethod
+    def _dumps_json(value: Any) -> str:
+        if orjson:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+        return json.dumps(value, separators=(',', ':'))
+
+    @staticmethod
+    def _loads_json(payload: str) -> Any:
+        if orjson:
+            return orjson.loads(payload)
+        return json.loads(payload)
+
+    def dumps(self, value: Any) -> str:
+        """Serialisiert einen Wert mit Typ-Tag."""
+        if isinstance(value, str):
+            return f"{self.PREFIX}s{value}"
+
+        payload = self._dumps_json(value)
+        if self.compress_threshold and len(payload) > self.compress_threshold:
+            compressed = zlib.compress(payload.encode(), self.compress_level)
+            return f"{self.PREFIX}z{base64.b64encode(compressed).decode('ascii')}"
+        return f"{self.PREFIX}j{payload}"
+
+    def loads(self, raw: Any) -> Optional[Any]:
+        """Deserialisiert einen gespeicherten Wert; Werte ohne Präfix werden wie bisher gelesen."""
+        if raw is None:
+            return None
+        if not isinstance(raw, str) or not raw.startswith(self.PREFIX):
+            return self._loads_legacy(raw)
+
+        tag = raw[len(self.PREFIX)]
+        payload = raw[len(self.PREFIX) + 1:]
+        if tag == 's':
+            return payload
+        if tag == 'j':
+            return self._loads_json(payload)
+        if tag == 'z':
+            return self._loads_json(zlib.decompress(base64.b64decode(payload)).decode())
+        raise ValueError(f"Unbekanntes Cache-Format: {tag!r}")
+
+    @staticmethod
+    def _loads_legacy(raw: Any) -> Any:
+        """Altes Format: JSON versuchen, sonst Rohwert (auch für INCR-Zähler)."""
+        try:
+            return json.loads(raw)
+        except (json.JSONDecodeError, TypeError):
+            return raw
@@ -0,0 +1,147 @@
+# src/game/activity_tracker.py
+"""
+Tägliche Aktivitätszähler (z.B. emojiquiz_win)
+Zähler leben in Redis und werden periodisch gebündelt in daily_activity_tracker übernommen
+"""
+
+import asyncio
+import logging
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+from ..core.cache import cache
+from ..core.database import db
+
+logger = logging.getLogger(__name__)
+
+# Zählerstände aus Redis sind absolut; GREATEST macht wiederholte Flushes unschädlich
+FLUSH_SQL = """
+    INSERT INTO daily_activity_tracker (player_id, activity_type, activity_date, activity_count)
+    SELECT v.player_id, v.activity_type, v.activity_date, v.activity_count
+    FROM unnest($1::bigint[], $2::varchar[], $3::date[], $4::int[])
+         AS v(player_id, activity_type, activity_date, activity_count)
+    JOIN players p ON p.user_id = v.player_id
+    ON CONFLICT (player_id, activity_type, activity_date)
+    DO UPDATE SET activity_count = GREATEST(daily_activity_tracker.activity_count, EXCLUDED.activity_count)
+"""
+
+class DailyActivityTracker:
+    """Zählt tägliche Aktivitäten in Redis und schreibt sie periodisch nach Postgres."""
+
+    KEY_PREFIX = "activity"
+    # Menge der Zähler, die seit dem letzten Flush geändert wurden
+    DIRTY_KEY = "activity:dirty"
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval: float = interval or float(os.getenv('ACTIVITY_FLUSH_INTERVAL', '30'))
+        # Zähler leben über Mitternacht hinaus noch so lange, damit der letzte Flush sie sicher erwischt
+        self.expiry_grace: int = 3600
+        self.batch_size: int = 1000
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _today() -> date:
+        return datetime.now(timezone.utc).date()
+
+    def _key(self, player_id: int, activity_type: str, day: date) -> str:
+        return f"{self.KEY_PREFIX}:{day.isoformat()}:{player_id}:{activity_type}"
+
+    def _expires_at(self, day: date) -> int:
+        """Unix-Zeit der nächsten Mitternacht (UTC) plus Gnadenfrist."""
+        midnight = datetime.combine(day + timedelta(days=1), time.min, tzinfo=timezone.utc)
+        return int(midnight.timestamp()) + self.expiry_grace
+
+    async def increment(self, player_id: int, activity_type: str, amount: int = 1) -> int:
+        """Erhöht den heutigen Zähler in einem Round-Trip. Gibt den neuen Stand zurück."""
+        day = self._today()
+        key = self._key(player_id, activity_type, day)
+        try:
+            async with cache.redis.pipeline(transaction=True) as pipe:
+                pipe.incrby(key, amount)
+                pipe.expireat(key, self._expires_at(day))
+                pipe.sadd(self.DIRTY_KEY, key)
+                count, _, _ = await pipe.execute()
+            return count
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Zählen von {activity_type} für {player_id}: {e}")
+            return 0
+
+    async def get_count(self, player_id: int, activity_type: str) -> int:
+        """Gibt den heutigen Zählerstand zurück (ein GET)."""
+        value = await cache.get(self._key(player_id, activity_type, self._today()))
+        return int(value) if value is not None else 0
+
+    async def has_reached_limit(self, player_id: int, activity_type: str, limit: int) -> bool:
+        """Prüft ob das Tageslimit einer Aktivität erreicht ist."""
+        return await self.get_count(player_id, activity_type) >= limit
+
+    def start(self):
+        """Startet den periodischen Flush im Hintergrund."""
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._flush_loop())
+        logger.info(f"📅 Aktivitäts-Flush gestartet (Intervall: {self.interval}s)")
+
+    async def stop(self):
+        """Stoppt den periodischen Flush und schreibt die restlichen Zähler."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        """Schreibt geänderte Zähler im festen Intervall."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Übernimmt alle geänderten Zähler in daily_activity_tracker. Gibt die Anzahl der Zähler zurück."""
+        if not cache.redis or not db.pool:
+            return 0
+
+        flushed = 0
+        while True:
+            try:
+                # SPOP ist atomar: mehrere Bot-Instanzen teilen sich die Arbeit ohne Doppelungen
+                keys = await cache.redis.spop(self.DIRTY_KEY, self.batch_size)
+                if not keys:
+                    return flushed
+                counts = await cache.redis.mget(keys)
+            except Exception as e:
+                logger.error(f"❌ Fehler beim Lesen der Aktivitätszähler: {e}")
+                return flushed
+
+            rows = ([], [], [], [])
+            for key, count in zip(keys, counts):
+                if count is None:
+                    continue
+                _, day, player_id, activity_type = key.split(':', 3)
+                rows[0].append(int(player_id))
+                rows[1].append(activity_type)
+                rows[2].append(date.fromisoformat(day))
+                rows[3].append(int(count))
+
+            try:
+                async with db.pool.acquire() as conn:
+                    await conn.execute(FLUSH_SQL, *rows)
+            except Exception as e:
+                logger.error(f"❌ Fehler beim Schreiben von {len(keys)} Aktivitätszählern: {e}")
+                # Für den nächsten Versuch wieder vormerken
+                try:
+                    await cache.redis.sadd(self.DIRTY_KEY, *keys)
+                except Exception:
+                    logger.error(f"❌ {len(keys)} Aktivitätszähler konnten nicht erneut vorgemerkt werden")
+                return flushed
+
+            flushed += len(rows[0])
+            if len(keys) < self.batch_size:
+                return flushed
+
+# Globale Aktivitäts-Tracker-Instanz
+activity_tracker = DailyActivityTracker()
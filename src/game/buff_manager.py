@@ -0,0 +1,286 @@
+# src/game/buff_manager.py
+"""
+Buff-System für den Pixel Bot
+Aktive Buffs liegen im Speicher in einem Min-Heap nach Ablaufzeit; ein einziger Timer auf dem
+Event-Loop lässt sie ablaufen, abgelaufene Zeilen werden gebündelt aus active_buffs gelöscht.
+Neue Buffs werden per Redis Pub/Sub an die anderen Bot-Prozesse verteilt
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from ..core.cache import cache
+from ..core.database import db
+from .mana import EFFECTIVE_MANA_EXPR, MANA_REGEN_BUFF, MANA_UPDATED_AT_EXPR
+from .player_cache import player_cache
+from .write_behind import player_write_behind
+
+logger = logging.getLogger(__name__)
+
+# Glück verschiebt die Erkundungs-Events zu selteneren Stufen
+LUCK_BUFF = 'luck_boost'
+
+# Belohnungs-IDs aus Events -> (buff_type, modifier, dauer)
+BUFF_REWARDS: Dict[str, Tuple[str, float, timedelta]] = {
+    'mana_regen_boost_5pct_1h': (MANA_REGEN_BUFF, 1.05, timedelta(hours=1)),
+    'luck_boost_10pct_1h': (LUCK_BUFF, 1.10, timedelta(hours=1)),
+}
+
+LOAD_SQL = "SELECT buff_id, player_id, buff_type, modifier, expires_at FROM active_buffs WHERE expires_at > NOW()"
+
+INSERT_SQL = """
+    INSERT INTO active_buffs (player_id, buff_type, modifier, expires_at)
+    VALUES ($1, $2, $3, NOW() + $4::interval)
+    RETURNING buff_id, expires_at
+"""
+
+# Regenerations-Buffs zählen ab mana_updated_at: das bisher regenerierte Mana wird im selben Statement
+# festgeschrieben, sonst wirkt der neue Buff rückwirkend. Die CTE sieht den neuen Buff noch nicht.
+# Der Rest eines angebrochenen Punktes bleibt wie beim Ausgeben von Mana erhalten.
+APPLY_REGEN_BUFF_SQL = """
+    WITH rebase AS (
+        UPDATE players p
+        SET mana_current = """ + EFFECTIVE_MANA_EXPR + """, mana_updated_at = """ + MANA_UPDATED_AT_EXPR + """
+        WHERE p.user_id = $1
+    )
+    INSERT INTO active_buffs (player_id, buff_type, modifier, expires_at)
+    VALUES ($1, $2, $3, NOW() + $4::interval)
+    RETURNING buff_id, expires_at
+"""
+
+# Regenerations-Buffs bleiben stehen, bis die Lazy-Regeneration des Spielers sie verrechnet hat
+DELETE_EXPIRED_SQL = """
+    DELETE FROM active_buffs ab
+    USING players p
+    WHERE p.user_id = ab.player_id AND ab.expires_at <= NOW()
+      AND (ab.buff_type <> '""" + MANA_REGEN_BUFF + """' OR ab.expires_at <= p.mana_updated_at)
+"""
+
+class Buff:
+    """Ein aktiver, zeitlich begrenzter Bonus eines Spielers."""
+
+    def __init__(self, buff_id: int, player_id: int, buff_type: str, modifier: float, expires_at: datetime):
+        self.id = buff_id
+        self.player_id = player_id
+        self.buff_type = buff_type
+        self.modifier = modifier
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return f"Buff({self.id}: {self.buff_type} x{self.modifier} für {self.player_id})"
+
+class BuffManager:
+    """Verwaltet aktive Buffs im Speicher und lässt sie ohne Polling ablaufen."""
+
+    CHANNEL = "buffs:applied"
+
+    def __init__(self):
+        self.buffs: Dict[int, Buff] = {}
+        # (expires_at-Timestamp, buff_id), kleinster Ablauf oben
+        self._heap: List[Tuple[float, int]] = []
+        # Vorberechnete Gesamtmodifikatoren für O(1)-Abfragen
+        self._modifiers: Dict[Tuple[int, str], float] = {}
+        self._by_key: Dict[Tuple[int, str], Set[int]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at: Optional[float] = None
+        self._pending_deletes: bool = False
+        self._delete_task: Optional[asyncio.Task] = None
+        self._expiry_callbacks: List[Callable[[Buff], None]] = []
+        # Eigene Nachrichten erkennen, die Buffs sind hier schon eingetragen
+        self.instance_id: str = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+
+    async def load(self):
+        """Lädt alle noch aktiven Buffs einmalig und räumt bereits abgelaufene Zeilen auf."""
+        async with db.pool.acquire() as conn:
+            await conn.execute(DELETE_EXPIRED_SQL)
+        await self._load_active()
+        logger.info(f"✨ {len(self.buffs)} aktive Buffs geladen")
+
+    async def _load_active(self):
+        """Übernimmt alle aktiven Buffs aus der DB, bereits bekannte bleiben unverändert."""
+        async with db.pool.acquire() as conn:
+            records = await conn.fetch(LOAD_SQL)
+        for record in records:
+            self._add(Buff(record['buff_id'], record['player_id'], record['buff_type'], record['modifier'], record['expires_at']))
+        self._schedule()
+
+    def start(self):
+        """Startet den Pub/Sub-Listener für Buffs, die andere Prozesse vergeben."""
+        if cache.redis is None:
+            return
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        """Trägt Buffs anderer Prozesse ein, damit get_modifier überall dasselbe liefert."""
+        while True:
+            client = pubsub = None
+            try:
+                client = cache.subscriber_client()
+                pubsub = client.pubsub()
+                await pubsub.subscribe(self.CHANNEL)
+                # Während der Verbindungslücke vergebene Buffs nachladen
+                await self._load_active()
+                async for message in pubsub.listen():
+                    if message.get('type') != 'message':
+                        continue
+                    payload = json.loads(message['data'])
+                    if payload.get('origin') == self.instance_id:
+                        continue
+                    self._add(Buff(
+                        payload['id'], payload['player_id'], payload['buff_type'], payload['modifier'],
+                        datetime.fromtimestamp(payload['expires_at'], timezone.utc)
+                    ))
+                    self._schedule()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Buff-Verteilung unterbrochen, verbinde neu: {e}")
+                await asyncio.sleep(5)
+            finally:
+                if pubsub is not None:
+                    await pubsub.aclose()
+                if client is not None and client is not cache.redis:
+                    await client.aclose()
+
+    def on_expire(self, callback: Callable[[Buff], None]):
+        """Registriert eine Funktion, die beim Ablauf jedes Buffs aufgerufen wird."""
+        self._expiry_callbacks.append(callback)
+
+    def get_modifier(self, player_id: int, buff_type: str) -> float:
+        """Gibt den Gesamtmodifikator aller aktiven Buffs eines Typs zurück (1.0 = kein Buff)."""
+        return self._modifiers.get((player_id, buff_type), 1.0)
+
+    def get_buffs(self, player_id: int) -> List[Buff]:
+        """Gibt alle aktiven Buffs eines Spielers zurück."""
+        return [buff for buff in self.buffs.values() if buff.player_id == player_id]
+
+    async def apply_buff(self, player_id: int, buff_type: str, modifier: float, duration: timedelta) -> Buff:
+        """Speichert einen neuen Buff, nimmt ihn in den Timer auf und meldet ihn den anderen Prozessen."""
+        regen = buff_type == MANA_REGEN_BUFF
+        if regen:
+            # Vorgemerktes Mana zuerst schreiben, sonst überschreibt es die Neuberechnung
+            await player_write_behind.flush([player_id])
+        async with db.pool.acquire() as conn:
+            record = await conn.fetchrow(APPLY_REGEN_BUFF_SQL if regen else INSERT_SQL, player_id, buff_type, modifier, duration)
+        db.mark_written([player_id])
+
+        buff = Buff(record['buff_id'], player_id, buff_type, modifier, record['expires_at'])
+        self._add(buff)
+        self._schedule()
+        # Gecachte Spieler tragen Mana und Regenerations-Buffs mit sich
+        await player_cache.invalidate([player_id])
+        if cache.redis:
+            async with cache.batch() as batch:
+                batch.publish(self.CHANNEL, json.dumps({
+                    'origin': self.instance_id, 'id': buff.id, 'player_id': player_id, 'buff_type': buff_type,
+                    'modifier': modifier, 'expires_at': buff.expires_at.timestamp()
+                }))
+        return buff
+
+    async def apply_reward(self, player_id: int, reward_id: str) -> Optional[Buff]:
+        """Wendet eine Buff-Belohnung aus einem Event an. Gibt None zurück, wenn sie unbekannt ist."""
+        definition = BUFF_REWARDS.get(reward_id)
+        if not definition:
+            return None
+        buff_type, modifier, duration = definition
+        return await self.apply_buff(player_id, buff_type, modifier, duration)
+
+    def _add(self, buff: Buff):
+        if buff.id in self.buffs:
+            return
+        self.buffs[buff.id] = buff
+        heapq.heappush(self._heap, (buff.expires_at.timestamp(), buff.id))
+        key = (buff.player_id, buff.buff_type)
+        self._by_key.setdefault(key, set()).add(buff.id)
+        self._recompute(key)
+
+    def _remove(self, buff: Buff):
+        del self.buffs[buff.id]
+        key = (buff.player_id, buff.buff_type)
+        ids = self._by_key.get(key, set())
+        ids.discard(buff.id)
+        if not ids:
+            self._by_key.pop(key, None)
+        self._recompute(key)
+
+    def _recompute(self, key: Tuple[int, str]):
+        """Berechnet den Gesamtmodifikator eines Spielers für einen Buff-Typ neu.
+
+        Boni addieren sich wie in der Mana-Regeneration: zwei Buffs mit 1.05 ergeben 1.10.
+        """
+        ids = self._by_key.get(key)
+        if not ids:
+            self._modifiers.pop(key, None)
+            return
+        self._modifiers[key] = 1.0 + sum(self.buffs[buff_id].modifier - 1.0 for buff_id in ids)
+
+    def _schedule(self):
+        """Stellt den Timer auf den nächsten Ablauf im Heap."""
+        if not self._heap:
+            return
+        next_at = self._heap[0][0]
+        if self._timer and self._timer_at is not None and self._timer_at <= next_at:
+            return
+        if self._timer:
+            self._timer.cancel()
+
+        loop = asyncio.get_running_loop()
+        delay = max(0.0, next_at - datetime.now(timezone.utc).timestamp())
+        self._timer = loop.call_at(loop.time() + delay, self._on_timer)
+        self._timer_at = next_at
+
+    def _on_timer(self):
+        """Lässt alle fälligen Buffs ablaufen und plant den nächsten Timer."""
+        self._timer = None
+        self._timer_at = None
+        now = datetime.now(timezone.utc).timestamp()
+
+        expired = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, buff_id = heapq.heappop(self._heap)
+            buff = self.buffs.get(buff_id)
+            if buff is None:
+                continue
+            self._remove(buff)
+            expired += 1
+            for callback in self._expiry_callbacks:
+                try:
+                    callback(buff)
+                except Exception as e:
+                    logger.error(f"❌ Fehler im Ablauf-Callback für {buff}: {e}")
+
+        if expired:
+            self._pending_deletes = True
+            if not self._delete_task or self._delete_task.done():
+                self._delete_task = asyncio.create_task(self._delete_expired())
+        self._schedule()
+
+    async def _delete_expired(self):
+        """Löscht abgelaufene Zeilen gebündelt; gleichzeitig ablaufende Buffs teilen sich ein Statement."""
+        while self._pending_deletes:
+            self._pending_deletes = False
+            try:
+                async with db.pool.acquire() as conn:
+                    await conn.execute(DELETE_EXPIRED_SQL)
+            except Exception as e:
+                logger.error(f"❌ Fehler beim Löschen abgelaufener Buffs: {e}")
+
+    def stop(self):
+        """Stoppt Timer und Listener (z.B. beim Herunterfahren)."""
+        if self._listener:
+            self._listener.cancel()
+            self._listener = None
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+            self._timer_at = None
+
+# Globale BuffManager-Instanz
+buff_manager = BuffManager()
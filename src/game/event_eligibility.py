@@ -0,0 +1,204 @@
+# src/game/event_eligibility.py
+"""
+Verfügbarkeits-Index für Erkundungs-Events
+Die deklarativen Bedingungen aller Events werden pro Katalog einmal in Bitmasken je Attributwert übersetzt
+(Bit i = Event i). Die Kandidaten eines Spielers ergeben sich dann aus wenigen bitweisen UNDs.
+"""
+
+import bisect
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from ..core.database import db
+from .inventory_manager import inventory_manager
+from .player_manager import Player
+
+logger = logging.getLogger(__name__)
+
+# Tageszeiten als (Name, Startstunde), aufsteigend; vor der ersten Startstunde gilt die letzte
+TIMES_OF_DAY: Tuple[Tuple[str, int], ...] = (('dawn', 5), ('day', 10), ('dusk', 18), ('night', 22))
+
+# Erlaubte Schlüssel im conditions-Objekt eines Events
+CONDITION_KEYS = ('soul_animal_form', 'time_of_day', 'min_mana', 'items', 'grimoire')
+
+GRIMOIRE_SELECT_SQL = "SELECT grimoire_id, discovery_level FROM grimoire_entries WHERE player_id = $1"
+
+db.register_statement('grimoire.get', GRIMOIRE_SELECT_SQL)
+
+def current_time_of_day(now: Optional[datetime] = None) -> str:
+    """Tageszeit in der Spielzeitzone (EVENT_TIMEZONE)."""
+    now = now or datetime.now(ZoneInfo(os.getenv('EVENT_TIMEZONE', 'Europe/Berlin')))
+    current = TIMES_OF_DAY[-1][0]
+    for name, start in TIMES_OF_DAY:
+        if now.hour >= start:
+            current = name
+    return current
+
+def validate_conditions(conditions: Any) -> List[str]:
+    """Prüft das conditions-Objekt einer Event-Definition."""
+    if not isinstance(conditions, dict):
+        return ["conditions muss ein Objekt sein"]
+
+    errors = [f"unbekannte Bedingung {key!r}" for key in conditions if key not in CONDITION_KEYS]
+    for key in ('soul_animal_form', 'items'):
+        values = conditions.get(key, [])
+        if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+            errors.append(f"{key} muss eine Liste von Strings sein")
+    times = conditions.get('time_of_day', [])
+    known_times = {name for name, _ in TIMES_OF_DAY}
+    if not isinstance(times, list) or any(time not in known_times for time in times):
+        errors.append(f"time_of_day erlaubt nur {', '.join(sorted(known_times))}")
+    min_mana = conditions.get('min_mana', 0)
+    if not isinstance(min_mana, int) or min_mana < 0:
+        errors.append("min_mana muss eine nicht-negative Ganzzahl sein")
+    grimoire = conditions.get('grimoire', {})
+    if not isinstance(grimoire, dict) or not all(
+        isinstance(level, int) and level >= 1 for level in grimoire.values()
+    ):
+        errors.append("grimoire muss {grimoire_id: mindeststufe} mit Stufen ab 1 sein")
+    return errors
+
+class PlayerContext:
+    """Die für Event-Bedingungen relevanten Attribute eines Spielers zu einem Zeitpunkt."""
+
+    __slots__ = ('soul_animal_form', 'mana', 'items', 'grimoire', 'time_of_day')
+
+    def __init__(
+        self,
+        soul_animal_form: Optional[str] = None,
+        mana: int = 0,
+        items: Optional[Set[str]] = None,
+        grimoire: Optional[Mapping[str, int]] = None,
+        time_of_day: Optional[str] = None
+    ):
+        self.soul_animal_form = soul_animal_form
+        self.mana = mana
+        self.items: Set[str] = items or set()
+        self.grimoire: Mapping[str, int] = grimoire or {}
+        self.time_of_day: str = time_of_day or current_time_of_day()
+
+class EligibilityIndex:
+    """Bitmasken je Bedingungswert über alle Events eines Katalogs, einmal pro Katalog gebaut."""
+
+    def __init__(self, conditions: Sequence[Mapping[str, Any]]):
+        self.size = len(conditions)
+        self.all: int = (1 << self.size) - 1
+
+        # Kategorische Bedingungen: Events ohne Einschränkung sind für jeden Wert erlaubt
+        self.unrestricted: Dict[str, int] = {'soul_animal_form': 0, 'time_of_day': 0}
+        self.by_value: Dict[str, Dict[str, int]] = {'soul_animal_form': {}, 'time_of_day': {}}
+        # Mengen-Bedingungen: welche Events ein Item bzw. eine Grimoire-Stufe voraussetzen
+        self.requires_item: Dict[str, int] = {}
+        requires_grimoire: Dict[str, Dict[int, int]] = {}
+        mana_masks: Dict[int, int] = {}
+
+        for i, condition in enumerate(conditions):
+            bit = 1 << i
+            for key in ('soul_animal_form', 'time_of_day'):
+                values = condition.get(key)
+                if not values:
+                    self.unrestricted[key] |= bit
+                for value in values or ():
+                    self.by_value[key][value] = self.by_value[key].get(value, 0) | bit
+            for item in condition.get('items', ()):
+                self.requires_item[item] = self.requires_item.get(item, 0) | bit
+            for grimoire_id, level in condition.get('grimoire', {}).items():
+                levels = requires_grimoire.setdefault(grimoire_id, {})
+                levels[level] = levels.get(level, 0) | bit
+            threshold = condition.get('min_mana', 0)
+            mana_masks[threshold] = mana_masks.get(threshold, 0) | bit
+
+        for key, masks in self.by_value.items():
+            for value in masks:
+                masks[value] |= self.unrestricted[key]
+
+        # Mana: Schwellen aufsteigend, kumulierte Masken; bisect findet die erfüllten in O(log k)
+        self.mana_thresholds: List[int] = sorted(mana_masks)
+        self.mana_masks: List[int] = []
+        cumulative = 0
+        for threshold in self.mana_thresholds:
+            cumulative |= mana_masks[threshold]
+            self.mana_masks.append(cumulative)
+
+        # Grimoire: pro Eintrag Stufen aufsteigend mit den Masken aller Events, die mindestens diese Stufe brauchen
+        self.requires_grimoire: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {}
+        for grimoire_id, levels in requires_grimoire.items():
+            ordered = sorted(levels)
+            suffix = []
+            mask = 0
+            for level in reversed(ordered):
+                mask |= levels[level]
+                suffix.append(mask)
+            self.requires_grimoire[grimoire_id] = (tuple(ordered), tuple(reversed(suffix)))
+
+    @property
+    def uses_items(self) -> bool:
+        return bool(self.requires_item)
+
+    @property
+    def uses_grimoire(self) -> bool:
+        return bool(self.requires_grimoire)
+
+    def _categorical(self, key: str, value: Optional[str]) -> int:
+        return self.by_value[key].get(value, self.unrestricted[key])
+
+    def _mana(self, mana: int) -> int:
+        position = bisect.bisect_right(self.mana_thresholds, mana)
+        return self.mana_masks[position - 1] if position else 0
+
+    def _grimoire_missing(self, grimoire: Mapping[str, int]) -> int:
+        missing = 0
+        for grimoire_id, (levels, masks) in self.requires_grimoire.items():
+            # Alle Stufen über der erreichten fehlen noch
+            position = bisect.bisect_right(levels, grimoire.get(grimoire_id, 0))
+            if position < len(levels):
+                missing |= masks[position]
+        return missing
+
+    def candidates(self, context: PlayerContext) -> int:
+        """Bitmaske der Events, deren Bedingungen der Spieler erfüllt."""
+        mask = self.all
+        mask &= self._categorical('soul_animal_form', context.soul_animal_form)
+        mask &= self._categorical('time_of_day', context.time_of_day)
+        mask &= self._mana(context.mana)
+        if not mask:
+            return 0
+
+        missing = 0
+        for item, required in self.requires_item.items():
+            if item not in context.items:
+                missing |= required
+        missing |= self._grimoire_missing(context.grimoire)
+        return mask & ~missing
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Indizes der gesetzten Bits, aufsteigend."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+async def get_grimoire(player_id: int) -> Dict[str, int]:
+    """Erreichte Stufen der Grimoire-Einträge eines Spielers als {grimoire_id: stufe}."""
+    async with db.reader([player_id]).acquire() as conn:
+        statement = await db.prepared(conn, 'grimoire.get')
+        records = await statement.fetch(player_id)
+    return {record['grimoire_id']: record['discovery_level'] for record in records}
+
+async def build_context(player: Player, index: EligibilityIndex) -> PlayerContext:
+    """Sammelt die Spieler-Attribute; Inventar und Grimoire nur, wenn der Katalog sie abfragt."""
+    items: Set[str] = set()
+    grimoire: Dict[str, int] = {}
+    try:
+        if index.uses_items:
+            inventory = await inventory_manager.get_inventory(player.user_id)
+            items = {item for item, quantity in inventory.items() if quantity > 0}
+        if index.uses_grimoire:
+            grimoire = await get_grimoire(player.user_id)
+    except Exception as e:
+        # Ohne Daten gelten Item- und Grimoire-Bedingungen als nicht erfüllt
+        logger.warning(f"⚠️ Event-Bedingungen für {player.user_id} unvollständig: {e}")
+    return PlayerContext(player.soul_animal_form, player.mana_current, items, grimoire)
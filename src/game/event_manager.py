@@ -1,48 +1,279 @@
 # src/game/event_manager.py
+"""
+Erkundungs-Events für den Pixel Bot
+Der Katalog aus data/events.json wird einmal geladen, geprüft und in unveränderliche Einträge mit
+vorberechneten Indizes übersetzt; Änderungen an der Datei werden per mtime erkannt und atomar getauscht.
+Bedingungen (Seelentier, Mana, Items, Grimoire, Tageszeit) werden dabei zu Bitmasken kompiliert.
+"""
+
+import json
+import os
+import logging
 import random
-from typing import List, Dict, Any, Optional
+import time
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Optional, Tuple
 from .player_manager import Player
+from .inventory_manager import inventory_manager
+from .buff_manager import BUFF_REWARDS, LUCK_BUFF, buff_manager
+from .event_sampler import TieredSampler
+from .event_eligibility import EligibilityIndex, PlayerContext, build_context, iter_bits, validate_conditions
+
+logger = logging.getLogger(__name__)
+
+# Seltenheitsstufen, entsprechen den Unterpaketen in src/game/events/
+RARITIES: Tuple[str, ...] = ('common', 'uncommon', 'rare', 'epic', 'legendary')
+
+# Relative Häufigkeit der Stufen; innerhalb einer Stufe entscheidet das weight der Events
+RARITY_WEIGHTS: Dict[str, float] = {'common': 60, 'uncommon': 25, 'rare': 10, 'epic': 4, 'legendary': 1}
+
+# Eingebaute Events, solange data/events.json leer ist
+DEFAULT_EVENTS: List[Dict[str, Any]] = [
+    {
+        "id": "common_stream",
+        "rarity": "common",
+        "tags": ["wasser", "ruhe"],
+        "display_text": "Du erreichst einen klaren, plätschernden Bach. Das Wasser sieht erfrischend aus.",
+        "options": [
+            {"label": "💧 Wasser schöpfen", "action": "collect_water", "reward": {"item": "reines_wasser", "quantity": 3}},
+            {"label": "🧘 Kurz ausruhen", "action": "rest", "reward": {"buff": "mana_regen_boost_5pct_1h"}},
+        ]
+    },
+    {
+        "id": "common_berries",
+        "rarity": "common",
+        "tags": ["sammeln", "pflanzen"],
+        "display_text": "Du findest ein dichtes Dickicht voller saftiger Beeren.",
+        "options": [
+            {"label": "🧺 Vorsichtig pflücken", "action": "collect_berries_safe", "reward": {"item": "normale_beere", "quantity": 3}},
+            {"label": "🌿 Tiefer hineingehen", "action": "collect_berries_risk", "reward": {"item": "normale_beere", "quantity": 5}, "consequence": "seelentier_kratzer"},
+        ]
+    }
+]
+
+def _freeze(value: Any) -> Any:
+    """Macht verschachtelte Event-Daten schreibgeschützt."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
 
 class BaseEvent:
-    """Basisklasse für alle Erkundungs-Events."""
+    """Basisklasse für alle Erkundungs-Events. Instanzen sind unveränderlich und werden geteilt."""
+
+    __slots__ = ('id', 'display_text', 'options', 'rarity', 'tags', 'weight', 'conditions')
+
     def __init__(self, event_data: Dict[str, Any]):
-        self.id: str = event_data.get('id', 'unknown_event')
-        self.display_text: str = event_data.get('display_text', 'Ein Event ist aufgetreten.')
-        self.options: List[Dict[str, Any]] = event_data.get('options', [])
+        set_ = super().__setattr__
+        set_('id', event_data.get('id', 'unknown_event'))
+        set_('display_text', event_data.get('display_text', 'Ein Event ist aufgetreten.'))
+        set_('options', _freeze(event_data.get('options', [])))
+        set_('rarity', event_data.get('rarity', 'common'))
+        set_('tags', frozenset(event_data.get('tags', ())))
+        set_('weight', float(event_data.get('weight', 1.0)))
+        set_('conditions', _freeze(event_data.get('conditions', {})))
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("Events sind unveränderlich")
+
+    def __repr__(self):
+        return f"BaseEvent({self.id}: {self.rarity})"
+
+    def is_available(self, context: PlayerContext) -> bool:
+        """Prüft die Bedingungen einzeln; für Ziehungen nutzt der Katalog stattdessen den Bitmasken-Index."""
+        conditions = self.conditions
+        for key in ('soul_animal_form', 'time_of_day'):
+            if conditions.get(key) and getattr(context, key) not in conditions[key]:
+                return False
+        if context.mana < conditions.get('min_mana', 0):
+            return False
+        if any(item not in context.items for item in conditions.get('items', ())):
+            return False
+        return all(context.grimoire.get(entry, 0) >= level for entry, level in conditions.get('grimoire', {}).items())
+
+def validate_event(data: Any) -> List[str]:
+    """Prüft eine Event-Definition und gibt die gefundenen Fehler zurück."""
+    if not isinstance(data, dict):
+        return ["Event ist kein Objekt"]
+
+    errors = []
+    if not isinstance(data.get('id'), str) or not data['id']:
+        errors.append("id fehlt")
+    if not isinstance(data.get('display_text'), str):
+        errors.append("display_text fehlt")
+    if data.get('rarity', 'common') not in RARITIES:
+        errors.append(f"unbekannte Seltenheit {data.get('rarity')!r}")
+    if not isinstance(data.get('tags', []), list):
+        errors.append("tags muss eine Liste sein")
+    weight = data.get('weight', 1.0)
+    if not isinstance(weight, (int, float)) or weight <= 0:
+        errors.append("weight muss positiv sein")
+    if 'conditions' in data:
+        errors.extend(validate_conditions(data['conditions']))
+
+    options = data.get('options')
+    if not isinstance(options, list) or not options:
+        errors.append("options fehlen")
+        return errors
+    for i, option in enumerate(options):
+        if not isinstance(option, dict) or 'label' not in option or 'action' not in option:
+            errors.append(f"Option {i} braucht label und action")
+            continue
+        reward = option.get('reward', {})
+        if 'buff' in reward and reward['buff'] not in BUFF_REWARDS:
+            errors.append(f"Option {i}: unbekannter Buff {reward['buff']!r}")
+        if 'item' in reward and (not isinstance(reward.get('quantity', 1), int) or reward.get('quantity', 1) <= 0):
+            errors.append(f"Option {i}: ungültige Menge")
+    return errors
+
+class EventCatalog:
+    """Unveränderlicher Schnappschuss aller Events mit Indizes nach ID, Seltenheit und Tag."""
+
+    def __init__(self, events: Tuple[BaseEvent, ...], mtime: Optional[int] = None):
+        self.events = events
+        self.mtime = mtime
+        self.by_id: Mapping[str, BaseEvent] = MappingProxyType({event.id: event for event in events})
+
+        by_rarity: Dict[str, List[BaseEvent]] = {rarity: [] for rarity in RARITIES}
+        by_tag: Dict[str, List[BaseEvent]] = {}
+        for event in events:
+            by_rarity[event.rarity].append(event)
+            for tag in event.tags:
+                by_tag.setdefault(tag, []).append(event)
+        self.by_rarity: Mapping[str, Tuple[BaseEvent, ...]] = MappingProxyType({key: tuple(value) for key, value in by_rarity.items()})
+        self.by_tag: Mapping[str, Tuple[BaseEvent, ...]] = MappingProxyType({key: tuple(value) for key, value in by_tag.items()})
+
+        # Alias-Tabellen pro Stufe über die Positionen in events, einmal pro Katalog gebaut
+        positions: Dict[str, List[Tuple[int, float]]] = {rarity: [] for rarity in RARITIES}
+        for i, event in enumerate(events):
+            positions[event.rarity].append((i, event.weight))
+        self.sampler: TieredSampler[int] = TieredSampler(positions, RARITY_WEIGHTS)
+        # Basisgewicht jedes Events über alle Stufen, für die exakte Ziehung unter wenigen Kandidaten
+        tier_totals = {rarity: sum(weight for _, weight in entries) for rarity, entries in positions.items()}
+        self.base_weights: Tuple[float, ...] = tuple(
+            RARITY_WEIGHTS[event.rarity] * event.weight / tier_totals[event.rarity] for event in events
+        )
+        # Bit i steht für events[i]
+        self.eligibility = EligibilityIndex([event.conditions for event in events])
+
+    def __len__(self) -> int:
+        return len(self.events)
 
-    def is_available(self, player: Player) -> bool:
-        """Prüft, ob dieses Event für den Spieler verfügbar ist."""
-        # Intelligenter Filter wird hier später implementiert
+    @classmethod
+    def from_definitions(cls, definitions: List[Any], mtime: Optional[int] = None) -> "EventCatalog":
+        """Baut einen Katalog; fehlerhafte oder doppelte Events werden mit Log-Eintrag übersprungen."""
+        events: List[BaseEvent] = []
+        seen = set()
+        for data in definitions:
+            errors = validate_event(data)
+            if not errors and data['id'] in seen:
+                errors = ["doppelte id"]
+            if errors:
+                event_id = data.get('id', '?') if isinstance(data, dict) else '?'
+                logger.error(f"❌ Event {event_id} ungültig: {', '.join(errors)}")
+                continue
+            seen.add(data['id'])
+            events.append(BaseEvent(data))
+        return cls(tuple(events), mtime)
+
+class EventManager:
+    """Hält den aktuellen Event-Katalog und lädt ihn neu, wenn sich data/events.json ändert."""
+
+    def __init__(self, path: Optional[str] = None, reload_interval: Optional[float] = None):
+        self.path: str = path or os.path.join("data", "events.json")
+        self.reload_interval: float = reload_interval if reload_interval is not None else float(
+            os.getenv('EVENT_RELOAD_INTERVAL', '5')
+        )
+        self.catalog: EventCatalog = EventCatalog(())
+        # mtime der zuletzt gelesenen Datei, auch wenn sie ungültig war
+        self._seen_mtime: Optional[int] = None
+        self._next_check: float = 0.0
+        self.load()
+
+    def _mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def load(self) -> bool:
+        """Lädt und prüft den Katalog; bei Fehlern bleibt der bisherige aktiv. Gibt True bei Erfolg zurück."""
+        mtime = self._mtime()
+        # Eine fehlerhafte Datei nicht bei jedem Aufruf erneut lesen, erst nach der nächsten Änderung
+        self._seen_mtime = mtime
+        try:
+            definitions = None
+            if mtime is not None:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                if content.strip():
+                    definitions = json.loads(content).get('events', [])
+            if definitions is None:
+                definitions = DEFAULT_EVENTS
+                logger.warning("⚠️ events.json leer oder nicht gefunden - eingebaute Events aktiv")
+            catalog = EventCatalog.from_definitions(definitions, mtime)
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Laden der Events, bisheriger Katalog bleibt aktiv: {e}")
+            return False
+
+        # Eine einzige Zuweisung: laufende Ziehungen behalten ihren Schnappschuss
+        self.catalog = catalog
+        logger.info(f"✅ {len(catalog)} Events geladen")
         return True
 
-async def get_random_event(player: Player) -> Optional[BaseEvent]:
-    """Lädt, filtert und wählt ein zufälliges, passendes Event für den Spieler aus."""
-    # Platzhalter: Später werden diese Daten aus den `data/` JSON-Dateien geladen
-    mock_events_data = [
-        {
-            "id": "common_stream",
-            "display_text": "Du erreichst einen klaren, plätschernden Bach. Das Wasser sieht erfrischend aus.",
-            "options": [
-                {"label": "💧 Wasser schöpfen", "action": "collect_water", "reward": {"item": "reines_wasser", "quantity": 3}},
-                {"label": "🧘 Kurz ausruhen", "action": "rest", "reward": {"buff": "mana_regen_boost_5pct_1h"}},
-            ]
-        },
-        {
-            "id": "common_berries",
-            "display_text": "Du findest ein dichtes Dickicht voller saftiger Beeren.",
-            "options": [
-                {"label": "🧺 Vorsichtig pflücken", "action": "collect_berries_safe", "reward": {"item": "normale_beere", "quantity": 3}},
-                {"label": "🌿 Tiefer hineingehen", "action": "collect_berries_risk", "reward": {"item": "normale_beere", "quantity": 5}, "consequence": "seelentier_kratzer"},
-            ]
-        }
-    ]
-    
-    all_events = [BaseEvent(data) for data in mock_events_data]
-    
-    # Intelligenter Filter anwenden
-    available_events = [event for event in all_events if event.is_available(player)]
-    
-    if not available_events:
+    def current(self) -> EventCatalog:
+        """Gibt den aktuellen Katalog zurück und prüft höchstens alle reload_interval Sekunden die mtime."""
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.reload_interval
+            if self._mtime() != self._seen_mtime:
+                self.load()
+        return self.catalog
+
+# Globale EventManager-Instanz
+event_manager = EventManager()
+
+def rarity_modifiers(player: Optional[Player]) -> Optional[Dict[str, float]]:
+    """Stufen-Modifikatoren eines Spielers: Glück wirkt pro Seltenheitsstufe einmal mehr (luck ** stufe)."""
+    luck = player.get_modifier(LUCK_BUFF) if player is not None else 1.0
+    if luck == 1.0:
+        return None
+    return {rarity: luck ** rank for rank, rarity in enumerate(RARITIES)}
+
+async def get_random_event(player: Player, context: Optional[PlayerContext] = None) -> Optional[BaseEvent]:
+    """Wählt ein passendes Event für den Spieler: Kandidaten per Bitmaske, dann eine gewichtete Ziehung."""
+    catalog = event_manager.current()
+    if not catalog.events:
+        return None
+    context = context or await build_context(player, catalog.eligibility)
+    candidates = catalog.eligibility.candidates(context)
+    if not candidates:
         return None
-        
-    return random.choice(available_events)
+    modifiers = rarity_modifiers(player)
+
+    # Bit-Test statt Prädikat: abgelehnte Ziehungen kosten nur eine Verschiebung
+    accept = None if candidates == catalog.eligibility.all else (lambda i: candidates >> i & 1)
+    position = catalog.sampler.sample(modifiers, accept=accept)
+    if position is not None:
+        return catalog.events[position]
+
+    # Wenige Kandidaten: exakt über die gesetzten Bits ziehen
+    positions = list(iter_bits(candidates))
+    weights = [
+        catalog.base_weights[i] * (modifiers or {}).get(catalog.events[i].rarity, 1.0)
+        for i in positions
+    ]
+    return catalog.events[random.choices(positions, weights=weights)[0]]
+
+async def apply_reward(player: Player, reward: Dict[str, Any]) -> bool:
+    """Wendet die Belohnung einer Event-Option auf den Spieler an. Gibt False zurück, wenn sie nicht unterstützt wird."""
+    if 'item' in reward:
+        await inventory_manager.grant(player.user_id, reward['item'], reward.get('quantity', 1))
+        return True
+
+    if 'buff' in reward:
+        return await buff_manager.apply_reward(player.user_id, reward['buff']) is not None
+
+    logger.warning(f"⚠️ Unbekannte Event-Belohnung: {reward}")
+    return False
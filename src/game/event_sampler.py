@@ -0,0 +1,124 @@
+# src/game/event_sampler.py
+"""
+Gewichtete Zufallsauswahl in O(1) mit Alias-Tabellen (Walker/Vose)
+Stufen (z.B. Seltenheiten) und Einträge innerhalb einer Stufe haben je eine eigene Tabelle;
+Spieler-Modifikatoren gewichten die Stufen per Rejection Sampling um, ohne Tabellen neu zu bauen.
+"""
+
+import random
+from typing import Callable, Dict, Generic, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar('T')
+
+class AliasTable(Generic[T]):
+    """Alias-Tabelle nach Vose: Aufbau O(n), jede Ziehung O(1)."""
+
+    __slots__ = ('items', 'total', '_prob', '_alias')
+
+    def __init__(self, items: Sequence[T], weights: Sequence[float]):
+        if len(items) != len(weights) or not items:
+            raise ValueError("Alias-Tabelle braucht gleich viele, mindestens ein Element und Gewicht")
+        total = float(sum(weights))
+        if total <= 0 or any(weight < 0 for weight in weights):
+            raise ValueError("Gewichte müssen nicht-negativ sein und dürfen sich nicht zu 0 summieren")
+
+        n = len(items)
+        self.items: Tuple[T, ...] = tuple(items)
+        self.total = total
+        prob = [0.0] * n
+        alias = list(range(n))
+        scaled = [weight * n / total for weight in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            low, high = small.pop(), large.pop()
+            prob[low] = scaled[low]
+            alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        # Reste sind durch Rundung ~1.0
+        for i in small + large:
+            prob[i] = 1.0
+
+        self._prob: Tuple[float, ...] = tuple(prob)
+        self._alias: Tuple[int, ...] = tuple(alias)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def sample_index(self, rng: random.Random = random) -> int:
+        i = rng.randrange(len(self._prob))
+        return i if rng.random() < self._prob[i] else self._alias[i]
+
+    def sample(self, rng: random.Random = random) -> T:
+        return self.items[self.sample_index(rng)]
+
+class TieredSampler(Generic[T]):
+    """Zieht erst eine Stufe, dann einen Eintrag darin; beides über Alias-Tabellen.
+
+    Leere Stufen fallen aus der Stufentabelle heraus, ihre Wahrscheinlichkeit verteilt sich auf die übrigen.
+    """
+
+    # Ab so vielen Fehlversuchen wird exakt über die umgewichteten Stufen gezogen
+    MAX_REJECTIONS = 32
+
+    def __init__(self, tiers: Mapping[str, Sequence[Tuple[T, float]]], tier_weights: Mapping[str, float]):
+        self.tables: Dict[str, AliasTable[T]] = {}
+        names: List[str] = []
+        weights: List[float] = []
+        for name, entries in tiers.items():
+            if not entries or tier_weights.get(name, 0) <= 0:
+                continue
+            self.tables[name] = AliasTable([item for item, _ in entries], [weight for _, weight in entries])
+            names.append(name)
+            weights.append(tier_weights[name])
+        self.tier_table: Optional[AliasTable[str]] = AliasTable(names, weights) if names else None
+        self._tier_weights: Dict[str, float] = dict(zip(names, weights))
+
+    def __bool__(self) -> bool:
+        return self.tier_table is not None
+
+    def probabilities(self, modifiers: Optional[Mapping[str, float]] = None) -> Dict[str, float]:
+        """Erwartete Stufen-Wahrscheinlichkeiten unter den Modifikatoren (für Anzeige und Prüfung)."""
+        scaled = {name: weight * (modifiers or {}).get(name, 1.0) for name, weight in self._tier_weights.items()}
+        total = sum(scaled.values())
+        return {name: weight / total for name, weight in scaled.items()} if total else {}
+
+    def sample_tier(self, modifiers: Optional[Mapping[str, float]] = None, rng: random.Random = random) -> Optional[str]:
+        """Zieht eine Stufe; modifiers multiplizieren die Stufengewichte (1.0 = unverändert)."""
+        if self.tier_table is None:
+            return None
+        if not modifiers:
+            return self.tier_table.sample(rng)
+
+        # Rejection Sampling: aus der Basisverteilung ziehen und mit m / max(m) annehmen
+        top = max(modifiers.get(name, 1.0) for name in self._tier_weights)
+        if top <= 0:
+            return None
+        for _ in range(self.MAX_REJECTIONS):
+            tier = self.tier_table.sample(rng)
+            if rng.random() * top < modifiers.get(tier, 1.0):
+                return tier
+
+        # Extrem schiefe Modifikatoren: exakt, aber in O(Stufen)
+        probabilities = self.probabilities(modifiers)
+        if not probabilities:
+            return None
+        return rng.choices(list(probabilities), weights=list(probabilities.values()))[0]
+
+    def sample(
+        self,
+        modifiers: Optional[Mapping[str, float]] = None,
+        accept: Optional[Callable[[T], bool]] = None,
+        rng: random.Random = random
+    ) -> Optional[T]:
+        """Zieht einen Eintrag; accept kann einzelne Einträge ablehnen (dann wird neu gezogen)."""
+        for _ in range(self.MAX_REJECTIONS):
+            tier = self.sample_tier(modifiers, rng)
+            if tier is None:
+                return None
+            item = self.tables[tier].sample(rng)
+            if accept is None or accept(item):
+                return item
+        return None
@@ -0,0 +1,155 @@
+# src/game/inventory_manager.py
+"""
+Inventar-System für den Pixel Bot
+Vergibt und verbraucht Items in der inventory-Tabelle, Schnappschüsse pro Spieler liegen im Cache.
+Jeder Schnappschuss gehört zu einer Version des Spielers; Änderungen erhöhen die Version, ältere werden nie mehr gelesen
+"""
+
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+from ..core.cache import cache, make_key
+from ..core.local_cache import tiered_cache
+from ..core.database import db
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_SELECT_SQL = "SELECT item_id, quantity FROM inventory WHERE player_id = $1 AND quantity > 0"
+
+GRANT_SQL = """
+    INSERT INTO inventory (player_id, item_id, quantity) VALUES ($1, $2, $3)
+    ON CONFLICT (player_id, item_id) DO UPDATE SET quantity = inventory.quantity + EXCLUDED.quantity
+    RETURNING quantity
+"""
+
+# Ein Statement für beliebig viele Vergaben; Duplikate werden vorher in Python zusammengefasst
+BULK_GRANT_SQL = """
+    INSERT INTO inventory (player_id, item_id, quantity)
+    SELECT * FROM unnest($1::bigint[], $2::varchar[], $3::int[])
+    ON CONFLICT (player_id, item_id) DO UPDATE SET quantity = inventory.quantity + EXCLUDED.quantity
+"""
+
+# Atomar: schlägt fehl (keine Zeile), wenn der Bestand nicht reicht
+CONSUME_SQL = """
+    UPDATE inventory SET quantity = quantity - $3
+    WHERE player_id = $1 AND item_id = $2 AND quantity >= $3
+    RETURNING quantity
+"""
+
+db.register_statement('inventory.get', INVENTORY_SELECT_SQL)
+db.register_statement('inventory.grant', GRANT_SQL)
+db.register_statement('inventory.consume', CONSUME_SQL)
+
+class InventoryManager:
+    """Verwaltet die Inventare der Spieler."""
+
+    def __init__(self):
+        self.snapshot_ttl: int = int(os.getenv('INVENTORY_CACHE_TTL', '300'))
+        # Jeder Schnappschuss verlängert die Version; sie läuft so erst nach allen ihren Schnappschüssen ab,
+        # sonst könnte ein INCR ab 0 wieder eine alte Version erreichen und deren Schnappschuss beleben
+        self.version_ttl: int = self.snapshot_ttl * 2
+
+    @staticmethod
+    def _cache_key(player_id: int, version: int) -> str:
+        return make_key("inventory", player_id, version)
+
+    @staticmethod
+    def _version_key(player_id: int) -> str:
+        return make_key("inventory", player_id, "version")
+
+    async def _invalidate(self, player_ids: Iterable[int]):
+        """Erhöht die Versionen nach einer Änderung; bestehende Schnappschüsse werden damit ungültig."""
+        player_ids = list(player_ids)
+        db.mark_written(player_ids)
+        if cache.redis:
+            async with cache.batch() as batch:
+                for player_id in player_ids:
+                    batch.incr(self._version_key(player_id))
+                    batch.expire(self._version_key(player_id), self.version_ttl)
+
+    async def get_inventory(self, player_id: int) -> Dict[str, int]:
+        """Gibt das Inventar eines Spielers als {item_id: menge} zurück, bevorzugt aus dem Cache."""
+        version = None
+        if cache.redis:
+            # Version vor dem DB-Lesen holen: ein veralteter Schnappschuss landet dann unter einer alten Version
+            try:
+                version = int(await cache.redis.get(self._version_key(player_id)) or 0)
+            except Exception as e:
+                # Ohne gültige Version weder lesen noch schreiben, sonst käme ein veralteter Schnappschuss zurück
+                logger.error(f"❌ Fehler beim Lesen der Inventar-Version für {player_id}: {e}")
+        if version is not None:
+            snapshot = await tiered_cache.get(self._cache_key(player_id, version))
+            if isinstance(snapshot, dict):
+                return snapshot
+
+        # Was gecacht wird, kommt vom Primary: ein nachhinkendes Replica landete sonst unter der neuen Version
+        pool = db.pool if version is not None else db.reader([player_id])
+        async with pool.acquire() as conn:
+            statement = await db.prepared(conn, 'inventory.get')
+            records = await statement.fetch(player_id)
+        inventory = {record['item_id']: record['quantity'] for record in records}
+
+        if version is not None:
+            try:
+                await cache.redis.expire(self._version_key(player_id), self.version_ttl)
+            except Exception as e:
+                # Ohne verlängerte Version könnte der Schnappschuss sie überleben
+                logger.error(f"❌ Fehler beim Verlängern der Inventar-Version für {player_id}: {e}")
+                return inventory
+            await tiered_cache.set(
+                self._cache_key(player_id, version), inventory,
+                expire=self.snapshot_ttl, tags=[make_key("player", player_id)]
+            )
+        return inventory
+
+    async def get_quantity(self, player_id: int, item_id: str) -> int:
+        """Gibt die Menge eines Items im Inventar zurück."""
+        return (await self.get_inventory(player_id)).get(item_id, 0)
+
+    async def grant(self, player_id: int, item_id: str, quantity: int = 1) -> int:
+        """Gibt einem Spieler Items. Gibt die neue Menge zurück."""
+        if quantity <= 0:
+            raise ValueError("Menge muss positiv sein")
+
+        async with db.pool.acquire() as conn:
+            statement = await db.prepared(conn, 'inventory.grant')
+            new_quantity = await statement.fetchval(player_id, item_id, quantity)
+        await self._invalidate([player_id])
+        return new_quantity
+
+    async def bulk_grant(self, grants: Iterable[Tuple[int, str, int]]) -> int:
+        """Vergibt viele (player_id, item_id, menge)-Einträge in einem Statement. Gibt die Anzahl der Zeilen zurück."""
+        merged: Dict[Tuple[int, str], int] = defaultdict(int)
+        for player_id, item_id, quantity in grants:
+            if quantity > 0:
+                merged[(player_id, item_id)] += quantity
+        if not merged:
+            return 0
+
+        keys = list(merged)
+        async with db.pool.acquire() as conn:
+            await conn.execute(
+                BULK_GRANT_SQL,
+                [player_id for player_id, _ in keys],
+                [item_id for _, item_id in keys],
+                list(merged.values())
+            )
+        await self._invalidate({player_id for player_id, _ in keys})
+        return len(keys)
+
+    async def consume(self, player_id: int, item_id: str, quantity: int = 1) -> Optional[int]:
+        """Verbraucht Items atomar. Gibt die Restmenge zurück oder None, wenn der Bestand nicht reicht."""
+        if quantity <= 0:
+            raise ValueError("Menge muss positiv sein")
+
+        async with db.pool.acquire() as conn:
+            statement = await db.prepared(conn, 'inventory.consume')
+            remaining = await statement.fetchval(player_id, item_id, quantity)
+        if remaining is not None:
+            await self._invalidate([player_id])
+        return remaining
+
+# Globale InventoryManager-Instanz
+inventory_manager = InventoryManager()
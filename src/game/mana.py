@@ -0,0 +1,100 @@
+# src/game/mana.py
+"""
+Lazy Mana-Regeneration
+Mana wird nicht per Job aufgefüllt, sondern beim Lesen aus mana_updated_at und der Regenerationsrate berechnet
+"""
+
+import math
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..core.database import db
+
+# buff_type in active_buffs, der die Mana-Regeneration beschleunigt
+MANA_REGEN_BUFF = 'mana_regen_boost'
+
+# SQL-Ausdruck für die seit mana_updated_at angefallenen (angebrochenen) Mana-Punkte einer Zeile `p`
+MANA_GAINED_EXPR = """
+    (p.mana_regen_rate * (
+        EXTRACT(EPOCH FROM (NOW() - p.mana_updated_at))
+        + COALESCE((
+            SELECT SUM((ab.modifier - 1) * EXTRACT(EPOCH FROM (LEAST(NOW(), ab.expires_at) - p.mana_updated_at)))
+            FROM active_buffs ab
+            WHERE ab.player_id = p.user_id AND ab.buff_type = '""" + MANA_REGEN_BUFF + """' AND ab.expires_at > p.mana_updated_at
+        ), 0)
+    ) / 3600)
+"""
+
+# SQL-Ausdruck für das aktuelle Mana einer Zeile `p` aus players, gleiche Formel wie regenerate_mana()
+EFFECTIVE_MANA_EXPR = "GREATEST(p.mana_current, LEAST(p.mana_max, p.mana_current + FLOOR(" + MANA_GAINED_EXPR + ")))::int"
+
+# Passender Zeitstempel zu EFFECTIVE_MANA_EXPR: der Rest eines angebrochenen Punktes wird wie in
+# regenerate_mana() über die durchschnittliche Rate vor NOW() zurückgerechnet
+MANA_UPDATED_AT_EXPR = """
+    CASE WHEN p.mana_current + FLOOR(""" + MANA_GAINED_EXPR + """) >= p.mana_max OR """ + MANA_GAINED_EXPR + """ <= 0
+        THEN NOW()
+        ELSE NOW() - (""" + MANA_GAINED_EXPR + """ - FLOOR(""" + MANA_GAINED_EXPR + """)) / """ + MANA_GAINED_EXPR + """
+            * EXTRACT(EPOCH FROM (NOW() - p.mana_updated_at)) * INTERVAL '1 second'
+    END
+"""
+
+# Effektives Mana für viele Spieler in einer Abfrage
+EFFECTIVE_MANA_SQL = "SELECT p.user_id, p.mana_max, " + EFFECTIVE_MANA_EXPR + " AS mana_current FROM players p"
+
+def utcnow() -> datetime:
+    """Aktuelle Zeit mit Zeitzone, passend zu TIMESTAMPTZ."""
+    return datetime.now(timezone.utc)
+
+def regenerate_mana(
+    mana_current: int,
+    mana_max: int,
+    regen_rate: float,
+    updated_at: datetime,
+    buffs: Sequence[Tuple[float, datetime]] = (),
+    now: Optional[datetime] = None,
+) -> Tuple[int, datetime]:
+    """Berechnet das aktuelle Mana und den dazu passenden Zeitstempel.
+
+    buffs enthält (modifier, expires_at)-Paare. Jeder Buff gilt ab updated_at bis zu seinem Ablauf
+    und addiert (modifier - 1) * Basisrate. Angebrochene Mana-Punkte bleiben erhalten, indem der
+    zurückgegebene Zeitstempel entsprechend vor `now` liegt.
+    """
+    now = now or utcnow()
+    if mana_current >= mana_max or regen_rate <= 0 or now <= updated_at:
+        return mana_current, max(updated_at, now)
+
+    elapsed = (now - updated_at).total_seconds()
+    boosted = elapsed
+    for modifier, expires_at in buffs:
+        overlap = (min(now, expires_at) - updated_at).total_seconds()
+        if overlap > 0:
+            boosted += (modifier - 1) * overlap
+
+    gained = regen_rate * boosted / 3600
+    whole = math.floor(gained)
+    if mana_current + whole >= mana_max:
+        return mana_max, now
+    if gained <= 0:
+        return mana_current, now
+
+    # Rest eines angebrochenen Punktes über die durchschnittliche Rate zurückrechnen
+    remainder_seconds = (gained - whole) / gained * elapsed
+    return mana_current + whole, datetime.fromtimestamp(now.timestamp() - remainder_seconds, timezone.utc)
+
+async def get_effective_mana(user_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+    """Berechnet das aktuelle Mana für viele Spieler direkt in der Datenbank (z.B. für Ranglisten).
+
+    Ohne user_ids werden alle Spieler berechnet. Es wird nichts geschrieben.
+    """
+    query = EFFECTIVE_MANA_SQL
+    args: List = []
+    if user_ids is not None:
+        args.append(list(set(user_ids)))
+        if not args[0]:
+            return {}
+        query += " WHERE p.user_id = ANY($1::bigint[])"
+
+    # Reiner Lesezugriff: darf von der Read-Replica kommen
+    async with db.reader(*args).acquire() as conn:
+        records = await conn.fetch(query, *args)
+    return {record['user_id']: record['mana_current'] for record in records}
@@ -0,0 +1,108 @@
+# src/game/player_cache.py
+"""
+Read-Through-Cache für Spieler in Redis
+Jeder Spieler hat einen Versionszähler; gecachte Daten gelten nur, solange ihre Version aktuell ist
+"""
+
+import logging
+import os
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from ..core.cache import cache, make_key
+
+logger = logging.getLogger(__name__)
+
+class PlayerCache:
+    """Speichert serialisierte Spieler mit TTL und versionierter Invalidierung in Redis."""
+
+    def __init__(self, ttl: Optional[int] = None):
+        self.ttl: int = ttl or int(os.getenv('PLAYER_CACHE_TTL', '300'))
+        # Jeder Schreibvorgang verlängert die Version; sie läuft so erst nach allen ihren Einträgen ab,
+        # sonst könnte ein INCR ab 0 wieder eine alte Version erreichen und deren Eintrag beleben
+        self.version_ttl: int = self.ttl * 2
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def _data_key(user_id: int) -> str:
+        return make_key("player", user_id, "data")
+
+    @staticmethod
+    def _version_key(user_id: int) -> str:
+        return make_key("player", user_id, "version")
+
+    @property
+    def available(self) -> bool:
+        """Prüft ob eine Redis-Verbindung besteht."""
+        return cache.redis is not None
+
+    async def get(self, user_id: int) -> Tuple[Optional[Dict[str, Any]], int]:
+        """Liest Spielerdaten und aktuelle Version in einem Round-Trip.
+
+        Gibt (None, version) zurück, wenn nichts Gültiges im Cache liegt.
+        """
+        if not self.available:
+            return None, 0
+
+        values = await cache.get_many([self._version_key(user_id), self._data_key(user_id)])
+        version = int(values.get(self._version_key(user_id), 0))
+        entry = values.get(self._data_key(user_id))
+        if isinstance(entry, dict):
+            if entry.get('version') == version:
+                self.hits += 1
+                return entry['player'], version
+
+        self.misses += 1
+        return None, version
+
+    async def put(self, user_id: int, data: Dict[str, Any], version: int):
+        """Speichert Spielerdaten unter der angegebenen Version und verlängert die Version im selben Round-Trip."""
+        if not self.available:
+            return
+        async with cache.batch() as batch:
+            batch.set(
+                self._data_key(user_id), {'version': version, 'player': data},
+                expire=self.ttl, tags=[make_key("player", user_id)]
+            )
+            batch.expire(self._version_key(user_id), self.version_ttl)
+
+    async def refresh(self, user_id: int, data: Dict[str, Any]):
+        """Erhöht die Version des Spielers und speichert den neuen Zustand darunter."""
+        if not self.available:
+            return
+
+        try:
+            async with cache.redis.pipeline(transaction=True) as pipe:
+                pipe.incr(self._version_key(user_id))
+                pipe.expire(self._version_key(user_id), self.version_ttl)
+                version, _ = await pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Erhöhen der Spieler-Version für {user_id}: {e}")
+            # Ohne neue Version darf der alte Eintrag nicht weiter ausgeliefert werden
+            await cache.delete(self._data_key(user_id))
+            return
+
+        await self.put(user_id, data, version)
+
+    async def invalidate(self, user_ids: Iterable[int]):
+        """Erhöht die Versionen mehrerer Spieler in einer Pipeline, ohne neue Daten zu speichern."""
+        if not self.available:
+            return
+
+        async with cache.batch() as batch:
+            for user_id in user_ids:
+                batch.incr(self._version_key(user_id))
+                batch.expire(self._version_key(user_id), self.version_ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """Gibt Treffer-Statistiken zur Dimensionierung der TTL zurück."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'ttl': self.ttl,
+        }
+
+# Globale Spieler-Cache-Instanz
+player_cache = PlayerCache()
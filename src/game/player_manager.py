@@ -1,74 +1,395 @@
+import csv
+import json
+import logging
 from ..core.database import db
-from typing import Optional
+from .write_behind import PERSISTED_FIELDS, player_write_behind
+from .player_cache import player_cache
+from .buff_manager import buff_manager
+from .mana import EFFECTIVE_MANA_EXPR, MANA_REGEN_BUFF, MANA_UPDATED_AT_EXPR, regenerate_mana, utcnow
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Lädt Spielerwerte, Aussehen und Seelentier in einem einzigen Round-Trip
+PLAYER_SELECT_SQL = """
+    SELECT p.user_id, p.mana_current, p.mana_max, p.mana_regen_rate, p.mana_updated_at, p.pixel_balance,
+           ca.description, ca.image_url,
+           sa.determined_form, sa.override_form,
+           rb.modifiers AS regen_modifiers, rb.expires AS regen_expires
+    FROM players p
+    LEFT JOIN character_appearance ca ON ca.player_id = p.user_id
+    LEFT JOIN soul_animals sa ON sa.player_id = p.user_id
+    LEFT JOIN LATERAL (
+        SELECT array_agg(ab.modifier) AS modifiers, array_agg(ab.expires_at) AS expires
+        FROM active_buffs ab
+        WHERE ab.player_id = p.user_id AND ab.buff_type = '""" + MANA_REGEN_BUFF + """' AND ab.expires_at > p.mana_updated_at
+    ) rb ON TRUE
+"""
+
+# Legt Spieler, Aussehen und Seelentier in einem Statement an
+CREATE_PLAYER_SQL = """
+    WITH new_player AS (
+        INSERT INTO players (user_id) VALUES ($1)
+        ON CONFLICT (user_id) DO NOTHING
+    ), appearance AS (
+        INSERT INTO character_appearance (player_id, description, image_url) VALUES ($1, $2, $3)
+    )
+    INSERT INTO soul_animals (player_id, determined_form) VALUES ($1, $4)
+"""
+
+# Bulk-Import: Spieler aus der Staging-Tabelle übernehmen, bestehende werden übersprungen
+IMPORT_STAGING_SQL = """
+    CREATE TEMP TABLE player_import (
+        user_id BIGINT NOT NULL,
+        description TEXT,
+        image_url TEXT,
+        soul_form VARCHAR(255) NOT NULL
+    ) ON COMMIT DROP
+"""
+
+IMPORT_PLAYERS_SQL = """
+    WITH staged AS (
+        SELECT DISTINCT ON (user_id) * FROM player_import ORDER BY user_id
+    ), new_players AS (
+        INSERT INTO players (user_id)
+        SELECT user_id FROM staged
+        ON CONFLICT (user_id) DO NOTHING
+        RETURNING user_id
+    ), appearance AS (
+        INSERT INTO character_appearance (player_id, description, image_url)
+        SELECT s.user_id, s.description, s.image_url FROM staged s JOIN new_players n USING (user_id)
+    ), soul AS (
+        INSERT INTO soul_animals (player_id, determined_form)
+        SELECT s.user_id, s.soul_form FROM staged s JOIN new_players n USING (user_id)
+    )
+    SELECT COUNT(*) FROM new_players
+"""
+
+IMPORT_COLUMNS = ('user_id', 'description', 'image_url', 'soul_form')
+
+# Atomare Mutationen: Prüfung und Änderung in einem Statement, ohne explizites Lock
+# SET sieht die alte Zeile, beide Ausdrücke rechnen also mit demselben mana_updated_at
+SPEND_MANA_SQL = """
+    UPDATE players p
+    SET mana_current = """ + EFFECTIVE_MANA_EXPR + """ - $2, mana_updated_at = """ + MANA_UPDATED_AT_EXPR + """
+    WHERE p.user_id = $1 AND """ + EFFECTIVE_MANA_EXPR + """ >= $2
+    RETURNING p.mana_current
+"""
+
+ADD_PIXELS_SQL = """
+    UPDATE players
+    SET pixel_balance = pixel_balance + $2
+    WHERE user_id = $1 AND pixel_balance + $2 >= 0
+    RETURNING pixel_balance
+"""
+
+ADD_PIXELS_BULK_SQL = """
+    UPDATE players p
+    SET pixel_balance = p.pixel_balance + v.amount
+    FROM unnest($1::bigint[], $2::bigint[]) AS v(user_id, amount)
+    WHERE p.user_id = v.user_id
+    RETURNING p.user_id, p.pixel_balance
+"""
+
+# Beide Zeilen werden zuerst in user_id-Reihenfolge gesperrt: gegenläufige Überweisungen warten
+# so aufeinander, statt sich gegenseitig zu blockieren (Deadlock). Der Zähler ist ein InitPlan und
+# läuft, bevor eines der UPDATEs eine Zeile sperrt; er prüft zugleich, dass beide Spieler existieren.
+TRANSFER_PIXELS_SQL = """
+    WITH locked AS (
+        SELECT user_id FROM players
+        WHERE user_id IN ($1, $2)
+        ORDER BY user_id
+        FOR UPDATE
+    ), debit AS (
+        UPDATE players
+        SET pixel_balance = pixel_balance - $3
+        WHERE user_id = $1 AND pixel_balance >= $3
+          AND (SELECT COUNT(*) FROM locked) = 2
+        RETURNING user_id
+    ), credit AS (
+        UPDATE players
+        SET pixel_balance = pixel_balance + $3
+        WHERE user_id = $2 AND EXISTS (SELECT 1 FROM debit)
+        RETURNING user_id
+    )
+    SELECT EXISTS (SELECT 1 FROM credit)
+"""
+
+# Hot-Path-Statements, die auf jeder Pool-Verbindung vorbereitet werden
+db.register_statement('player.get', PLAYER_SELECT_SQL + " WHERE p.user_id = $1")
+db.register_statement('player.get_many', PLAYER_SELECT_SQL + " WHERE p.user_id = ANY($1::bigint[])")
+db.register_statement('player.create', CREATE_PLAYER_SQL)
+db.register_statement('player.spend_mana', SPEND_MANA_SQL)
+db.register_statement('player.add_pixels', ADD_PIXELS_SQL)
+db.register_statement('player.transfer_pixels', TRANSFER_PIXELS_SQL)
+
+# Felder, die im Spieler-Cache unverändert serialisiert werden
+CACHED_FIELDS = (
+    'mana_current', 'mana_max', 'mana_regen_rate', 'pixel_balance',
+    'character_description', 'character_image_url', 'soul_animal_form',
+)
 
 class Player:
     """Repräsentiert einen Spieler und seine Daten im Spiel."""
     def __init__(self, user_id: int):
+        # Geänderte, noch nicht gespeicherte Felder (siehe PERSISTED_FIELDS)
+        self._dirty: Set[str] = set()
         self.user_id = user_id
         # Spieler-Werte
         self.mana_current: int = 100
         self.mana_max: int = 100
+        self.mana_regen_rate: float = 2.0
+        # Zeitpunkt, zu dem mana_current zuletzt gültig war (Basis der Lazy-Regeneration)
+        self.mana_updated_at: datetime = utcnow()
+        # Aktive Regenerations-Buffs als (modifier, expires_at)
+        self.mana_regen_buffs: List[Tuple[float, datetime]] = []
         self.pixel_balance: int = 0
         # Charakter-Aussehen
         self.character_description: Optional[str] = None
         self.character_image_url: Optional[str] = None
         # Seelentier
         self.soul_animal_form: Optional[str] = None
+        self._dirty.clear()
+
+    def __setattr__(self, name: str, value: Any):
+        if name in PERSISTED_FIELDS:
+            self._dirty.add(name)
+            # Mana und sein Zeitstempel werden immer gemeinsam geschrieben
+            if name == 'mana_current':
+                self._dirty.add('mana_updated_at')
+        super().__setattr__(name, value)
+
+    def _regenerate_mana(self, now: Optional[datetime] = None):
+        """Wendet die seit mana_updated_at angefallene Regeneration an, ohne etwas als geändert zu markieren."""
+        mana, updated_at = regenerate_mana(
+            self.mana_current, self.mana_max, self.mana_regen_rate,
+            self.mana_updated_at, self.mana_regen_buffs, now
+        )
+        super().__setattr__('mana_current', mana)
+        super().__setattr__('mana_updated_at', updated_at)
+        self.mana_regen_buffs = [buff for buff in self.mana_regen_buffs if buff[1] > updated_at]
+
+    def get_modifier(self, buff_type: str) -> float:
+        """Gibt den Gesamtmodifikator der aktiven Buffs eines Typs zurück (1.0 = kein Buff)."""
+        return buff_manager.get_modifier(self.user_id, buff_type)
+
+    @property
+    def is_dirty(self) -> bool:
+        """Prüft ob ungespeicherte Änderungen vorliegen."""
+        return bool(self._dirty)
 
     @classmethod
-    async def get_player(cls, user_id: int) -> Optional["Player"]:
-        """Lädt einen Spieler aus der DB, gibt aber None zurück, wenn er nicht existiert."""
-        async with db.pool.acquire() as conn:
-            player_data = await conn.fetchrow("SELECT * FROM players WHERE user_id = $1", user_id)
-            if not player_data:
-                return None
-            
-            player = cls(user_id)
-            player.mana_current = player_data['mana_current']
-            player.mana_max = player_data['mana_max']
-            player.pixel_balance = player_data['pixel_balance']
-
-            appearance_data = await conn.fetchrow("SELECT description, image_url FROM character_appearance WHERE player_id = $1", user_id)
-            if appearance_data:
-                player.character_description = appearance_data['description']
-                player.character_image_url = appearance_data['image_url']
-            
-            soul_animal_data = await conn.fetchrow("SELECT determined_form, override_form FROM soul_animals WHERE player_id = $1", user_id)
-            if soul_animal_data:
-                # Die Admin-Einstellung hat immer Vorrang
-                player.soul_animal_form = soul_animal_data['override_form'] or soul_animal_data['determined_form']
+    def _from_record(cls, record) -> "Player":
+        """Baut einen Spieler aus einer Zeile der Hydrations-Abfrage."""
+        player = cls(record['user_id'])
+        player.mana_current = record['mana_current']
+        player.mana_max = record['mana_max']
+        player.mana_regen_rate = record['mana_regen_rate']
+        player.mana_updated_at = record['mana_updated_at']
+        player.mana_regen_buffs = list(zip(record['regen_modifiers'] or [], record['regen_expires'] or []))
+        player.pixel_balance = record['pixel_balance']
+        player.character_description = record['description']
+        player.character_image_url = record['image_url']
+        # Die Admin-Einstellung hat immer Vorrang
+        player.soul_animal_form = record['override_form'] or record['determined_form']
+        player._dirty.clear()
+        return player
+
+    @classmethod
+    def _from_dict(cls, user_id: int, data: Dict[str, Any]) -> "Player":
+        """Baut einen Spieler aus einem Cache-Eintrag."""
+        player = cls(user_id)
+        for field in CACHED_FIELDS:
+            setattr(player, field, data.get(field))
+        player.mana_updated_at = datetime.fromtimestamp(data['mana_updated_at'], timezone.utc)
+        player.mana_regen_buffs = [
+            (modifier, datetime.fromtimestamp(expires_at, timezone.utc))
+            for modifier, expires_at in data.get('mana_regen_buffs', [])
+        ]
+        player._dirty.clear()
+        return player
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialisiert den Spieler für den Cache."""
+        data = {field: getattr(self, field) for field in CACHED_FIELDS}
+        data['mana_updated_at'] = self.mana_updated_at.timestamp()
+        data['mana_regen_buffs'] = [(modifier, expires_at.timestamp()) for modifier, expires_at in self.mana_regen_buffs]
+        return data
 
+    @classmethod
+    async def get_player(cls, user_id: int) -> Optional["Player"]:
+        """Lädt einen Spieler aus dem Cache oder der DB, gibt aber None zurück, wenn er nicht existiert."""
+        cached, version = await player_cache.get(user_id)
+        if cached is not None:
+            player = cls._from_dict(user_id, cached)
+            player._regenerate_mana()
             return player
 
+        # Was gecacht wird, kommt vom Primary: ein nachhinkendes Replica landete sonst unter der neuen Version
+        # und würde allen Instanzen ausgeliefert. Ohne Cache darf die Replica antworten.
+        pool = db.pool if player_cache.available else db.reader([user_id])
+        async with pool.acquire() as conn:
+            statement = await db.prepared(conn, 'player.get')
+            record = await statement.fetchrow(user_id)
+        if not record:
+            return None
+
+        player = cls._from_record(record)
+        await player_cache.put(user_id, player.to_dict(), version)
+        player._regenerate_mana()
+        return player
+
+    @classmethod
+    async def get_players(cls, user_ids: Iterable[int]) -> Dict[int, "Player"]:
+        """Lädt mehrere Spieler mit einer einzigen Abfrage. Nicht existierende IDs fehlen im Ergebnis."""
+        ids = list(set(user_ids))
+        if not ids:
+            return {}
+        async with db.reader(ids).acquire() as conn:
+            statement = await db.prepared(conn, 'player.get_many')
+            records = await statement.fetch(ids)
+        players = {record['user_id']: cls._from_record(record) for record in records}
+        now = utcnow()
+        for player in players.values():
+            player._regenerate_mana(now)
+        return players
+
     @classmethod
     async def create_player(cls, user_id: int, description: str, soul_form: str, image_url: Optional[str] = None) -> "Player":
         """Erstellt einen neuen Spieler, seine Charakterbeschreibung und sein Seelentier in der DB."""
         async with db.pool.acquire() as conn:
-            async with conn.transaction():
-                await conn.execute("INSERT INTO players (user_id) VALUES ($1) ON CONFLICT (user_id) DO NOTHING", user_id)
-                await conn.execute("INSERT INTO character_appearance (player_id, description, image_url) VALUES ($1, $2, $3)", user_id, description, image_url)
-                await conn.execute("INSERT INTO soul_animals (player_id, determined_form) VALUES ($1, $2)", user_id, soul_form)
+            statement = await db.prepared(conn, 'player.create')
+            await statement.fetch(user_id, description, image_url, soul_form)
         
         player = cls(user_id)
         player.character_description = description
         player.soul_animal_form = soul_form
         player.character_image_url = image_url
+        db.mark_written([user_id])
+        await player_cache.refresh(user_id, player.to_dict())
         return player
 
-    async def save(self):
-        """Speichert den aktuellen Zustand des Spielers (Mana, Pixel etc.) in der Datenbank."""
+    @classmethod
+    async def import_players(cls, path: str) -> int:
+        """Importiert Spieler aus einer CSV- oder JSONL-Datei per COPY. Gibt die Anzahl neuer Spieler zurück.
+
+        Erwartete Felder: user_id, description, image_url (optional), soul_form.
+        """
+        records = []
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            if path.endswith('.jsonl'):
+                rows = (json.loads(line) for line in f if line.strip())
+            else:
+                rows = csv.DictReader(f)
+            for row in rows:
+                records.append((int(row['user_id']), row.get('description'), row.get('image_url') or None, row['soul_form']))
+
+        if not records:
+            return 0
+
         async with db.pool.acquire() as conn:
-            await conn.execute(
-                """
-                UPDATE players 
-                SET mana_current = $1, mana_max = $2, pixel_balance = $3
-                WHERE user_id = $4
-                """,
-                self.mana_current, self.mana_max, self.pixel_balance, self.user_id
-            )
+            async with conn.transaction():
+                await conn.execute(IMPORT_STAGING_SQL)
+                await conn.copy_records_to_table(
+                    'player_import', records=records, columns=IMPORT_COLUMNS, timeout=db.bulk_timeout
+                )
+                created = await conn.fetchval(IMPORT_PLAYERS_SQL, timeout=db.bulk_timeout)
+        db.mark_written(record[0] for record in records)
+
+        logger.info(f"✅ {created} von {len(records)} Spielern importiert")
+        return created
+
+    async def save(self):
+        """Speichert den aktuellen Zustand des Spielers (Mana, Pixel etc.) in der Datenbank.
+
+        Läuft der Write-Behind, werden nur die geänderten Felder vorgemerkt und gebündelt geschrieben.
+        """
+        if not self._dirty:
+            return
+
+        changes = {field: getattr(self, field) for field in self._dirty}
+        self._dirty.clear()
+
+        if player_write_behind.running:
+            player_write_behind.schedule(self.user_id, changes)
+        else:
+            assignments = ", ".join(f"{field} = ${i}" for i, field in enumerate(changes, start=2))
+            async with db.pool.acquire() as conn:
+                await conn.execute(f"UPDATE players SET {assignments} WHERE user_id = $1", self.user_id, *changes.values())
+
+        # Der Cache eilt dem Write-Behind voraus, damit Leser den neuesten Stand sehen
+        db.mark_written([self.user_id])
+        await player_cache.refresh(self.user_id, self.to_dict())
             
     async def set_character_image(self, image_url: str):
         """Aktualisiert die Bild-URL des Charakters in der Datenbank."""
         self.character_image_url = image_url
         async with db.pool.acquire() as conn:
             await conn.execute("UPDATE character_appearance SET image_url = $1 WHERE player_id = $2", image_url, self.user_id)
+        db.mark_written([self.user_id])
+        await player_cache.refresh(self.user_id, self.to_dict())
+
+    # --- Atomare Mutationen ---
+
+    @staticmethod
+    async def _before_mutation(user_ids: Iterable[int]):
+        """Schreibt vorgemerkte Write-Behind-Werte, damit sie die atomare Änderung nicht überschreiben."""
+        user_ids = list(user_ids)
+        await player_write_behind.flush(user_ids)
+        db.mark_written(user_ids)
+
+    @classmethod
+    async def spend_mana(cls, user_id: int, amount: int) -> Optional[int]:
+        """Zieht Mana atomar ab (inklusive bisher angefallener Regeneration).
+
+        Gibt das verbleibende Mana zurück oder None, wenn nicht genug Mana vorhanden ist.
+        """
+        if amount <= 0:
+            raise ValueError("Menge muss positiv sein")
+        await cls._before_mutation([user_id])
+        async with db.pool.acquire() as conn:
+            statement = await db.prepared(conn, 'player.spend_mana')
+            remaining = await statement.fetchval(user_id, amount)
+        if remaining is not None:
+            await player_cache.invalidate([user_id])
+        return remaining
+
+    @classmethod
+    async def add_pixels(cls, user_id: int, amount: int) -> Optional[int]:
+        """Ändert das Pixel-Guthaben atomar; negative Beträge ziehen ab.
+
+        Gibt das neue Guthaben zurück oder None, wenn es unter 0 fallen würde.
+        """
+        await cls._before_mutation([user_id])
+        async with db.pool.acquire() as conn:
+            statement = await db.prepared(conn, 'player.add_pixels')
+            balance = await statement.fetchval(user_id, amount)
+        if balance is not None:
+            await player_cache.invalidate([user_id])
+        return balance
+
+    @classmethod
+    async def add_pixels_bulk(cls, rewards: Dict[int, int]) -> Dict[int, int]:
+        """Schreibt vielen Spielern Pixel in einem Statement gut. Gibt die neuen Guthaben zurück."""
+        if not rewards:
+            return {}
+        await cls._before_mutation(rewards)
+        async with db.pool.acquire() as conn:
+            records = await conn.fetch(ADD_PIXELS_BULK_SQL, list(rewards), list(rewards.values()))
+        balances = {record['user_id']: record['pixel_balance'] for record in records}
+        await player_cache.invalidate(balances)
+        return balances
+
+    @classmethod
+    async def transfer_pixels(cls, from_user_id: int, to_user_id: int, amount: int) -> bool:
+        """Überweist Pixel atomar zwischen zwei Spielern. Gibt False zurück, wenn das Guthaben nicht reicht."""
+        if amount <= 0 or from_user_id == to_user_id:
+            return False
+        await cls._before_mutation([from_user_id, to_user_id])
+        async with db.pool.acquire() as conn:
+            statement = await db.prepared(conn, 'player.transfer_pixels')
+            success = await statement.fetchval(from_user_id, to_user_id, amount)
+        if success:
+            await player_cache.invalidate([from_user_id, to_user_id])
+        return bool(success)
@@ -0,0 +1,113 @@
+# src/game/write_behind.py
+"""
+Write-Behind-Persistenz für Spielerwerte
+Sammelt geänderte Felder im Speicher und schreibt sie periodisch gebündelt in die Datenbank
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Iterable, Optional
+
+from ..core.database import db
+
+logger = logging.getLogger(__name__)
+
+# Felder der players-Tabelle, die per Write-Behind geschrieben werden
+PERSISTED_FIELDS = ('mana_current', 'mana_updated_at', 'mana_max', 'pixel_balance')
+
+# Ein einziges UPDATE für alle offenen Spieler; NULL bedeutet "Feld unverändert"
+FLUSH_SQL = """
+    UPDATE players AS p
+    SET mana_current = COALESCE(v.mana_current, p.mana_current),
+        mana_updated_at = COALESCE(v.mana_updated_at, p.mana_updated_at),
+        mana_max = COALESCE(v.mana_max, p.mana_max),
+        pixel_balance = COALESCE(v.pixel_balance, p.pixel_balance)
+    FROM unnest($1::bigint[], $2::int[], $3::timestamptz[], $4::int[], $5::bigint[])
+         AS v(user_id, mana_current, mana_updated_at, mana_max, pixel_balance)
+    WHERE p.user_id = v.user_id
+"""
+
+class PlayerWriteBehind:
+    """Puffert geänderte Spielerfelder und schreibt sie in Batches in die Datenbank."""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval: float = interval or float(os.getenv('PLAYER_FLUSH_INTERVAL', '5'))
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Prüft ob der periodische Flush aktiv ist."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending_count(self) -> int:
+        """Anzahl der Spieler mit noch nicht geschriebenen Änderungen."""
+        return len(self._pending)
+
+    def schedule(self, user_id: int, changes: Dict[str, Any]):
+        """Merkt geänderte Felder eines Spielers vor. Mehrfache Änderungen werden zusammengefasst."""
+        if changes:
+            self._pending.setdefault(user_id, {}).update(changes)
+
+    def start(self):
+        """Startet den periodischen Flush im Hintergrund."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._flush_loop())
+        logger.info(f"💾 Write-Behind gestartet (Intervall: {self.interval}s)")
+
+    async def stop(self):
+        """Stoppt den periodischen Flush und schreibt alle offenen Änderungen."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self):
+        """Schreibt offene Änderungen im festen Intervall."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self, user_ids: Optional[Iterable[int]] = None) -> int:
+        """Schreibt offene Änderungen mit einem einzigen Statement. Gibt die Anzahl der Spieler zurück.
+
+        Mit user_ids werden nur diese Spieler geschrieben; ein laufender Flush wird in jedem Fall abgewartet.
+        """
+        async with self._lock:
+            if not self._pending or not db.pool:
+                return 0
+
+            if user_ids is None:
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {user_id: self._pending.pop(user_id) for user_id in set(user_ids) if user_id in self._pending}
+                if not batch:
+                    return 0
+
+            user_ids = list(batch)
+            columns = [[batch[user_id].get(field) for user_id in user_ids] for field in PERSISTED_FIELDS]
+
+            try:
+                async with db.pool.acquire() as conn:
+                    await conn.execute(FLUSH_SQL, user_ids, *columns)
+            except Exception as e:
+                logger.error(f"❌ Fehler beim Write-Behind-Flush von {len(batch)} Spielern: {e}")
+                # Neuere Änderungen haben Vorrang vor dem fehlgeschlagenen Batch
+                for user_id, changes in batch.items():
+                    self._pending[user_id] = {**changes, **self._pending.get(user_id, {})}
+                return 0
+
+            db.mark_written(user_ids)
+            logger.debug(f"💾 Write-Behind: {len(batch)} Spieler geschrieben")
+            return len(batch)
+
+# Globale Write-Behind-Instanz
+player_write_behind = PlayerWriteBehind()
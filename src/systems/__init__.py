@@ -8,6 +8,7 @@ import logging
 from discord.ext import commands
 from .migration_system import setup_migration_system, auto_migrate_on_startup
 from .command_registration_system import setup_command_registration, auto_sync_commands
+from ..core.leader import run_singleton
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +28,8 @@ async def initialize_intelligent_systems(bot: commands.Bot, database_url: str) -
     try:
         # 1. Migration System initialisieren und ausführen
         logger.info("Starte intelligentes Migration System...")
-        migration_result = await auto_migrate_on_startup(database_url)
+        # Nur eine Instanz migriert, die anderen warten auf ihr Ergebnis
+        migration_result = await run_singleton("migrations", lambda: auto_migrate_on_startup(database_url))
         results["migration_system"] = migration_result
         
         if migration_result.get("status") == "success":
@@ -37,7 +39,9 @@ async def initialize_intelligent_systems(bot: commands.Bot, database_url: str) -
         
         # 2. Command Registration System initialisieren  
         logger.info("Starte intelligentes Command Registration System...")
-        command_result = await auto_sync_commands(bot)
+        command_result = await run_singleton("command_registration", lambda: auto_sync_commands(bot), wait=False)
+        if command_result is None:
+            command_result = {"success": True, "message": "Sync läuft auf einer anderen Instanz"}
         results["command_registration"] = command_result
         
         if command_result.get("success"):
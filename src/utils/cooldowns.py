@@ -0,0 +1,61 @@
+# src/utils/cooldowns.py
+"""
+Decorators für Cooldowns und Rate-Limits von Slash-Commands
+Beide Prüfungen laufen atomar in Redis und kosten genau einen Round-Trip
+"""
+
+import functools
+import math
+from typing import Callable
+
+import discord
+
+from ..core.cache import cache
+
+async def _deny(interaction: discord.Interaction, message: str):
+    """Sendet eine ephemere Ablehnung, egal ob schon geantwortet wurde."""
+    if interaction.response.is_done():
+        await interaction.followup.send(message, ephemeral=True)
+    else:
+        await interaction.response.send_message(message, ephemeral=True)
+
+def cooldown(seconds: int, name: str = None) -> Callable:
+    """Erlaubt einen Command pro User nur einmal alle `seconds` Sekunden.
+
+    Muss unter @app_commands.command stehen:
+        @app_commands.command(name="erkunden")
+        @cooldown(60)
+        async def explore(self, interaction): ...
+    """
+    def decorator(func: Callable) -> Callable:
+        command_name = name or func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
+            acquired, remaining = await cache.try_acquire_cooldown(f"cooldown:{command_name}:{interaction.user.id}", seconds)
+            if not acquired:
+                await _deny(interaction, f"⏳ Bitte warte noch **{remaining}s**, bevor du das erneut nutzt.")
+                return
+            return await func(self, interaction, *args, **kwargs)
+
+        return wrapper
+    return decorator
+
+def rate_limit(capacity: int, per_seconds: float, name: str = None) -> Callable:
+    """Token-Bucket pro User und Command: bis zu `capacity` Aufrufe am Stück, aufgefüllt über `per_seconds`."""
+    def decorator(func: Callable) -> Callable:
+        command_name = name or func.__name__
+        refill_per_second = capacity / per_seconds
+
+        @functools.wraps(func)
+        async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
+            allowed, retry_after = await cache.consume_rate_limit(
+                f"ratelimit:{command_name}:{interaction.user.id}", capacity, refill_per_second
+            )
+            if not allowed:
+                await _deny(interaction, f"🐢 Zu viele Anfragen. Versuche es in **{max(1, math.ceil(retry_after))}s** erneut.")
+                return
+            return await func(self, interaction, *args, **kwargs)
+
+        return wrapper
+    return decorator
@@ -19,10 +19,29 @@ class EmojiManager:
         self.assets_path = Path("assets/emojis")
         self.guild_id: Optional[int] = None
     
-    async def initialize(self, guild_id: int):
-        """Initialisiert den Emoji-Manager mit einer bestimmten Guild."""
+    async def initialize(self, guild_id: int, sync: bool = True):
+        """Initialisiert den Emoji-Manager mit einer bestimmten Guild.
+        
+        Mit sync=False werden nur die vorhandenen Guild-Emojis übernommen, ohne etwas hochzuladen.
+        """
         self.guild_id = guild_id
-        await self.load_and_sync_emojis()
+        if sync:
+            await self.load_and_sync_emojis()
+        else:
+            self.load_existing_emojis()
+    
+    def load_existing_emojis(self):
+        """Übernimmt die bereits in der Guild vorhandenen Emojis in den Cache."""
+        guild = self.bot.get_guild(self.guild_id)
+        if not guild:
+            logger.error(f"Guild mit ID {self.guild_id} nicht gefunden.")
+            return
+        
+        existing_emojis = {emoji.name: emoji for emoji in guild.emojis}
+        for _, emoji_name in self._find_emoji_files():
+            if emoji_name in existing_emojis:
+                self.emoji_cache[emoji_name] = existing_emojis[emoji_name]
+        logger.info(f"📊 {len(self.emoji_cache)} Emojis aus der Guild übernommen.")
     
     async def load_and_sync_emojis(self):
         """Lädt alle Emoji-Dateien und synchronisiert sie mit Discord."""
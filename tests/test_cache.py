@@ -0,0 +1,62 @@
+# tests/test_cache.py
+"""Rauchtests für die Redis-Anbindung des Caches."""
+
+import asyncio
+
+import pytest
+import redis.asyncio
+
+from src.core.cache import Cache
+
+def test_connect_builds_asyncio_client(monkeypatch):
+    """connect() muss den asyncio-Client bauen, sonst lässt sich kein Befehl awaiten."""
+    monkeypatch.delenv('CACHE_BACKEND', raising=False)
+    monkeypatch.delenv('REDIS_PRIVATE_URL', raising=False)
+    monkeypatch.delenv('CACHE_CLIENT_TRACKING', raising=False)
+    # Port 1: die Verbindung schlägt sofort fehl, der Client ist aber schon gebaut
+    monkeypatch.setenv('REDIS_URL', 'redis://127.0.0.1:1/0')
+
+    async def run():
+        cache = Cache()
+        with pytest.raises(Exception):
+            await cache.connect()
+        try:
+            assert type(cache.redis.client) is redis.asyncio.Redis
+        finally:
+            cache.breaker.stop()
+            await cache.redis.client.aclose()
+
+    asyncio.run(run())
+
+def test_client_tracking_uses_asyncio_pool():
+    """Die Invalidierungs-Verbindung braucht den asyncio-Pool, sonst wird on_connect nie awaited."""
+    from src.core import client_tracking
+
+    pool = client_tracking.redis.ConnectionPool.from_url('redis://127.0.0.1:1/0')
+    assert isinstance(pool, redis.asyncio.ConnectionPool)
+
+def test_get_or_compute_survives_cancelled_leader():
+    """Bricht der erste Aufrufer ab, bekommen die Wartenden trotzdem den berechneten Wert."""
+    async def run():
+        cache = Cache()
+        cache.use_memory_backend()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {'mana': 42}
+
+        leader = asyncio.create_task(cache.get_or_compute('profile:1', 60, compute))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.get_or_compute('profile:1', 60, compute)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await asyncio.gather(*waiters) == [{'mana': 42}] * 3
+        assert calls == 1
+        assert not cache._inflight
+        await cache.redis.aclose()
+
+    asyncio.run(run())
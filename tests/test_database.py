@@ -0,0 +1,60 @@
+# tests/test_database.py
+"""Tests für die Messung der Statements im Datenbank-Pool (ohne Postgres)."""
+
+import asyncio
+
+import asyncpg
+import pytest
+
+from src.core.database import PixelConnection, TimedStatement
+from src.core.pool_metrics import PoolMetrics
+
+class FakeStatement:
+    """Ersatz für ein vorbereitetes Statement, das eine feste Zeit braucht."""
+
+    async def fetchrow(self, *args):
+        await asyncio.sleep(0.003)
+        return args
+
+    async def fetchval(self, *args):
+        raise asyncpg.QueryCanceledError("timeout")
+
+    def get_query(self) -> str:
+        return "SELECT 1"
+
+def test_prepared_statements_fill_query_histogram():
+    metrics = PoolMetrics()
+    statement = TimedStatement(FakeStatement(), metrics)
+
+    async def run():
+        assert await statement.fetchrow(1, 2) == (1, 2)
+        with pytest.raises(asyncpg.QueryCanceledError):
+            await statement.fetchval()
+
+    asyncio.run(run())
+
+    snapshot = metrics.snapshot()
+    assert snapshot['query_count'] == 2
+    assert sum(snapshot['query_histogram'].values()) == 2
+    # Die 3ms-Abfrage liegt nicht im ersten Bucket
+    assert snapshot['query_histogram']['≤1ms'] <= 1
+    assert statement.get_query() == "SELECT 1"
+
+def test_connection_times_queries_but_not_reset(monkeypatch):
+    async def fake_execute(self, query, *args, timeout=None):
+        return "OK"
+
+    monkeypatch.setattr(asyncpg.Connection, 'execute', fake_execute)
+    monkeypatch.setattr(asyncpg.Connection, 'reset', lambda self, timeout=None: fake_execute(self, "RESET ALL"))
+    # Ohne Server gebaut: es gibt nichts aufzuräumen
+    monkeypatch.setattr(asyncpg.Connection, '__del__', lambda self: None)
+    conn = PixelConnection.__new__(PixelConnection)
+    conn.query_metrics = PoolMetrics()
+
+    async def run():
+        assert await conn.execute("UPDATE players SET mana_current = 1") == "OK"
+        await conn.reset()
+
+    asyncio.run(run())
+
+    assert conn.query_metrics.query_count == 1
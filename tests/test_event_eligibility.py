@@ -0,0 +1,74 @@
+# tests/test_event_eligibility.py
+"""Die Bitmasken des EligibilityIndex gegen einen direkten Filter über alle Events."""
+
+import random
+
+from src.game.event_eligibility import TIMES_OF_DAY, EligibilityIndex, PlayerContext, iter_bits
+
+FORMS = ['wolf', 'fox', 'owl', 'bear']
+TIMES = [name for name, _ in TIMES_OF_DAY]
+ITEMS = ['berries', 'lantern', 'rope', 'map']
+GRIMOIRE = ['moon', 'river', 'stone']
+
+def brute_force(conditions, context):
+    """Indizes der Events, deren Bedingungen der Spieler erfüllt, Event für Event geprüft."""
+    eligible = []
+    for i, condition in enumerate(conditions):
+        if condition.get('soul_animal_form') and context.soul_animal_form not in condition['soul_animal_form']:
+            continue
+        if condition.get('time_of_day') and context.time_of_day not in condition['time_of_day']:
+            continue
+        if context.mana < condition.get('min_mana', 0):
+            continue
+        if not set(condition.get('items', [])) <= context.items:
+            continue
+        if any(context.grimoire.get(entry, 0) < level for entry, level in condition.get('grimoire', {}).items()):
+            continue
+        eligible.append(i)
+    return eligible
+
+def random_condition(rng):
+    condition = {}
+    if rng.random() < 0.3:
+        condition['soul_animal_form'] = rng.sample(FORMS, rng.randint(1, 2))
+    if rng.random() < 0.3:
+        condition['time_of_day'] = rng.sample(TIMES, rng.randint(1, 3))
+    if rng.random() < 0.4:
+        condition['min_mana'] = rng.choice([0, 10, 25, 50, 75, 100])
+    if rng.random() < 0.3:
+        condition['items'] = rng.sample(ITEMS, rng.randint(1, 2))
+    if rng.random() < 0.3:
+        condition['grimoire'] = {entry: rng.randint(1, 3) for entry in rng.sample(GRIMOIRE, rng.randint(1, 2))}
+    return condition
+
+def random_context(rng):
+    return PlayerContext(
+        soul_animal_form=rng.choice(FORMS + [None]),
+        # Schwellen selbst und Werte knapp daneben kommen oft vor
+        mana=rng.choice([0, 9, 10, 11, 25, 49, 50, 74, 75, 100, rng.randint(0, 120)]),
+        items=set(rng.sample(ITEMS, rng.randint(0, len(ITEMS)))),
+        grimoire={entry: rng.randint(0, 3) for entry in rng.sample(GRIMOIRE, rng.randint(0, len(GRIMOIRE)))},
+        time_of_day=rng.choice(TIMES),
+    )
+
+def test_candidates_match_brute_force():
+    rng = random.Random(7)
+    for size in (1, 5, 64, 200):
+        conditions = [random_condition(rng) for _ in range(size)]
+        index = EligibilityIndex(conditions)
+        for _ in range(500):
+            context = random_context(rng)
+            assert list(iter_bits(index.candidates(context))) == brute_force(conditions, context)
+
+def test_thresholds_are_inclusive():
+    conditions = [{'min_mana': 50}, {'grimoire': {'moon': 2}}, {'items': ['rope']}, {}]
+    index = EligibilityIndex(conditions)
+
+    assert list(iter_bits(index.candidates(PlayerContext(mana=49, time_of_day='day')))) == [3]
+    context = PlayerContext(mana=50, items={'rope'}, grimoire={'moon': 2}, time_of_day='day')
+    assert list(iter_bits(index.candidates(context))) == [0, 1, 2, 3]
+
+def test_empty_catalog_has_no_candidates():
+    index = EligibilityIndex([])
+
+    assert index.candidates(PlayerContext(mana=100, time_of_day='night')) == 0
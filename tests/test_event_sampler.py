@@ -0,0 +1,92 @@
+# tests/test_event_sampler.py
+"""Verteilungstests für die Alias-Tabellen und die Stufen-Ziehung der Events."""
+
+import asyncio
+import math
+import random
+from collections import Counter
+
+from src.game import event_manager
+from src.game.event_eligibility import PlayerContext
+from src.game.event_sampler import AliasTable, TieredSampler
+
+DRAWS = 1_000_000
+
+def assert_distribution(counts, expected, draws):
+    """Jede Häufigkeit muss innerhalb von 5 Standardabweichungen der Binomialverteilung liegen."""
+    assert set(counts) <= set(expected)
+    for key, p in expected.items():
+        sigma = math.sqrt(draws * p * (1 - p))
+        assert abs(counts.get(key, 0) - draws * p) <= 5 * sigma + 1, (key, counts.get(key, 0), draws * p)
+
+def test_alias_table_matches_weights():
+    weights = {'a': 50, 'b': 25, 'c': 15, 'd': 7.5, 'e': 2.4, 'f': 0.1}
+    table = AliasTable(list(weights), list(weights.values()))
+    rng = random.Random(1)
+
+    counts = Counter(table.sample(rng) for _ in range(DRAWS))
+
+    total = sum(weights.values())
+    assert_distribution(counts, {key: weight / total for key, weight in weights.items()}, DRAWS)
+
+def test_tiered_sampler_with_luck_modifiers():
+    tiers = {rarity: [((rarity, i), 1.0 + i) for i in range(3)] for rarity in event_manager.RARITIES}
+    sampler = TieredSampler(tiers, event_manager.RARITY_WEIGHTS)
+    luck = 1.5
+    modifiers = {rarity: luck ** rank for rank, rarity in enumerate(event_manager.RARITIES)}
+    rng = random.Random(2)
+
+    counts = Counter(sampler.sample(modifiers, rng=rng) for _ in range(DRAWS))
+
+    expected = {}
+    for rarity, p_tier in sampler.probabilities(modifiers).items():
+        tier_total = sum(weight for _, weight in tiers[rarity])
+        for item, weight in tiers[rarity]:
+            expected[item] = p_tier * weight / tier_total
+    assert_distribution(counts, expected, DRAWS)
+
+def test_tiered_sampler_accept_renormalizes():
+    tiers = {rarity: [((rarity, i), 1.0) for i in range(4)] for rarity in event_manager.RARITIES}
+    sampler = TieredSampler(tiers, event_manager.RARITY_WEIGHTS)
+    # Ungerade Einträge und die ganze Stufe "rare" ablehnen
+    accept = lambda item: item[1] % 2 == 0 and item[0] != 'rare'
+    rng = random.Random(3)
+
+    counts = Counter(sampler.sample(accept=accept, rng=rng) for _ in range(DRAWS))
+
+    base = sampler.probabilities()
+    weights = {item: base[rarity] / 4 for rarity, entries in tiers.items() for item, _ in entries if accept(item)}
+    total = sum(weights.values())
+    assert None not in counts
+    assert_distribution(counts, {item: weight / total for item, weight in weights.items()}, DRAWS)
+
+def test_get_random_event_respects_conditions_and_weights(monkeypatch):
+    definitions = [
+        {
+            'id': f'{rarity}_{i}', 'rarity': rarity, 'weight': 1 + i, 'display_text': '-',
+            'options': [{'label': '-', 'action': '-'}],
+            # Jedes zweite Event nur nachts
+            'conditions': {'time_of_day': ['night']} if i % 2 else {},
+        }
+        for rarity in event_manager.RARITIES for i in range(4)
+    ]
+    catalog = event_manager.EventCatalog.from_definitions(definitions)
+    monkeypatch.setattr(event_manager.event_manager, 'catalog', catalog)
+    monkeypatch.setattr(event_manager.event_manager, '_next_check', math.inf)
+    monkeypatch.setattr(event_manager, 'rarity_modifiers', lambda player: None)
+    context = PlayerContext(time_of_day='day')
+    random.seed(4)
+    draws = 200_000
+
+    async def run():
+        counts = Counter()
+        for _ in range(draws):
+            counts[(await event_manager.get_random_event(None, context)).id] += 1
+        return counts
+
+    counts = asyncio.run(run())
+
+    available = [event for event in catalog.events if event.is_available(context)]
+    total = sum(catalog.base_weights[catalog.events.index(event)] for event in available)
+    expected = {event.id: catalog.base_weights[catalog.events.index(event)] / total for event in available}
+    assert_distribution(counts, expected, draws)
@@ -0,0 +1,105 @@
+# tests/test_mana.py
+"""Grenzfälle der Lazy-Regeneration und Abgleich mit den SQL-Ausdrücken."""
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.game.mana import EFFECTIVE_MANA_EXPR, MANA_REGEN_BUFF, MANA_UPDATED_AT_EXPR, regenerate_mana
+
+NOW = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+def minutes(value: float) -> timedelta:
+    return timedelta(minutes=value)
+
+# (mana_current, mana_max, regen_rate, vergangene Minuten, [(modifier, Ablauf in Minuten nach updated_at)])
+CASES = [
+    (50, 100, 2.0, 45, []),                 # 1,5 Punkte: einer gutgeschrieben, ein halber bleibt
+    (95, 100, 2.0, 600, []),                # Deckel erreicht
+    (100, 100, 2.0, 600, []),               # schon voll
+    (50, 100, 2.0, 60, [(2.0, 30)]),        # Buff läuft mitten im Zeitraum ab
+    (50, 100, 2.0, 60, [(2.0, 120)]),       # Buff läuft über den ganzen Zeitraum
+    (50, 100, 2.0, 60, [(1.5, 90), (2.0, 15)]),
+    (50, 100, 2.0, 20, []),                 # noch kein ganzer Punkt
+    (50, 100, 0.0, 600, []),                # keine Regeneration
+]
+
+def buffs_at(updated_at: datetime, buffs):
+    return [(modifier, updated_at + minutes(expires)) for modifier, expires in buffs]
+
+def test_cap_returns_max_and_resets_timestamp():
+    assert regenerate_mana(95, 100, 2.0, NOW - minutes(600), now=NOW) == (100, NOW)
+    assert regenerate_mana(100, 100, 2.0, NOW - minutes(600), now=NOW) == (100, NOW)
+
+def test_fraction_is_carried_over():
+    mana, updated_at = regenerate_mana(50, 100, 2.0, NOW - minutes(45), now=NOW)
+
+    # 1,5 Punkte: der halbe Punkt entspricht 15 Minuten vor NOW
+    assert mana == 51
+    assert updated_at == NOW - minutes(15)
+
+def test_split_reads_match_one_read():
+    start = NOW - minutes(75)
+    mana, updated_at = 50, start
+    for step in range(1, 6):
+        mana, updated_at = regenerate_mana(mana, 100, 2.0, updated_at, now=start + minutes(15 * step))
+
+    assert (mana, updated_at) == regenerate_mana(50, 100, 2.0, start, now=NOW)
+    assert mana == 52
+
+def test_buff_only_counts_inside_its_window():
+    updated_at = NOW - minutes(60)
+
+    # 60 Minuten Basis + 30 Minuten doppelte Rate = 90 Minuten zu 2/h
+    assert regenerate_mana(50, 100, 2.0, updated_at, buffs_at(updated_at, [(2.0, 30)]), now=NOW)[0] == 53
+    # Vor updated_at abgelaufen: wirkt nicht mehr
+    assert regenerate_mana(50, 100, 2.0, updated_at, [(2.0, updated_at - minutes(1))], now=NOW)[0] == 52
+
+def test_no_time_or_rate_changes_nothing():
+    assert regenerate_mana(50, 100, 2.0, NOW + minutes(5), now=NOW) == (50, NOW + minutes(5))
+    assert regenerate_mana(50, 100, 0.0, NOW - minutes(600), now=NOW) == (50, NOW)
+    assert regenerate_mana(50, 100, 2.0, NOW - minutes(20), now=NOW) == (50, NOW - minutes(20))
+
+@pytest.mark.skipif(not os.getenv('TEST_DATABASE_URL'), reason="TEST_DATABASE_URL nicht gesetzt")
+def test_sql_expressions_match_regenerate_mana():
+    """EFFECTIVE_MANA_EXPR und MANA_UPDATED_AT_EXPR müssen dasselbe liefern wie regenerate_mana()."""
+    import asyncpg
+
+    async def run():
+        conn = await asyncpg.connect(os.environ['TEST_DATABASE_URL'])
+        try:
+            # Temporäre Tabellen verdecken die echten; alles wird am Ende zurückgerollt
+            transaction = conn.transaction()
+            await transaction.start()
+            await conn.execute("""
+                CREATE TEMP TABLE players (
+                    user_id BIGINT PRIMARY KEY, mana_current INT, mana_max INT,
+                    mana_regen_rate REAL, mana_updated_at TIMESTAMPTZ
+                );
+                CREATE TEMP TABLE active_buffs (player_id BIGINT, buff_type TEXT, modifier REAL, expires_at TIMESTAMPTZ);
+            """)
+            now = await conn.fetchval("SELECT NOW()")
+            for user_id, (current, maximum, rate, elapsed, buffs) in enumerate(CASES):
+                updated_at = now - minutes(elapsed)
+                await conn.execute("INSERT INTO players VALUES ($1, $2, $3, $4, $5)", user_id, current, maximum, rate, updated_at)
+                for modifier, expires_at in buffs_at(updated_at, buffs):
+                    await conn.execute("INSERT INTO active_buffs VALUES ($1, $2, $3, $4)", user_id, MANA_REGEN_BUFF, modifier, expires_at)
+
+            records = await conn.fetch(
+                f"SELECT p.user_id, {EFFECTIVE_MANA_EXPR} AS mana, {MANA_UPDATED_AT_EXPR} AS updated_at FROM players p"
+            )
+            await transaction.rollback()
+            return now, {record['user_id']: record for record in records}
+        finally:
+            await conn.close()
+
+    now, records = asyncio.run(run())
+
+    for user_id, (current, maximum, rate, elapsed, buffs) in enumerate(CASES):
+        updated_at = now - minutes(elapsed)
+        mana, expected_at = regenerate_mana(current, maximum, rate, updated_at, buffs_at(updated_at, buffs), now=now)
+        record = records[user_id]
+        assert record['mana'] == mana, CASES[user_id]
+        assert abs((record['updated_at'] - expected_at).total_seconds()) < 0.01, CASES[user_id]
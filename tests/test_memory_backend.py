@@ -0,0 +1,110 @@
+# tests/test_memory_backend.py
+"""Ablauf und Verdrängung im In-Memory-Backend (CACHE_BACKEND=memory)."""
+
+import asyncio
+
+import pytest
+
+from src.core import memory_backend
+from src.core.memory_backend import ENTRY_OVERHEAD, MemoryRedis
+
+class FakeClock:
+    """Ersetzt time.time() im Backend, damit Ablaufzeiten ohne Warten geprüft werden können."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(memory_backend, 'time', clock)
+    return clock
+
+def test_expired_keys_vanish_on_access(clock):
+    async def run():
+        backend = MemoryRedis()
+        await backend.set("cooldown:daily:1", "1", ex=60)
+        await backend.set("player:1:data", "x")
+
+        clock.now += 59
+        assert await backend.get("cooldown:daily:1") == "1"
+        assert await backend.ttl("cooldown:daily:1") == 1
+        assert await backend.ttl("player:1:data") == -1
+
+        clock.now += 1
+        assert await backend.get("cooldown:daily:1") is None
+        assert await backend.ttl("cooldown:daily:1") == -2
+        assert backend.expirations == 1
+        # Ein abgelaufener Zähler beginnt wieder bei 1
+        await backend.set("counter", "5", ex=10)
+        clock.now += 10
+        assert await backend.incr("counter") == 1
+
+    asyncio.run(run())
+
+def test_tick_expires_untouched_keys(clock):
+    backend = MemoryRedis()
+    backend._wheel._cursor = int(clock.now)
+    backend._set("short", "a", ex=5)
+    # Mehr als eine Umdrehung des Wheels (3600 Slots) entfernt: landet im selben Slot wie "short"
+    backend._set("long", "b", ex=5 + backend._wheel.slots)
+    backend._set("forever", "c")
+
+    clock.now += 5
+    backend._expire_due(clock.now)
+
+    assert "short" not in backend._data
+    assert "long" in backend._data and "forever" in backend._data
+    assert backend.expirations == 1
+    assert backend.memory_used == backend._data["long"].size + backend._data["forever"].size
+
+    clock.now += backend._wheel.slots
+    backend._expire_due(clock.now)
+    assert list(backend._data) == ["forever"]
+
+def test_set_without_expiry_and_expire_update_ttl(clock):
+    backend = MemoryRedis()
+    backend._set("key", "a", ex=10)
+    backend._set("key", "b")
+    assert backend._ttl("key") == -1
+
+    assert backend._expire("key", 30) is True
+    assert backend._ttl("key") == 30
+    assert backend._expire("missing", 30) is False
+    # Ablaufzeit in der Vergangenheit löscht sofort
+    backend._expire("key", -1)
+    assert backend._get("key") is None
+
+def test_lru_eviction_respects_budget(clock):
+    entry_size = len("key:00") + 100 + ENTRY_OVERHEAD
+    backend = MemoryRedis(max_memory=3 * entry_size)
+    for i in range(3):
+        backend._set(f"key:{i:02d}", "x" * 100)
+
+    # Lesen macht key:00 zum zuletzt genutzten; verdrängt wird key:01
+    assert backend._get("key:00") is not None
+    backend._set("key:03", "x" * 100)
+
+    assert set(backend._data) == {"key:00", "key:02", "key:03"}
+    assert backend.evictions == 1
+    assert backend.memory_used <= backend.max_memory
+
+    for i in range(4, 50):
+        backend._set(f"key:{i:02d}", "x" * 100)
+    stats = backend.stats()
+    assert stats['keys'] == 3 and stats['memory_used'] <= stats['max_memory']
+    assert stats['evictions'] == 47
+
+def test_memory_accounting_returns_to_zero(clock):
+    backend = MemoryRedis()
+    backend._set("a", "x" * 50, ex=10)
+    backend._incrby("counter", 5)
+    backend._sadd("tags", "a", "b")
+
+    backend._delete("a", "counter", "tags")
+
+    assert backend.memory_used == 0
+    assert not backend._data
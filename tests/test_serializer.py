@@ -0,0 +1,72 @@
+# tests/test_serializer.py
+"""Round-Trip des Cache-Formats und Lesen von Werten aus dem alten Format."""
+
+import asyncio
+import json
+
+import pytest
+
+from src.core.cache import Cache
+from src.core.serializer import Serializer
+
+VALUES = [
+    "123", "", "Grüße 🦊", Serializer.PREFIX + "j{}",
+    0, 123, -7, 2.5, True, False,
+    [1, "zwei", None], {'mana': 50, 'buffs': [[1.5, 1700000000.0]], 'name': 'Fuchs'},
+]
+
+@pytest.mark.parametrize("value", VALUES, ids=repr)
+def test_round_trip_keeps_type(value):
+    serializer = Serializer()
+
+    restored = serializer.loads(serializer.dumps(value))
+
+    assert restored == value
+    assert type(restored) is type(value)
+
+def test_large_values_are_compressed():
+    serializer = Serializer(compress_threshold=100)
+    value = {'inventory': {f"item_{i}": i for i in range(200)}}
+
+    raw = serializer.dumps(value)
+
+    assert raw.startswith(Serializer.PREFIX + "z")
+    assert len(raw) < len(json.dumps(value))
+    assert serializer.loads(raw) == value
+    # Schwelle 0 schaltet die Kompression ab
+    assert Serializer(compress_threshold=0).dumps(value).startswith(Serializer.PREFIX + "j")
+
+@pytest.mark.parametrize("raw, expected", [
+    ('{"mana": 50}', {'mana': 50}),
+    ('[1, 2]', [1, 2]),
+    ('5', 5),
+    ('"quoted"', 'quoted'),
+    ('kein json', 'kein json'),
+    (None, None),
+])
+def test_legacy_values_stay_readable(raw, expected):
+    assert Serializer().loads(raw) == expected
+
+def test_unknown_tag_is_rejected():
+    with pytest.raises(ValueError):
+        Serializer().loads(Serializer.PREFIX + "x{}")
+
+def test_cache_reads_old_and_new_values():
+    async def run():
+        cache = Cache()
+        cache.use_memory_backend()
+        try:
+            await cache.set("player:1:name", "123")
+            await cache.redis.set("player:2:data", '{"mana": 50}')
+            await cache.redis.incr("streak:3")
+
+            assert await cache.get("player:1:name") == "123"
+            assert await cache.get("player:2:data") == {'mana': 50}
+            assert await cache.get("streak:3") == 1
+            assert await cache.get_many(["player:1:name", "player:2:data"]) == {
+                "player:1:name": "123", "player:2:data": {'mana': 50}
+            }
+        finally:
+            await cache.redis.aclose()
+
+    asyncio.run(run())